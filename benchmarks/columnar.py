@@ -0,0 +1,103 @@
+"""
+Vectorized MessageBatch / ProfileFrame operations vs loops over model objects
+
+python -m benchmarks.columnar [--profiles N] [--messages N]
+"""
+from benchmarks.corpus import messages_page, profile_corpus
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from tinder_cli.columnar import MessageBatch, ProfileFrame
+from tinder_cli.parse_utils import parse_messages, parse_profile_response
+import argparse
+import json
+import random
+import time
+
+
+def timed(name: str, func, rows: int):
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    print(f"{name:<40} {elapsed * 1000:9.1f} ms  {rows / elapsed / 1e6:8.2f} M rows/s")
+    return result
+
+
+def ages_loop(profiles, today: date):
+    return [
+        today.year
+        - p.birth_date.year
+        - ((today.month, today.day) < (p.birth_date.month, p.birth_date.day))
+        for p in profiles
+    ]
+
+
+def last_activity_loop(messages, now: datetime):
+    last = {}
+    for m in messages:
+        if m.match_id not in last or m.sent_date > last[m.match_id]:
+            last[m.match_id] = m.sent_date
+    return {k: (now - v).total_seconds() for k, v in last.items()}
+
+
+def response_times_loop(messages):
+    by_match = defaultdict(list)
+    for m in messages:
+        by_match[m.match_id].append(m)
+    seconds = []
+    for thread in by_match.values():
+        thread.sort(key=lambda m: m.sent_date)
+        for prev, cur in zip(thread, thread[1:]):
+            if prev.from_id != cur.from_id:
+                seconds.append((cur.sent_date - prev.sent_date).total_seconds())
+    return seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--profiles", type=int, default=100_000)
+    parser.add_argument("--messages", type=int, default=200_000)
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    corpus = profile_corpus(min(args.profiles, 5_000))
+    profiles = [
+        parse_profile_response(json.loads(json.dumps(corpus[i % len(corpus)])))
+        for i in range(args.profiles)
+    ]
+    messages = [
+        m
+        for i in range(args.messages // 50)
+        for m in parse_messages(messages_page(rnd, f"{i}", 50))[0]
+    ]
+    today = date.today()
+    now = datetime.now(timezone.utc)
+    n_p, n_m = len(profiles), len(messages)
+    print(f"{n_p} profiles, {n_m} messages")
+
+    frame = timed(
+        "ProfileFrame.from_profiles", lambda: ProfileFrame.from_profiles(profiles), n_p
+    )
+    batch = timed(
+        "MessageBatch.from_messages", lambda: MessageBatch.from_messages(messages), n_m
+    )
+
+    timed("ages (loop)", lambda: ages_loop(profiles, today), n_p)
+    timed("ages (frame)", lambda: frame.ages(today), n_p)
+    timed(
+        "sort by distance (loop)",
+        lambda: sorted(profiles, key=lambda p: p.distance_mi or 0.0),
+        n_p,
+    )
+    timed("sort by distance (frame)", lambda: frame.sort_by("distance_mi"), n_p)
+    timed("last activity (loop)", lambda: last_activity_loop(messages, now), n_m)
+    timed("last activity (batch)", lambda: batch.seconds_since_activity(now), n_m)
+    timed("response times (loop)", lambda: response_times_loop(messages), n_m)
+    timed("response times (batch)", batch.response_times, n_m)
+    timed(
+        "sort by sent (loop)", lambda: sorted(messages, key=lambda m: m.sent_date), n_m
+    )
+    timed("sort by sent (batch)", batch.sort_by_sent, n_m)
+
+
+if __name__ == "__main__":
+    main()
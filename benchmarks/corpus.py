@@ -0,0 +1,243 @@
+"""
+Synthetic API responses for benchmarks (shaped like recorded Tinder responses)
+"""
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+import glob
+import json
+import os
+import random
+
+
+_SECTIONS = {
+    "Basics": {
+        "Zodiac": ["Leo", "Virgo", "Aries", "Gemini"],
+        "Education": ["Bachelor degree", "At uni", "Master degree"],
+        "Family Plans": ["I want children", "Not sure yet"],
+        "COVID Vaccine": ["Vaccinated", "Prefer not to say"],
+        "Personality Type": ["INTJ", "ENFP", "ISTP"],
+        "Communication Style": ["Big time texter", "Better in person"],
+        "Love Style": ["Presents", "Time together"],
+    },
+    "Lifestyle": {
+        "Pets": ["Dog", "Cat", "Pet-free"],
+        "Drinking": ["Not for me", "Socially, at the weekend"],
+        "Smoking": ["Non-smoker", "Social smoker"],
+        "Workout": ["Often", "Sometimes"],
+        "Dietary Preference": ["Vegan", "Omnivore"],
+        "Social Media": ["Socially active", "Off the grid"],
+        "Sleeping Habits": ["Early bird", "Night owl"],
+    },
+    "Relationship Goals": {"Looking for": ["new friends", "short-term fun"]},
+}
+_LANGUAGES = ["English", "Polish", "German", "Spanish", "French"]
+_INTERESTS = ["Hiking", "Coffee", "Travel", "Gym", "Netflix", "Cooking", "Music"]
+
+
+def format_date(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%S.") + f"{value.microsecond // 1000:03d}Z"
+
+
+def random_date(rnd: random.Random, start_year: int = 2015, days: int = 3000) -> str:
+    start = datetime(start_year, 1, 1, tzinfo=timezone.utc)
+    return format_date(start + timedelta(seconds=rnd.randrange(days * 86400)))
+
+
+def profile_response(
+    rnd: random.Random,
+    person_id: str,
+    descriptor_ratio: float = 0.6,
+    photos: Optional[int] = None,
+    bio_words: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Returns /user/{id} response with a random subset of descriptors
+    (each one present with `descriptor_ratio` probability), random number of
+    photos and bio words unless given
+    """
+    descriptors: List[Dict[str, Any]] = []
+    for section, names in _SECTIONS.items():
+        for name, choices in names.items():
+            if rnd.random() < descriptor_ratio:
+                descriptors.append(
+                    {
+                        "section_name": section,
+                        "name": name,
+                        "choice_selections": [{"name": rnd.choice(choices)}],
+                    }
+                )
+    if rnd.random() < 0.5:
+        descriptors.append(
+            {
+                "section_name": "Languages I Know",
+                "choice_selections": [
+                    {"name": name} for name in rnd.sample(_LANGUAGES, 2)
+                ],
+            }
+        )
+    return {
+        "status": 200,
+        "results": {
+            "_id": person_id,
+            "name": rnd.choice(["Anna", "Kasia", "Ola", "Marta", "Zosia"]),
+            "bio": " ".join(
+                rnd.choice(_INTERESTS)
+                for _ in range(rnd.randrange(40) if bio_words is None else bio_words)
+            ),
+            "birth_date": random_date(rnd, 1985, 7000),
+            "distance_mi": rnd.randrange(1, 60),
+            "gender": 1,
+            "show_gender_on_profile": rnd.random() < 0.8,
+            "photos": [
+                {"url": f"https://images-ssl.gotinder.com/{person_id}/{i}.jpg"}
+                for i in range(rnd.randrange(1, 9) if photos is None else photos)
+            ],
+            "schools": [{"name": "University of Warsaw"}] if rnd.random() < 0.5 else [],
+            "jobs": [{"title": {"name": "Engineer"}, "company": {"name": "Acme"}}]
+            if rnd.random() < 0.5
+            else [],
+            "city": {"name": "Warsaw"},
+            "sexual_orientations": [{"name": "Straight"}],
+            "user_interests": {
+                "selected_interests": [
+                    {"name": name} for name in rnd.sample(_INTERESTS, 5)
+                ]
+            },
+            "selected_descriptors": descriptors,
+        },
+    }
+
+
+def profile_corpus(
+    size: int, seed: int = 0, directory: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Returns recorded responses from `directory` (*.json files) if given,
+    otherwise `size` synthetic ones
+    """
+    if directory is not None:
+        corpus = []
+        for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+            with open(path) as f:
+                corpus.append(json.load(f))
+        return corpus
+    rnd = random.Random(seed)
+    return [profile_response(rnd, f"{i:024x}") for i in range(size)]
+
+
+def match_item(rnd: random.Random, match_id: str) -> Dict[str, Any]:
+    person_id = f"{rnd.getrandbits(96):024x}"
+    return {
+        "_id": match_id,
+        "id": match_id,
+        "closed": False,
+        "common_friend_count": 0,
+        "created_date": random_date(rnd, 2020, 1000),
+        "dead": False,
+        "last_activity_date": random_date(rnd, 2022, 300),
+        "message_count": rnd.randrange(100),
+        "messages": [],
+        "participants": [person_id],
+        "pending": False,
+        "is_super_like": False,
+        "person": {
+            "_id": person_id,
+            "bio": "",
+            "birth_date": random_date(rnd, 1985, 7000),
+            "gender": 1,
+            "name": rnd.choice(["Anna", "Kasia", "Ola", "Marta", "Zosia"]),
+            "photos": [
+                {
+                    "id": f"{i}",
+                    "url": f"https://images-ssl.gotinder.com/{person_id}/{i}.jpg",
+                }
+                for i in range(rnd.randrange(1, 6))
+            ],
+        },
+    }
+
+
+def matches_page(
+    rnd: random.Random, size: int = 60, next_page_token: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Returns /v2/matches response with `size` matches
+    """
+    data: Dict[str, Any] = {
+        "matches": [
+            match_item(rnd, f"{rnd.getrandbits(96):024x}") for _ in range(size)
+        ]
+    }
+    if next_page_token is not None:
+        data["next_page_token"] = next_page_token
+    return {"meta": {"status": 200}, "data": data}
+
+
+def messages_page(
+    rnd: random.Random,
+    match_id: str,
+    size: int = 100,
+    next_page_token: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Returns /v2/matches/{id}/messages response with `size` messages
+    """
+    me, other = f"{rnd.getrandbits(96):024x}", f"{rnd.getrandbits(96):024x}"
+    messages = []
+    for _ in range(size):
+        sender, receiver = (me, other) if rnd.random() < 0.5 else (other, me)
+        messages.append(
+            {
+                "_id": f"{rnd.getrandbits(96):024x}",
+                "match_id": match_id,
+                "sent_date": random_date(rnd, 2022, 300),
+                "message": " ".join(
+                    rnd.choice(_INTERESTS) for _ in range(rnd.randrange(1, 20))
+                ),
+                "to": receiver,
+                "from": sender,
+                "timestamp": rnd.getrandbits(40),
+            }
+        )
+    data: Dict[str, Any] = {"messages": messages}
+    if next_page_token is not None:
+        data["next_page_token"] = next_page_token
+    return {"meta": {"status": 200}, "data": data}
+
+
+def recs_page(rnd: random.Random, size: int = 20) -> Dict[str, Any]:
+    """
+    Returns /v2/recs/core response with `size` user recommendations
+    """
+    results = []
+    for _ in range(size):
+        user = profile_response(rnd, f"{rnd.getrandbits(96):024x}")["results"]
+        results.append(
+            {
+                "type": "user",
+                "user": user,
+                "distance_mi": user.pop("distance_mi"),
+                "experiment_info": {"user_interests": user.pop("user_interests")},
+            }
+        )
+    return {"meta": {"status": 200}, "data": {"results": results}}
+
+
+def updates_response(
+    rnd: random.Random, size: int = 10, messages: int = 5
+) -> Dict[str, Any]:
+    """
+    Returns /updates response with `size` matches carrying `messages` messages each
+    """
+    matches = []
+    for _ in range(size):
+        match = match_item(rnd, f"{rnd.getrandbits(96):024x}")
+        match["messages"] = messages_page(rnd, match["_id"], messages)["data"][
+            "messages"
+        ]
+        matches.append(match)
+    return {
+        "matches": matches,
+        "blocks": [f"{rnd.getrandbits(96):024x}" for _ in range(rnd.randrange(3))],
+        "last_activity_date": random_date(rnd, 2023, 100),
+    }
@@ -0,0 +1,41 @@
+"""
+Encode / decode throughput of installed JSON codecs on matches and messages pages
+
+python -m benchmarks.json_codec [--pages N]
+"""
+from benchmarks.corpus import matches_page, messages_page
+from tinder_cli.codec import CODECS, get_codec
+import argparse
+import random
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=500)
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    pages = [matches_page(rnd) for _ in range(args.pages // 2)] + [
+        messages_page(rnd, "m") for _ in range(args.pages // 2)
+    ]
+
+    for name in CODECS:
+        try:
+            codec = get_codec(name)
+        except ImportError:
+            print(f"{name:<8} not installed")
+            continue
+        raw = [codec.dumps(page) for page in pages]
+        for data in raw:
+            codec.loads(data)
+        stats = codec.stats()
+        mb = stats.encoded_bytes / 1e6
+        print(
+            f"{name:<8} encode {mb / stats.encode_seconds:8.1f} MB/s"
+            f"  decode {mb / stats.decode_seconds:8.1f} MB/s"
+            f"  ({stats.encoded} pages, {mb:.1f} MB)"
+        )
+
+
+if __name__ == "__main__":
+    main()
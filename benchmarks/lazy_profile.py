@@ -0,0 +1,63 @@
+"""
+Recs triage throughput (profiles / s): eager parse_profile_response vs LazyProfile
+
+Triage looks at _id, distance_mi and birth date, only the kept profiles are
+parsed fully.
+
+python -m benchmarks.lazy_profile [--size N] [--max-distance MI] [--corpus DIR]
+"""
+from benchmarks.corpus import profile_corpus
+from datetime import datetime, timezone
+from tinder_cli.lazy import LazyProfile
+from tinder_cli.parse_utils import parse_profile_response
+import argparse
+import json
+import time
+
+
+def accept(profile, max_distance: int, born_after: datetime) -> bool:
+    return (
+        profile.distance_mi is not None
+        and profile.distance_mi <= max_distance
+        and profile.birth_date >= born_after
+    )
+
+
+def run(name: str, raw, triage, repeat: int) -> None:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        kept = triage(raw)
+        best = min(best, time.perf_counter() - started)
+    print(f"{name:<8} {len(raw) / best:10,.0f} profiles/s  kept {len(kept)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-distance", type=int, default=5)
+    parser.add_argument("--corpus", help="directory with recorded /user/{id} responses")
+    args = parser.parse_args()
+
+    # raw bodies, both ways decode them the same way
+    corpus = profile_corpus(args.size, directory=args.corpus)
+    raw = [json.dumps(rsp).encode() for rsp in corpus]
+    born_after = datetime(1995, 1, 1, tzinfo=timezone.utc)
+
+    def eager(bodies):
+        profiles = (parse_profile_response(body) for body in bodies)
+        return [p for p in profiles if accept(p, args.max_distance, born_after)]
+
+    def lazy(bodies):
+        profiles = (LazyProfile(body) for body in bodies)
+        return [
+            p.to_profile() for p in profiles if accept(p, args.max_distance, born_after)
+        ]
+
+    run("eager", raw, eager, args.repeat)
+    run("lazy", raw, lazy, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
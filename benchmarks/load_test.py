@@ -0,0 +1,234 @@
+"""
+Load test of sync / async clients against the mock Tinder API
+
+Every account has its own client, `--workers` threads (sync) or tasks (async)
+per account call random endpoints for `--duration` seconds. Reports throughput
+and p50 / p95 / p99 latency per endpoint (retries of 429 are part of the latency).
+
+The mock server is started in this process unless --host is given, run it
+separately (python -m benchmarks.mock_server) to keep it off the client's GIL.
+
+python -m benchmarks.load_test [--mode sync|async|both] [--accounts 50]
+    [--workers 4] [--duration 10] [--host http://127.0.0.1:8080]
+    [--client-limits] [mock server options, see benchmarks.mock_server]
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from benchmarks.mock_server import (
+    MockTinderServer,
+    add_config_arguments,
+    config_from_arguments,
+)
+from collections import defaultdict
+from tinder_cli.api import TinderClient
+from tinder_cli.async_api import AsyncTinderClient
+from tinder_cli.ratelimit import Budget, RateLimitDefaults, RateLimiter
+from tinder_cli.transport import HTTPTransport
+import argparse
+import asyncio
+import logging
+import random
+import threading
+import time
+
+
+# endpoint name -> (weight, call of the client method)
+OPERATIONS: Dict[str, Tuple[int, Callable[[Any, random.Random], Any]]] = {
+    "recs": (1, lambda client, rnd: client.get_recommendations_v2()),
+    "profile": (4, lambda client, rnd: client.get_profile(_id(rnd))),
+    "like": (3, lambda client, rnd: client.like(_id(rnd))),
+    "pass": (3, lambda client, rnd: client.dislike(_id(rnd))),
+    "matches": (1, lambda client, rnd: client.get_matches()),
+    "messages": (2, lambda client, rnd: client.get_messages(_id(rnd))),
+    "match_info": (1, lambda client, rnd: client.match_info(_id(rnd))),
+    "updates": (1, lambda client, rnd: client.get_updates()),
+    "send_msg": (1, lambda client, rnd: client.send_msg(_id(rnd), "hey")),
+}
+_NAMES = list(OPERATIONS)
+_WEIGHTS = [weight for weight, _ in OPERATIONS.values()]
+
+
+def _id(rnd: random.Random) -> str:
+    return f"{rnd.getrandbits(96):024x}"
+
+
+class Recorder:
+    """
+    Latencies of successful calls and error counts per endpoint
+    """
+
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float, error: Optional[Exception]) -> None:
+        with self._lock:
+            if error is None:
+                self.latencies[name].append(seconds)
+            else:
+                self.errors[name][type(error).__name__] += 1
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Nearest-rank percentile of sorted values
+    """
+    index = max(0, min(len(values) - 1, round(q / 100 * len(values)) - 1))
+    return values[index]
+
+
+def report(mode: str, recorder: Recorder, elapsed: float) -> None:
+    print(f"\n{mode}: {elapsed:.1f} s")
+    print(
+        f"{'endpoint':<12} {'ok':>8} {'errors':>7} {'req/s':>9}"
+        f" {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    total_ok = total_errors = 0
+    for name in _NAMES:
+        latencies = sorted(recorder.latencies.get(name, []))
+        errors = sum(recorder.errors.get(name, {}).values())
+        total_ok += len(latencies)
+        total_errors += errors
+        if not latencies:
+            print(f"{name:<12} {0:>8} {errors:>7}")
+            continue
+        p50, p95, p99 = (percentile(latencies, q) * 1000 for q in (50, 95, 99))
+        print(
+            f"{name:<12} {len(latencies):>8} {errors:>7}"
+            f" {len(latencies) / elapsed:>9.1f} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f}"
+        )
+    print(f"{'total':<12} {total_ok:>8} {total_errors:>7} {total_ok / elapsed:>9.1f}")
+    for name, errors in recorder.errors.items():
+        print(f"  {name} errors: {dict(errors)}")
+
+
+def rate_limiter(client_limits: bool) -> RateLimiter:
+    if client_limits:
+        return RateLimiter()
+    # the server is the one under test, client side throttling is switched off
+    unlimited = Budget(rate=1e9, burst=10**9)
+    return RateLimiter({name: unlimited for name in RateLimitDefaults.BUDGETS})
+
+
+def run_sync(args: argparse.Namespace, host: str) -> None:
+    recorder = Recorder()
+    deadline = time.monotonic() + args.duration
+
+    def work(client: TinderClient, seed: int) -> None:
+        rnd = random.Random(seed)
+        while time.monotonic() < deadline:
+            name = rnd.choices(_NAMES, _WEIGHTS)[0]
+            started = time.perf_counter()
+            error = None
+            try:
+                OPERATIONS[name][1](client, rnd)
+            except Exception as err:
+                error = err
+            recorder.record(name, time.perf_counter() - started, error)
+
+    clients = [
+        TinderClient(
+            f"account-{i}",
+            transport=HTTPTransport(pool_maxsize=args.workers),
+            rate_limiter=rate_limiter(args.client_limits),
+            host=host,
+        )
+        for i in range(args.accounts)
+    ]
+    threads = [
+        threading.Thread(target=work, args=(client, i * args.workers + j))
+        for i, client in enumerate(clients)
+        for j in range(args.workers)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    for client in clients:
+        client.close()
+    report(f"sync ({len(threads)} threads)", recorder, elapsed)
+
+
+async def _run_async(args: argparse.Namespace, host: str) -> None:
+    recorder = Recorder()
+    deadline = time.monotonic() + args.duration
+
+    async def work(client: AsyncTinderClient, seed: int) -> None:
+        rnd = random.Random(seed)
+        while time.monotonic() < deadline:
+            name = rnd.choices(_NAMES, _WEIGHTS)[0]
+            started = time.perf_counter()
+            error = None
+            try:
+                await OPERATIONS[name][1](client, rnd)
+            except Exception as err:
+                error = err
+            recorder.record(name, time.perf_counter() - started, error)
+
+    clients = [
+        AsyncTinderClient(
+            f"account-{i}",
+            max_concurrency=args.workers,
+            pool_maxsize=args.workers,
+            rate_limiter=rate_limiter(args.client_limits),
+            host=host,
+        )
+        for i in range(args.accounts)
+    ]
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            work(client, i * args.workers + j)
+            for i, client in enumerate(clients)
+            for j in range(args.workers)
+        )
+    )
+    elapsed = time.perf_counter() - started
+    for client in clients:
+        await client.close()
+    report(f"async ({args.accounts * args.workers} tasks)", recorder, elapsed)
+
+
+def run_async(args: argparse.Namespace, host: str) -> None:
+    asyncio.run(_run_async(args, host))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mode", choices=["sync", "async", "both"], default="both")
+    parser.add_argument("--accounts", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=4, help="per account")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--host", help="URL of running mock server")
+    parser.add_argument(
+        "--client-limits",
+        action="store_true",
+        help="keep the default client side rate limits",
+    )
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    # failed requests are counted in the report
+    logging.getLogger("tinder_cli").setLevel(logging.CRITICAL)
+
+    server = None
+    host = args.host
+    if host is None:
+        server = MockTinderServer(config_from_arguments(args)).start()
+        host = server.url
+    try:
+        if args.mode in ("sync", "both"):
+            run_sync(args, host)
+        if args.mode in ("async", "both"):
+            run_async(args, host)
+    finally:
+        if server is not None:
+            server.stop()
+            print(f"\nserver: requests {dict(server.requests)}")
+            print(f"server: injected 429 {dict(server.rate_limited)}")
+
+
+if __name__ == "__main__":
+    main()
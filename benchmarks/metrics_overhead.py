@@ -0,0 +1,84 @@
+"""
+Client overhead of metrics: calls / s of TinderClient without and with ClientMetrics
+
+Responses are replayed from an in-memory cassette without latency, so the
+timings are the client's own work (request, decode, parse) plus the metrics.
+
+python -m benchmarks.metrics_overhead [--calls 20000] [--repeat 5]
+"""
+from typing import Callable, Optional
+from benchmarks.corpus import matches_page, profile_response
+from tinder_cli.api import TinderClient
+from tinder_cli.cassette import Cassette, ReplayTransport, request_key
+from tinder_cli.metrics import ClientMetrics
+from tinder_cli.ratelimit import Budget, RateLimitDefaults, RateLimiter
+import argparse
+import json
+import random
+import time
+
+
+HOST = "http://replay.invalid"
+PROFILE_ID = "0" * 24
+
+
+def cassette() -> Cassette:
+    rnd = random.Random(0)
+    recorded = Cassette()
+    responses = {
+        f"{HOST}/user/{PROFILE_ID}": profile_response(rnd, PROFILE_ID),
+        f"{HOST}/v2/matches?locale=en&count=60&is_tinder_u=false": matches_page(
+            rnd, 60
+        ),
+        f"{HOST}/like/{PROFILE_ID}": {"match": False, "likes_remaining": 100},
+    }
+    for url, body in responses.items():
+        recorded.record(request_key("GET", url), 200, {}, json.dumps(body).encode())
+    return recorded
+
+
+def client(metrics: Optional[ClientMetrics] = None) -> TinderClient:
+    unlimited = Budget(rate=1e9, burst=10**9)
+    budgets = {name: unlimited for name in RateLimitDefaults.BUDGETS}
+    return TinderClient(
+        "token",
+        transport=ReplayTransport(cassette()),
+        rate_limiter=RateLimiter(budgets),
+        host=HOST,
+        metrics=metrics,
+    )
+
+
+def run(name: str, call: Callable[[], object], calls: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(calls):
+            call()
+        best = min(best, time.perf_counter() - started)
+    print(f"{name:<24} {calls / best:10,.0f} calls/s")
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    plain, measured = client(), client(ClientMetrics())
+    operations = {
+        "get_profile": lambda c: c.get_profile(PROFILE_ID),
+        "get_matches": lambda c: c.get_matches(),
+        "like": lambda c: c.like(PROFILE_ID),
+    }
+    for name, operation in operations.items():
+        calls = args.calls // 10 if name == "get_matches" else args.calls
+        off = run(f"{name} (no metrics)", lambda: operation(plain), calls, args.repeat)
+        on = run(f"{name} (metrics)", lambda: operation(measured), calls, args.repeat)
+        print(f"{'overhead':<24} {(on - off) / calls * 1e6:10.2f} us/call")
+    print(f"\n{measured.metrics.registry.render().count(chr(10))} lines of metrics")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""
+Local stand-in for the Tinder API endpoints used by TinderClient
+
+Answers with synthetic responses (benchmarks.corpus) after a random latency,
+optionally injects 429 responses. Point clients at it with host=server.url.
+
+python -m benchmarks.mock_server [--port 8080] [--latency lognormal:80:0.5]
+    [--endpoint-latency recs=lognormal:250:0.4] [--rate-limited 0.01]
+    [--account-rps 20] [--recs-size 20] [--matches-size 60] [--messages-size 100]
+"""
+from typing import Callable, Dict, List, Optional, Tuple
+from aiohttp import web
+from benchmarks.corpus import (
+    match_item,
+    matches_page,
+    messages_page,
+    profile_response,
+    recs_page,
+    updates_response,
+)
+from collections import Counter
+from dataclasses import dataclass, field
+import argparse
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+
+
+class MockDefaults:
+    PORT = 8080
+    # distinct pre-rendered bodies served round robin per endpoint
+    VARIANTS = 16
+    # Retry-After of injected 429 responses (seconds)
+    RETRY_AFTER = 1.0
+
+
+@dataclass
+class Latency:
+    """
+    Response delay distribution (milliseconds)
+
+    constant: always `ms`; uniform: `ms` +- `spread` ms;
+    exponential: mean `ms`; lognormal: median `ms`, sigma `spread`
+    """
+
+    kind: str = "constant"
+    ms: float = 0.0
+    spread: float = 0.0
+
+    @classmethod
+    def parse(cls, value: str) -> "Latency":
+        """
+        Parses "kind:ms[:spread]", ex. "lognormal:80:0.5"
+        """
+        kind, *numbers = value.split(":")
+        if kind not in ("constant", "uniform", "exponential", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        return cls(kind, *(float(number) for number in numbers))
+
+    def sample(self, rnd: random.Random) -> float:
+        """
+        Returns delay in seconds
+        """
+        if self.kind == "uniform":
+            ms = rnd.uniform(self.ms - self.spread, self.ms + self.spread)
+        elif self.kind == "exponential":
+            ms = rnd.expovariate(1 / self.ms) if self.ms > 0 else 0.0
+        elif self.kind == "lognormal":
+            ms = rnd.lognormvariate(math.log(self.ms), self.spread) if self.ms else 0.0
+        else:
+            ms = self.ms
+        return max(0.0, ms) / 1000
+
+
+@dataclass
+class MockConfig:
+    latency: Latency = field(default_factory=Latency)
+    # endpoint name -> latency overriding the default one
+    endpoint_latency: Dict[str, Latency] = field(default_factory=dict)
+    # probability of answering 429 to any request
+    rate_limited: float = 0.0
+    # requests per second allowed per auth token, over that 429 is returned
+    account_rps: Optional[float] = None
+    retry_after: float = MockDefaults.RETRY_AFTER
+    recs_size: int = 20
+    matches_size: int = 60
+    messages_size: int = 100
+    updates_size: int = 10
+    # number of pages of matches / messages (next_page_token on all but the last)
+    pages: int = 3
+    seed: int = 0
+
+
+# endpoint name, method, route
+ROUTES: List[Tuple[str, str, str]] = [
+    ("recs", "GET", "/v2/recs/core"),
+    ("profile", "GET", "/user/{person_id}"),
+    ("like", "GET", "/like/{person_id}"),
+    ("superlike", "POST", "/like/{person_id}/super"),
+    ("pass", "GET", "/pass/{person_id}"),
+    ("matches", "GET", "/v2/matches"),
+    ("match_info", "GET", "/v2/matches/{match_id}"),
+    ("messages", "GET", "/v2/matches/{match_id}/messages"),
+    ("updates", "POST", "/updates"),
+    ("send_msg", "POST", "/user/matches/{match_id}"),
+]
+
+PAGINATED = {"matches", "messages"}
+
+
+class MockTinderServer:
+    """
+    aiohttp server run in a background thread (start / stop or context manager)
+
+    `requests` counts requests per endpoint, `rate_limited` the injected 429s.
+    """
+
+    def __init__(
+        self,
+        config: Optional[MockConfig] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.config = config if config is not None else MockConfig()
+        self.host = host
+        self.port = port
+        self.requests: "Counter[str]" = Counter()
+        self.rate_limited: "Counter[str]" = Counter()
+        self._random = random.Random(self.config.seed)
+        self._bodies = self._render()
+        # auth token -> (window start, requests in the window)
+        self._accounts: Dict[str, Tuple[float, int]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._runner: Optional[web.AppRunner] = None
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def _render(self) -> Dict[str, List[bytes]]:
+        """
+        Pre-renders response bodies, so serving them costs the server (almost) nothing
+        """
+        rnd, config = random.Random(self.config.seed), self.config
+        pages = config.pages
+
+        def variants(build: Callable[[int], dict], count: int = 1) -> List[bytes]:
+            count *= MockDefaults.VARIANTS
+            return [json.dumps(build(i)).encode() for i in range(count)]
+
+        def token(i: int) -> Optional[str]:
+            # variants of paginated endpoints are cycles of `pages` linked pages
+            return f"page{i % pages + 1}" if i % pages < pages - 1 else None
+
+        return {
+            "recs": variants(lambda i: recs_page(rnd, config.recs_size)),
+            "profile": variants(lambda i: profile_response(rnd, f"{i:024x}")),
+            "like": variants(lambda i: {"match": False, "likes_remaining": 100}),
+            "superlike": variants(lambda i: {"status": 200, "super_likes": {}}),
+            "pass": variants(lambda i: {"status": 200}),
+            "matches": variants(
+                lambda i: matches_page(rnd, config.matches_size, token(i)), pages
+            ),
+            "match_info": variants(
+                lambda i: {"meta": {"status": 200}, "data": match_item(rnd, f"{i}")}
+            ),
+            "messages": variants(
+                lambda i: messages_page(rnd, f"{i}", config.messages_size, token(i)),
+                pages,
+            ),
+            "updates": variants(lambda i: updates_response(rnd, config.updates_size)),
+            "send_msg": variants(
+                lambda i: {"_id": f"{i:024x}", "sent_date": "2023-01-01T00:00:00.000Z"}
+            ),
+        }
+
+    def _over_budget(self, token: str) -> bool:
+        if self.config.account_rps is None:
+            return False
+        now = time.monotonic()
+        start, count = self._accounts.get(token, (now, 0))
+        if now - start >= 1.0:
+            start, count = now, 0
+        self._accounts[token] = (start, count + 1)
+        return count + 1 > self.config.account_rps
+
+    def _handler(self, name: str):
+        bodies = self._bodies[name]
+        latency = self.config.endpoint_latency.get(name, self.config.latency)
+
+        async def handle(request: web.Request) -> web.Response:
+            self.requests[name] += 1
+            await asyncio.sleep(latency.sample(self._random))
+            token = request.headers.get("X-Auth-Token", "")
+            injected = self._random.random() < self.config.rate_limited
+            if injected or self._over_budget(token):
+                self.rate_limited[name] += 1
+                return web.json_response(
+                    {"status": 429},
+                    status=429,
+                    headers={"Retry-After": f"{self.config.retry_after:g}"},
+                )
+            index = self.requests[name] % MockDefaults.VARIANTS
+            if name in PAGINATED:
+                page = request.query.get("page_token", "page0")[4:]
+                offset = int(page) if page.isdigit() else 0
+                index = index * self.config.pages + min(offset, self.config.pages - 1)
+            return web.Response(body=bodies[index], content_type="application/json")
+
+        return handle
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        for name, method, route in ROUTES:
+            app.router.add_route(method, route, self._handler(name))
+        return app
+
+    def _run(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, self.host, self.port, backlog=1024)
+        self._loop.run_until_complete(site.start())
+        # port 0 picks a free port
+        self.port = site._server.sockets[0].getsockname()[1]
+        self._started.set()
+        self._loop.run_forever()
+        self._loop.run_until_complete(self._runner.cleanup())
+        self._loop.close()
+
+    def start(self) -> "MockTinderServer":
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._started.wait()
+        return self
+
+    def stop(self) -> None:
+        if self._loop is not None and self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "MockTinderServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency", type=Latency.parse, default=Latency())
+    parser.add_argument(
+        "--endpoint-latency",
+        action="append",
+        default=[],
+        metavar="ENDPOINT=KIND:MS[:SPREAD]",
+    )
+    parser.add_argument("--rate-limited", type=float, default=0.0)
+    parser.add_argument("--account-rps", type=float)
+    parser.add_argument("--recs-size", type=int, default=20)
+    parser.add_argument("--matches-size", type=int, default=60)
+    parser.add_argument("--messages-size", type=int, default=100)
+    parser.add_argument("--updates-size", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=3)
+
+
+def config_from_arguments(args: argparse.Namespace) -> MockConfig:
+    endpoint_latency = {}
+    for value in args.endpoint_latency:
+        name, _, latency = value.partition("=")
+        endpoint_latency[name] = Latency.parse(latency)
+    return MockConfig(
+        latency=args.latency,
+        endpoint_latency=endpoint_latency,
+        rate_limited=args.rate_limited,
+        account_rps=args.account_rps,
+        recs_size=args.recs_size,
+        matches_size=args.matches_size,
+        messages_size=args.messages_size,
+        updates_size=args.updates_size,
+        pages=args.pages,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=MockDefaults.PORT)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    server = MockTinderServer(config_from_arguments(args), port=args.port).start()
+    print(f"mock Tinder API on {server.url} (ctrl+c to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(dict(server.requests))
+
+
+if __name__ == "__main__":
+    main()
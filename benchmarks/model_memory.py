@@ -0,0 +1,98 @@
+"""
+Bytes per model object: slotted models vs plain dataclasses
+
+python -m benchmarks.model_memory [--profiles N] [--messages N]
+"""
+from benchmarks.corpus import messages_page, profile_corpus
+from dataclasses import asdict, fields, make_dataclass, field
+from datetime import datetime
+from tinder_cli.models import AdditionalInfo, Message, Profile
+from tinder_cli.parse_utils import parse_messages, parse_profile_response
+import argparse
+import gc
+import json
+import random
+import tracemalloc
+
+
+def plain_class(cls):
+    """
+    Same fields as `cls` in a plain (__dict__ based) dataclass, the models before slots
+    """
+    return make_dataclass(
+        f"Plain{cls.__name__}",
+        [(f.name, f.type, field(default=f.default)) for f in fields(cls)],
+    )
+
+
+PlainAdditionalInfo = plain_class(AdditionalInfo)
+PlainProfile = plain_class(Profile)
+PlainMessage = plain_class(Message)
+
+
+def fresh(value):
+    # every decoded response holds its own copies of the strings
+    if isinstance(value, str):
+        return value.encode().decode()
+    if isinstance(value, list):
+        return [fresh(v) for v in value]
+    if isinstance(value, datetime):
+        return value.replace(microsecond=value.microsecond)
+    return value
+
+
+def to_plain(obj):
+    values = {f.name: fresh(getattr(obj, f.name)) for f in fields(obj)}
+    if isinstance(obj, Profile):
+        values["additional"] = PlainAdditionalInfo(
+            **{k: fresh(v) for k, v in asdict(obj.additional).items()}
+        )
+        return PlainProfile(**values)
+    return PlainMessage(**values)
+
+
+def retained(build) -> float:
+    """
+    Returns bytes allocated by `build` and still alive after it returned
+    """
+    gc.collect()
+    tracemalloc.start()
+    objects = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size / len(objects)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--profiles", type=int, default=20_000)
+    parser.add_argument("--messages", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    profiles_raw = [json.dumps(r).encode() for r in profile_corpus(args.profiles)]
+    messages_raw = [
+        json.dumps(messages_page(rnd, f"{i}", 100)).encode()
+        for i in range(args.messages // 100)
+    ]
+
+    def profiles():
+        return [parse_profile_response(raw) for raw in profiles_raw]
+
+    def messages():
+        return [m for raw in messages_raw for m in parse_messages(raw)[0]]
+
+    parsed_profiles, parsed_messages = profiles(), messages()
+    rows = [
+        ("Profile (plain)", lambda: [to_plain(p) for p in parsed_profiles]),
+        ("Profile (slots)", profiles),
+        ("Message (plain)", lambda: [to_plain(m) for m in parsed_messages]),
+        ("Message (slots)", messages),
+    ]
+    for name, build in rows:
+        print(f"{name:<24} {retained(build):8.0f} bytes / object")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Throughput of parse_profile_response (profiles / s)
+
+python -m benchmarks.parse_profile [--size N] [--corpus DIR_WITH_RECORDED_JSON]
+
+The parser is timed against `reference_parse_profile_response`, the parser as
+it was before the table-driven descriptor mapping (nested match statement,
+setattr per field, strptime), so the speedup is reproducible from the tree.
+"""
+from typing import Any, Callable, Dict, Tuple
+from benchmarks.corpus import profile_corpus
+from datetime import datetime
+from tinder_cli.models import AdditionalInfo, Profile
+from tinder_cli.parse_utils import DATETIME_FORMAT, parse_gender, parse_profile_response
+import argparse
+import time
+
+
+def reference_match_additional_info_attr_name(
+    descriptor_section: str, descriptor_name: str
+) -> Tuple[str, bool]:
+    def raise_err():
+        raise ValueError(
+            f"Unknown descriptor section and name: {descriptor_section} {descriptor_name}"
+        )
+
+    match (descriptor_section, descriptor_name):
+        case ("Basics", _):
+            match (descriptor_name):
+                case ("Zodiac"):
+                    return "zodiac_sign", False
+                case ("Education"):
+                    return "education_level", False
+                case ("Family Plans"):
+                    return "children_attitude", False
+                case ("COVID Vaccine"):
+                    # was "covid_vaccine", which AdditionalInfo never had
+                    return "vaccination_status", False
+                case ("Personality Type"):
+                    return "personality_type", False
+                case ("Communication Style"):
+                    return "communication_style", False
+                case ("Love Style"):
+                    return "love_receive_language", False
+                case _:
+                    raise_err()
+        case ("Lifestyle", _):
+            match (descriptor_name):
+                case ("Pets"):
+                    return "pets", False
+                case ("Drinking"):
+                    return "drinking", False
+                case ("Smoking"):
+                    return "smoking", False
+                case ("Workout"):
+                    return "training_frequency", False
+                case ("Dietary Preference"):
+                    return "diet_preferences", False
+                case ("Social Media"):
+                    return "social_media_presence", False
+                case ("Sleeping Habits"):
+                    return "sleeping_habits", False
+                case _:
+                    raise_err()
+        case ("Relationship Goals", "Looking for"):
+            return "relationship_goals", False
+        case ("Lifestyle", "Pets"):
+            return "pets", False
+        case ("Languages I Know", None):
+            return "languages", True
+        case _:
+            raise_err()
+
+
+def reference_parse_profile_response(rsp: Dict[str, Any]) -> Profile:
+    result = rsp["results"]
+
+    additional_info = AdditionalInfo()
+    if len(result["schools"]) > 0:
+        additional_info.schools = [school["name"] for school in result["schools"]]
+    if len(result["user_interests"]["selected_interests"]) > 0:
+        additional_info.passions = [
+            passion["name"]
+            for passion in result["user_interests"]["selected_interests"]
+        ]
+    if len(result["jobs"]) > 0:
+        job = result["jobs"][0]
+        if "title" in job:
+            additional_info.job_title = job["title"]["name"]
+        if "company" in job:
+            additional_info.company = job["company"]["name"]
+
+    if "city" in result:
+        additional_info.location = result["city"]["name"]
+
+    additional_info.gender = parse_gender(result)
+    if "sexual_orientations" in result:
+        additional_info.sexual_orientations = [
+            orientation["name"] for orientation in result["sexual_orientations"]
+        ]
+
+    for descriptor in result["selected_descriptors"]:
+        attr_name, is_multisel = reference_match_additional_info_attr_name(
+            descriptor["section_name"], descriptor.get("name")
+        )
+        value = [desc["name"] for desc in descriptor["choice_selections"]]
+        if is_multisel is False:
+            value = value[0]
+        setattr(additional_info, attr_name, value)
+
+    photos = []
+    for photo in result["photos"]:
+        if photo["url"].endswith(".webp"):
+            continue
+        photos.append(photo["url"])
+
+    return Profile(
+        _id=result["_id"],
+        bio=result["bio"],
+        birth_date=datetime.strptime(result["birth_date"], DATETIME_FORMAT),
+        name=result["name"],
+        photos=photos,
+        distance_mi=result["distance_mi"],
+        additional=additional_info,
+    )
+
+
+def run(
+    corpus, repeat: int, parse: Callable[[Any], Profile] = parse_profile_response
+) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for rsp in corpus:
+            parse(rsp)
+        best = min(best, time.perf_counter() - started)
+    return len(corpus) / best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--corpus", help="directory with recorded /user/{id} responses")
+    args = parser.parse_args()
+
+    corpus = profile_corpus(args.size, directory=args.corpus)
+    reference = run(corpus, args.repeat, reference_parse_profile_response)
+    rate = run(corpus, args.repeat)
+    print(
+        f"reference_parse_profile_response: {len(corpus)} profiles, "
+        f"{reference:,.0f} profiles/s"
+    )
+    print(
+        f"parse_profile_response: {len(corpus)} profiles, {rate:,.0f} profiles/s "
+        f"({rate / reference:.2f}x reference)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Peak memory of decoding a large /v2/matches page: whole document vs streaming
+
+python -m benchmarks.stream_memory [--matches N]
+"""
+from benchmarks.corpus import matches_page
+from tinder_cli.codec import get_codec
+from tinder_cli.jsonstream import StreamDefaults
+from tinder_cli.parse_utils import parse_matches, parse_matches_stream
+import argparse
+import json
+import random
+import time
+import tracemalloc
+
+
+def chunks(raw: bytes, size: int = StreamDefaults.CHUNK_SIZE):
+    # stands for the response body arriving from the socket
+    for start in range(0, len(raw), size):
+        yield raw[start : start + size]
+
+
+def measure(name: str, func) -> None:
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<34} peak {peak / 1e6:8.2f} MB  {elapsed:6.2f} s  {count} matches")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--matches", type=int, default=50_000)
+    args = parser.parse_args()
+
+    raw = json.dumps(matches_page(random.Random(0), args.matches, "token")).encode()
+    print(f"payload {len(raw) / 1e6:.1f} MB")
+
+    def whole(codec_name: str):
+        def run() -> int:
+            # the full body is held in memory too (rsp.content)
+            body = b"".join(chunks(raw))
+            matches, _ = parse_matches(get_codec(codec_name).loads(body))
+            return len(matches)
+
+        return run
+
+    def streamed() -> int:
+        return sum(1 for _ in parse_matches_stream(chunks(raw)))
+
+    def streamed_list() -> int:
+        return len(list(parse_matches_stream(chunks(raw))))
+
+    measure("json.loads + parse_matches", whole("json"))
+    try:
+        measure("orjson.loads + parse_matches", whole("orjson"))
+    except ImportError:
+        pass
+    measure("parse_matches_stream", streamed)
+    measure("parse_matches_stream (kept list)", streamed_list)
+
+
+if __name__ == "__main__":
+    main()
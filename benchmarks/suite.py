@@ -0,0 +1,333 @@
+"""
+Benchmark suite of parsers, models and features.py helpers with regression tracking
+
+python -m benchmarks.suite run [--output FILE] [--filter TEXT] [--quick]
+    [--compare BASELINE] [--threshold 0.1]
+python -m benchmarks.suite compare BASELINE CURRENT [--threshold 0.1]
+
+Results are written as JSON (best time per call of every case). Compare mode
+prints relative change of every case against the baseline and exits with
+status 1 when any case got slower by more than the threshold, store results
+of a known good commit as the baseline (ex. benchmarks/baseline.json).
+"""
+from typing import Any, Callable, Dict, List, Optional
+from benchmarks.corpus import (
+    format_date,
+    matches_page,
+    messages_page,
+    profile_response,
+)
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from tinder_cli.models import AdditionalInfo, Match, Message, Profile
+from tinder_cli.parse_utils import (
+    parse_gender,
+    parse_matches,
+    parse_messages,
+    parse_profile_response,
+)
+import argparse
+import gc
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+
+
+class SuiteDefaults:
+    # every timing runs the case at least this long (seconds)
+    MIN_TIME = 0.2
+    REPEAT = 5
+    # relative slowdown reported as regression
+    THRESHOLD = 0.10
+
+
+@dataclass
+class Case:
+    """
+    Benchmarked call: `setup` builds its input once, `run(input)` is timed
+    """
+
+    name: str
+    setup: Callable[[], Any]
+    run: Callable[[Any], Any]
+
+
+CASES: List[Case] = []
+
+
+def case(name: str, setup: Callable[[], Any]):
+    """
+    Registers decorated function as the `run` of a case
+    """
+
+    def register(run: Callable[[Any], Any]) -> Callable[[Any], Any]:
+        CASES.append(Case(name, setup, run))
+        return run
+
+    return register
+
+
+def _profile(size: str) -> Dict[str, Any]:
+    rnd = random.Random(0)
+    if size == "small":
+        return profile_response(rnd, "0" * 24, 0.0, photos=1, bio_words=0)
+    if size == "huge":
+        return profile_response(rnd, "0" * 24, 1.0, photos=9, bio_words=100)
+    return profile_response(rnd, "0" * 24)
+
+
+for _size in ("small", "medium", "huge"):
+    case(f"parse_profile_response[{_size}]", lambda size=_size: _profile(size))(
+        parse_profile_response
+    )
+    case(
+        f"parse_profile_response[{_size}, bytes]",
+        lambda size=_size: json.dumps(_profile(size)).encode(),
+    )(parse_profile_response)
+
+for _size in (10, 60, 1000):
+    case(
+        f"parse_matches[{_size}]",
+        lambda size=_size: matches_page(random.Random(0), size, "token"),
+    )(parse_matches)
+
+for _size in (100, 10_000):
+    case(
+        f"parse_messages[{_size}]",
+        lambda size=_size: messages_page(random.Random(0), "match", size, "token"),
+    )(parse_messages)
+    case(
+        f"parse_messages[{_size}, bytes]",
+        lambda size=_size: json.dumps(
+            messages_page(random.Random(0), "match", size, "token")
+        ).encode(),
+    )(parse_messages)
+
+case("parse_gender[shown]", lambda: _profile("medium")["results"])(parse_gender)
+case(
+    "parse_gender[custom]",
+    lambda: {"show_gender_on_profile": True, "custom_gender": "X"},
+)(parse_gender)
+
+
+@case(
+    "AdditionalInfo[construct]",
+    lambda: asdict(parse_profile_response(_profile("huge")).additional),
+)
+def _additional_info(values: Dict[str, Any]) -> AdditionalInfo:
+    return AdditionalInfo(**values)
+
+
+@case("Profile[construct]", lambda: parse_profile_response(_profile("huge")))
+def _profile_model(profile: Profile) -> Profile:
+    return Profile(
+        _id=profile._id,
+        bio=profile.bio,
+        birth_date=profile.birth_date,
+        name=profile.name,
+        photos=profile.photos,
+        distance_mi=profile.distance_mi,
+        additional=profile.additional,
+    )
+
+
+@case("Message[construct]", lambda: datetime(2023, 1, 1, tzinfo=timezone.utc))
+def _message_model(sent_date: datetime) -> Message:
+    return Message(
+        _id="id",
+        sent_date=sent_date,
+        message="hey",
+        to_id="a",
+        from_id="b",
+        match_id="m",
+    )
+
+
+@case("Match[construct]", lambda: None)
+def _match_model(_) -> Match:
+    return Match(match_id="m", profile_id="p")
+
+
+def _features_cases() -> None:
+    """
+    features.py helpers, the module needs user's config.py to be importable
+    """
+    try:
+        import features
+    except ImportError as err:
+        print(f"skipping features.py cases: {err}", file=sys.stderr)
+        return
+
+    person = matches_page(random.Random(0), 1)["data"]["matches"][0]["person"]
+    for photo in person["photos"]:
+        photo["successRate"] = 0.5
+    now = datetime(2023, 6, 1)
+    ping = format_date(datetime(2023, 5, 1, 12, 30, tzinfo=timezone.utc))
+
+    case("features.calculate_age", lambda: person["birth_date"])(
+        features.calculate_age
+    )
+    case("features.get_photos", lambda: person)(features.get_photos)
+    case("features.get_avg_successRate", lambda: person)(
+        features.get_avg_successRate
+    )
+    case("features.get_last_activity_date", lambda: ping)(
+        lambda value: features.get_last_activity_date(now, value)
+    )
+
+
+_features_cases()
+
+
+def timeit(
+    run: Callable[[Any], Any], value: Any, min_time: float, repeat: int
+) -> Dict[str, Any]:
+    """
+    Returns best and median seconds per call out of `repeat` timings
+    (garbage collection is disabled while timing, as in timeit)
+    """
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _timeit(run, value, min_time, repeat)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _timeit(
+    run: Callable[[Any], Any], value: Any, min_time: float, repeat: int
+) -> Dict[str, Any]:
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            run(value)
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+        loops *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    timings = [elapsed]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(loops):
+            run(value)
+        timings.append(time.perf_counter() - started)
+    timings = sorted(t / loops for t in timings)
+    return {
+        "best_s": timings[0],
+        "median_s": timings[len(timings) // 2],
+        "loops": loops,
+        "repeat": repeat,
+    }
+
+
+def _commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(
+    filter_text: Optional[str] = None,
+    min_time: float = SuiteDefaults.MIN_TIME,
+    repeat: int = SuiteDefaults.REPEAT,
+) -> Dict[str, Any]:
+    results = {}
+    for bench in CASES:
+        if filter_text and filter_text not in bench.name:
+            continue
+        result = timeit(bench.run, bench.setup(), min_time, repeat)
+        results[bench.name] = result
+        print(f"{bench.name:<44} {result['best_s'] * 1e6:12.2f} us")
+    return {
+        "meta": {
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+
+
+def compare(
+    baseline: Dict[str, Any], current: Dict[str, Any], threshold: float
+) -> List[str]:
+    """
+    Prints relative change of every case, returns names of regressed cases
+    """
+    regressions = []
+    print(
+        f"baseline {baseline['meta'].get('commit')} -> current"
+        f" {current['meta'].get('commit')} (threshold {threshold:.0%})"
+    )
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<44} {'new':>10}")
+            continue
+        change = result["best_s"] / base["best_s"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"{name:<44} {change:>+10.1%}{flag}")
+    for name in baseline["results"].keys() - current["results"].keys():
+        print(f"{name:<44} {'missing':>10}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("--output", help="JSON file to write the results to")
+    run_parser.add_argument("--filter", help="run cases containing this text only")
+    run_parser.add_argument("--quick", action="store_true", help="short timings")
+    run_parser.add_argument("--compare", metavar="BASELINE")
+    run_parser.add_argument("--threshold", type=float, default=SuiteDefaults.THRESHOLD)
+    compare_parser = commands.add_parser("compare")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument(
+        "--threshold", type=float, default=SuiteDefaults.THRESHOLD
+    )
+    args = parser.parse_args()
+
+    if args.command == "run":
+        if args.quick:
+            current = run_suite(args.filter, min_time=0.02, repeat=3)
+        else:
+            current = run_suite(args.filter)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(current, f, indent=2)
+        baseline_path = args.compare
+    else:
+        with open(args.current) as f:
+            current = json.load(f)
+        baseline_path = args.baseline
+
+    if baseline_path is not None:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, current, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s)")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Timestamp parsing throughput: strptime vs parse_datetime vs cached parse_birth_date
+
+python -m benchmarks.timestamps [--size N] [--distinct N]
+"""
+from benchmarks.corpus import random_date
+from datetime import datetime
+from tinder_cli.parse_utils import (
+    DATETIME_FORMAT,
+    parse_birth_date,
+    parse_datetime,
+)
+import argparse
+import random
+import time
+
+
+def measure(name: str, parse, values) -> None:
+    started = time.perf_counter()
+    for value in values:
+        parse(value)
+    elapsed = time.perf_counter() - started
+    print(f"{name:<16} {len(values) / elapsed:>14,.0f} timestamps/s  {elapsed:.2f} s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument(
+        "--distinct",
+        type=int,
+        default=2_000,
+        help="distinct values in the birth date run (repeated birth dates)",
+    )
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    messages = [random_date(rnd) for _ in range(args.size)]
+    births = [random_date(rnd, 1985, 7000) for _ in range(args.distinct)]
+    births = [rnd.choice(births) for _ in range(args.size)]
+
+    print("unique message timestamps")
+    measure("strptime", lambda v: datetime.strptime(v, DATETIME_FORMAT), messages)
+    measure("parse_datetime", parse_datetime, messages)
+    print(f"birth dates ({args.distinct} distinct)")
+    measure("strptime", lambda v: datetime.strptime(v, DATETIME_FORMAT), births)
+    measure("parse_birth_date", parse_birth_date, births)
+
+
+if __name__ == "__main__":
+    main()
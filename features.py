@@ -1,11 +1,13 @@
 # coding=utf-8
 
 from datetime import date, datetime
-from random import random
 from time import sleep
 
 import config
 import tinder_api as api
+from tinder_cli.api import TinderClient
+from tinder_cli.errors import AuthenticationError
+from tinder_cli.ratelimit import HumanJitter
 
 
 '''
@@ -15,10 +17,29 @@ gender, message count, and their average successRate.
 '''
 
 
-def get_match_info():
+def get_match_info(client=None):
+    '''
+    Profiles of matched people are downloaded concurrently (to get their distance)
+    client: TinderClient, by default one sharing the authorized tinder_api session
+    (and its config.host)
+    '''
+    if client is None:
+        auth_token = api.headers.get('X-Auth-Token')
+        if auth_token is None:
+            raise AuthenticationError(
+                "Not authorized, call tinder_api.authverif() first")
+        client = TinderClient(auth_token, transport=api.transport, host=config.host)
     matches = api.get_updates()['matches']
     now = datetime.utcnow()
     match_info = {}
+    distances = {}
+    person_ids = [match['person']['_id'] for match in matches if 'person' in match]
+    for result in client.get_profiles(person_ids):
+        if result.ok:
+            distances[result.key] = result.value.distance_mi
+        else:
+            # distance stays unset, it is not worth another request per profile
+            print("Could not get profile of %s: %r" % (result.key, result.error))
     for match in matches[:len(matches)]:
         try:
             person = match['person']
@@ -33,7 +54,7 @@ def get_match_info():
                 "avg_successRate": get_avg_successRate(person),
                 "messages": match['messages'],
                 "age": calculate_age(match['person']['birth_date']),
-                "distance": api.get_person(person_id)['results']['distance_mi'],
+                "distance": distances.get(person_id),
                 "last_activity_date": match['last_activity_date'],
             }
         except Exception as ex:
@@ -155,8 +176,10 @@ def pause():
     When making many API calls, it is important to pause a...
     realistic amount of time between actions to not make Tinder...
     suspicious!
+    Note: TinderClient already throttles its requests, pass
+    RateLimiter(pacing=HumanJitter()) to it instead of calling this
     '''
-    nap_length = 3 * random()
+    nap_length = HumanJitter(max_delay=3).delay()
     print('Napping for %f seconds...' % nap_length)
     sleep(nap_length)
 
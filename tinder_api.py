@@ -3,6 +3,12 @@ import json
 
 import config
 import requests
+from tinder_cli.transport import HTTPTransport
+
+# all module level calls share pooled keep-alive connections to the api host
+# (and the default timeout of the transport)
+transport = HTTPTransport()
+session = transport.session
 
 get_headers = {
     'app_version': '6.9.4',
@@ -19,11 +25,11 @@ def get_auth_token(fb_auth_token, fb_user_id):
     if "error" in fb_user_id:
         return {"error": "could not retrieve fb_user_id"}
     url = config.host + '/v2/auth/login/facebook'
-    req = requests.post(url,
-                        headers=headers,
-                        data=json.dumps(
-                            {'token': fb_auth_token, 'facebook_id': fb_user_id})
-                        )
+    req = transport.request("POST", url,
+                            headers=headers,
+                            data=json.dumps(
+                                {'token': fb_auth_token, 'facebook_id': fb_user_id})
+                            )
     try:
         tinder_auth_token = req.json()["data"]["api_token"]
         headers.update({"X-Auth-Token": tinder_auth_token})
@@ -47,7 +53,7 @@ def get_recommendations():
     Returns a list of users that you can swipe on
     '''
     try:
-        r = requests.get('https://api.gotinder.com/user/recs', headers=headers)
+        r = transport.request("GET", 'https://api.gotinder.com/user/recs', headers=headers)
         return r.json()
     except requests.exceptions.RequestException as e:
         print("Something went wrong with getting recomendations:", e)
@@ -61,9 +67,9 @@ def get_updates(last_activity_date=""):
     '''
     try:
         url = config.host + '/updates'
-        r = requests.post(url,
-                          headers=headers,
-                          data=json.dumps({"last_activity_date": last_activity_date}))
+        r = transport.request("POST", url,
+                              headers=headers,
+                              data=json.dumps({"last_activity_date": last_activity_date}))
         return r.json()
     except requests.exceptions.RequestException as e:
         print("Something went wrong with getting updates:", e)
@@ -75,7 +81,7 @@ def get_self():
     '''
     try:
         url = config.host + '/profile'
-        r = requests.get(url, headers=headers)
+        r = transport.request("GET", url, headers=headers)
         return r.json()
     except requests.exceptions.RequestException as e:
         print("Something went wrong. Could not get your data:", e)
@@ -95,7 +101,7 @@ def change_preferences(**kwargs):
     '''
     try:
         url = config.host + '/profile'
-        r = requests.post(url, headers=headers, data=json.dumps(kwargs))
+        r = transport.request("POST", url, headers=headers, data=json.dumps(kwargs))
         return r.json()
     except requests.exceptions.RequestException as e:
         print("Something went wrong. Could not change your preferences:", e)
@@ -110,7 +116,7 @@ def get_meta():
     '''
     try:
         url = config.host + '/meta'
-        r = requests.get(url, headers=headers)
+        r = transport.request("GET", url, headers=headers)
         return r.json()
     except requests.exceptions.RequestException as e:
         print("Something went wrong. Could not get your metadata:", e)
@@ -124,7 +130,7 @@ def get_meta_v2():
     '''
     try:
         url = config.host + '/v2/meta'
-        r = requests.get(url, headers=headers)
+        r = transport.request("GET", url, headers=headers)
         return r.json()
     except requests.exceptions.RequestException as e:
         print("Something went wrong. Could not get your metadata:", e)
@@ -136,7 +142,7 @@ def update_location(lat, lon):
     '''
     try:
         url = config.host + '/passport/user/travel'
-        r = requests.post(url, headers=headers, data=json.dumps({"lat": lat, "lon": lon}))
+        r = transport.request("POST", url, headers=headers, data=json.dumps({"lat": lat, "lon": lon}))
         return r.json()
     except requests.exceptions.RequestException as e:
         print("Something went wrong. Could not update your location:", e)
@@ -144,7 +150,7 @@ def update_location(lat, lon):
 def reset_real_location():
     try:
         url = config.host + '/passport/user/reset'
-        r = requests.post(url, headers=headers)
+        r = transport.request("POST", url, headers=headers)
         return r.json()
     except requests.exceptions.RequestException as e:
         print("Something went wrong. Could not update your location:", e)
@@ -156,7 +162,7 @@ def get_recs_v2():
     '''
     try:
         url = config.host + '/v2/recs/core?locale=en-US'
-        r = requests.get(url, headers=headers)
+        r = transport.request("GET", url, headers=headers)
         return r.json()
     except Exception as e:
         print('excepted')
@@ -167,8 +173,8 @@ def set_webprofileusername(username):
     '''
     try:
         url = config.host + '/profile/username'
-        r = requests.put(url, headers=headers,
-                         data=json.dumps({"username": username}))
+        r = transport.request("PUT", url, headers=headers,
+                              data=json.dumps({"username": username}))
         return r.json()
     except requests.exceptions.RequestException as e:
         print("Something went wrong. Could not set webprofile username:", e)
@@ -179,7 +185,7 @@ def reset_webprofileusername(username):
     '''
     try:
         url = config.host + '/profile/username'
-        r = requests.delete(url, headers=headers)
+        r = transport.request("DELETE", url, headers=headers)
         return r.json()
     except requests.exceptions.RequestException as e:
         print("Something went wrong. Could not delete webprofile username:", e)
@@ -190,7 +196,7 @@ def get_person(id):
     '''
     try:
         url = config.host + '/user/%s' % id
-        r = requests.get(url, headers=headers)
+        r = transport.request("GET", url, headers=headers)
         return r.json()
     except requests.exceptions.RequestException as e:
         print("Something went wrong. Could not get that person:", e)
@@ -199,8 +205,8 @@ def get_person(id):
 def send_msg(match_id, msg):
     try:
         url = config.host + '/user/matches/%s' % match_id
-        r = requests.post(url, headers=headers,
-                          data=json.dumps({"message": msg}))
+        r = transport.request("POST", url, headers=headers,
+                              data=json.dumps({"message": msg}))
         return r.json()
     except requests.exceptions.RequestException as e:
         print("Something went wrong. Could not send your message:", e)
@@ -208,7 +214,7 @@ def send_msg(match_id, msg):
 def unmatch(match_id):
     try:
         url = config.host + '/user/matches/%s' % match_id
-        r = requests.delete(url, headers=headers)
+        r = transport.request("DELETE", url, headers=headers)
         return r.json()
     except requests.exceptions.RequestException as e:
         print("Something went wrong. Could not unmatch person:", e)
@@ -216,7 +222,7 @@ def unmatch(match_id):
 def superlike(person_id):
     try:
         url = config.host + '/like/%s/super' % person_id
-        r = requests.post(url, headers=headers)
+        r = transport.request("POST", url, headers=headers)
         return r.json()
     except requests.exceptions.RequestException as e:
         print("Something went wrong. Could not superlike:", e)
@@ -225,7 +231,7 @@ def superlike(person_id):
 def like(person_id):
     try:
         url = config.host + '/like/%s' % person_id
-        r = requests.get(url, headers=get_headers)
+        r = transport.request("GET", url, headers=get_headers)
         return r.json()
     except requests.exceptions.RequestException as e:
         print("Something went wrong. Could not like:", e)
@@ -234,7 +240,7 @@ def like(person_id):
 def dislike(person_id):
     try:
         url = config.host + '/pass/%s' % person_id
-        r = requests.get(url, headers=get_headers)
+        r = transport.request("GET", url, headers=get_headers)
         return r.json()
     except requests.exceptions.RequestException as e:
         print("Something went wrong. Could not dislike:", e)
@@ -249,8 +255,8 @@ def report(person_id, cause, explanation=''):
     '''
     try:
         url = config.host + '/report/%s' % person_id
-        r = requests.post(url, headers=headers, data={
-                          "cause": cause, "text": explanation})
+        r = transport.request("POST", url, headers=headers, data={
+                              "cause": cause, "text": explanation})
         return r.json()
     except requests.exceptions.RequestException as e:
         print("Something went wrong. Could not report:", e)
@@ -259,7 +265,7 @@ def report(person_id, cause, explanation=''):
 def match_info(match_id):
     try:
         url = config.host + '/matches/%s' % match_id
-        r = requests.get(url, headers=headers)
+        r = transport.request("GET", url, headers=headers)
         return r.json()
     except requests.exceptions.RequestException as e:
         print("Something went wrong. Could not get your match info:", e)
@@ -267,7 +273,7 @@ def match_info(match_id):
 def all_matches():
     try:
         url = config.host + '/v2/matches'
-        r = requests.get(url, headers=headers)
+        r = transport.request("GET", url, headers=headers)
         return r.json()
     except requests.exceptions.RequestException as e:
         print("Something went wrong. Could not get your match info:", e)
@@ -275,7 +281,7 @@ def all_matches():
 def fast_match_info():
   try:
       url = config.host + '/v2/fast-match/preview'
-      r = requests.get(url, headers=headers)
+      r = transport.request("GET", url, headers=headers)
       count = r.headers['fast-match-count']
       # image is in the response but its in hex..
       return count
@@ -285,7 +291,7 @@ def fast_match_info():
 def trending_gifs(limit=3):
   try:
       url = config.host + '/giphy/trending?limit=%s' % limit
-      r = requests.get(url, headers=headers)
+      r = transport.request("GET", url, headers=headers)
       return r.json()
   except requests.exceptions.RequestException as e:
       print("Something went wrong. Could not get the trending gifs:", e)
@@ -293,7 +299,7 @@ def trending_gifs(limit=3):
 def gif_query(query, limit=3):
   try:
       url = config.host + '/giphy/search?limit=%s&query=%s' % (limit, query)
-      r = requests.get(url, headers=headers)
+      r = transport.request("GET", url, headers=headers)
       return r.json()
   except requests.exceptions.RequestException as e:
       print("Something went wrong. Could not get your gifs:", e)
@@ -302,7 +308,7 @@ def gif_query(query, limit=3):
 # def see_friends():
 #     try:
 #         url = config.host + '/group/friends'
-#         r = requests.get(url, headers=headers)
+#         r = transport.request("GET", url, headers=headers)
 #         return r.json()['results']
 #     except requests.exceptions.RequestException as e:
 #         print("Something went wrong. Could not get your Facebook friends:", e)
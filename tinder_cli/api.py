@@ -1,9 +1,49 @@
-from typing import Literal, Dict, Optional, List, Tuple
-from .parse_utils import parse_profile_response, parse_matches, parse_messages
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+)
+from .parse_utils import (
+    parse_matches_stream,
+    parse_messages_stream,
+    parse_updates_stream,
+    StreamedUpdates,
+)
+from .jsonstream import StreamDefaults, StreamedPage
 from .models import Profile, Match, Message
+from .transport import HTTPTransport, Transport
+from .ratelimit import RateLimiter
+from .resilience import RetryPolicy, CircuitBreaker
+from .errors import TinderAPIError
+from .pagination import iter_paginated, PaginationDefaults
+from .bulk import run_bulk, BulkResult, BulkDefaults
+from .cache import ResponseCache
+from .store import ProfileStore
+from .seen import SeenFilter
+from .codec import JSONCodec, get_codec
+from .metrics import ClientMetrics
+from .hooks import HookChain, RequestHook, Span
+from collections import Counter
+from .pipeline import (
+    Call,
+    Defaults,
+    RequestPipeline,
+    TinderCalls,
+    TinderSMSApiEndpoints,
+    TinderSMSCalls,
+)
 import requests
-import json
 import logging
+import threading
+import time
 
 
 logging.basicConfig(
@@ -12,44 +52,87 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-class Defaults:
-    APP_VERSION = "6.9.4"
-    PLATFORM = "ios"
-    USER_AGENT = "Tinder/7.5.3 (iPhone; iOS 10.3.2; Scale/2.00)"
+class _StreamedBody:
+    """
+    Raw chunks of a streamed response. The connection is released once the
+    body is read to the end or closed, even if it was never iterated.
+    """
 
+    def __init__(
+        self, rsp: requests.Response, received: Optional[Callable[[int], None]] = None
+    ) -> None:
+        self._rsp = rsp
+        self._received = received
+        self._size = 0
+        self._closed = False
 
-class TinderSMSApiEndpoints:
-    HOST = "https://api.gotinder.com"
-    CODE_REQUEST_URL = f"{HOST}/v2/auth/sms/send?auth_type=sms"
-    CODE_VALIDATE_URL = f"{HOST}/v2/auth/sms/validate?auth_type=sms"
-    TOKEN_URL = f"{HOST}/v2/auth/login/sms"
+    def __iter__(self) -> Iterator[bytes]:
+        try:
+            for chunk in self._rsp.iter_content(StreamDefaults.CHUNK_SIZE):
+                self._size += len(chunk)
+                yield chunk
+        finally:
+            self.close()
 
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._rsp.close()
+        if self._received is not None:
+            self._received(self._size)
 
-class BaseTinderClient:
-    app_version: str
-    platform: str
-    user_agent: str
+
+class BaseTinderClient(RequestPipeline):
+    transport: Transport
 
     def __init__(
         self,
         app_version: str = Defaults.APP_VERSION,
         platform: str = Defaults.PLATFORM,
         user_agent: str = Defaults.USER_AGENT,
+        transport: Optional[Transport] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        json_codec: Optional[JSONCodec] = None,
+        host: Optional[str] = None,
+        metrics: Optional[ClientMetrics] = None,
+        hooks: Optional[Sequence[RequestHook]] = None,
     ) -> None:
-        self.app_version = app_version
-        self.platform = platform
-        self.user_agent = user_agent
+        super().__init__(
+            app_version,
+            platform,
+            user_agent,
+            # share one rate limiter between clients of the same account
+            rate_limiter if rate_limiter is not None else RateLimiter(),
+            retry_policy if retry_policy is not None else RetryPolicy(),
+            circuit_breaker if circuit_breaker is not None else CircuitBreaker(),
+            # fastest installed JSON backend, counts encode / decode time of the client
+            json_codec if json_codec is not None else get_codec(),
+            # API host, ex. local mock server (benchmarks.mock_server)
+            host if host is not None else TinderSMSApiEndpoints.HOST,
+            # requests, latencies and parse times are recorded only with metrics
+            metrics,
+            # lifecycle hooks get a span of every call, none are run by default
+            HookChain(hooks) if hooks else None,
+        )
+        # transport passed from outside is shared and it is closed by its owner
+        self._owns_transport = transport is None
+        self.transport = transport if transport is not None else HTTPTransport()
 
-    def get_headers(self) -> Dict[str, str]:
+    def close(self) -> None:
         """
-        Returns the headers for the Tinder API
+        Releases pooled connections owned by the client
         """
-        return {
-            "app_version": self.app_version,
-            "platform": self.platform,
-            "content-type": "application/json",
-            "User-agent": self.user_agent,
-        }
+        if self._owns_transport:
+            self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     def general_request(
         self,
@@ -57,21 +140,115 @@ class BaseTinderClient:
         method: Literal["GET", "POST", "PUT", "DELETE"],
         err_msg: str,
         data: Optional[Dict[str, str]] = None,
+        idempotent: Optional[bool] = None,
+        stream: bool = False,
+        parser: Optional[Callable[[Any], Any]] = None,
         **kwargs,
-    ) -> Dict[str, str]:
+    ) -> Any:
         """
         Handles general request to the Tinder API
+        Transient errors of idempotent requests (GET, PUT, DELETE unless
+        `idempotent` says otherwise) are retried with exponential backoff.
+        Raises TinderAPIError subclass when the request finally fails.
+        With stream=True the body is not decoded, iterator of its raw chunks
+        is returned instead (its span finishes before the body is read).
+        With `parser` the decoded response is parsed and the result returned.
+        """
+        body, idempotent, span = self._begin(url, method, data, idempotent)
+        attempt = 0
+        try:
+            while True:
+                try:
+                    res = self._send(url, method, body, stream, span, **kwargs)
+                    break
+                except TinderAPIError as err:
+                    delay = self._retry_delay(
+                        err, attempt, idempotent, url, err_msg, span
+                    )
+                    if delay is None:
+                        raise
+                    time.sleep(delay)
+                    attempt += 1
+            if parser is not None:
+                res = self._parse(parser, res, span)
+        except BaseException as err:
+            # also on cancellation, hooks (ex. profiler) rely on finish being called
+            self._finish(span, err)
+            raise
+        self._finish(span)
+        return res
+
+    def _send(
+        self,
+        url: str,
+        method: str,
+        body: Optional[bytes],
+        stream: bool,
+        span: Optional[Span] = None,
+        **kwargs,
+    ) -> Dict[str, str]:
         """
+        Sends single attempt of the request and decodes its JSON response
+        """
+        probe = self.circuit_breaker.before_request(url)
         try:
-            data = json.dumps(data) if data else None
-            req_collable = getattr(requests, method.lower())
-            rsp = req_collable(url, headers=self.get_headers(), data=data, **kwargs)
-            return rsp.json()
+            return self._attempt(url, method, body, stream, span, **kwargs)
+        except BaseException:
+            # probe interrupted before its answer must not keep the circuit half-open
+            if probe:
+                self.circuit_breaker.record_aborted(url)
+            raise
+
+    def _attempt(
+        self,
+        url: str,
+        method: str,
+        body: Optional[bytes],
+        stream: bool,
+        span: Optional[Span],
+        **kwargs,
+    ) -> Dict[str, str]:
+        waited = time.perf_counter()
+        self.rate_limiter.acquire(method, url)
+        self._before_send(span, waited)
+        started = time.perf_counter()
+        try:
+            rsp = self.transport.request(
+                method,
+                url,
+                headers=self.get_headers(),
+                data=body,
+                stream=stream,
+                **kwargs,
+            )
+        except TinderAPIError:
+            # transport answered itself (ex. request missing in replayed cassette)
+            self._observe_send(url, method, body, time.perf_counter() - started, span)
+            raise
         except requests.exceptions.RequestException as err:
-            logger.error("%s:\n %s", err_msg, err)
-
-
-class TinderSMSAuth(BaseTinderClient):
+            elapsed = time.perf_counter() - started
+            raise self._network_error(
+                url, method, body, elapsed, span, str(err)
+            ) from err
+        elapsed = time.perf_counter() - started
+        content = None if stream else rsp.content
+        self._observe_send(
+            url, method, body, elapsed, span, rsp.status_code, content
+        )
+        try:
+            self._check_status(url, method, rsp.status_code, rsp.headers)
+        except TinderAPIError:
+            rsp.close()
+            raise
+        if stream:
+            metrics = self.metrics
+            if metrics is None:
+                return _StreamedBody(rsp)
+            return _StreamedBody(rsp, lambda size: metrics.observe_received(url, size))
+        return self._decode(url, rsp.status_code, content, span)
+
+
+class TinderSMSAuth(TinderSMSCalls, BaseTinderClient):
     """
     Handles the SMS authentication flow
     """
@@ -88,64 +265,68 @@ class TinderSMSAuth(BaseTinderClient):
         app_version: Optional[str] = Defaults.APP_VERSION,
         platform: Optional[str] = Defaults.PLATFORM,
         user_agent: Optional[str] = Defaults.USER_AGENT,
+        transport: Optional[Transport] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        json_codec: Optional[JSONCodec] = None,
+        host: Optional[str] = None,
+        metrics: Optional[ClientMetrics] = None,
+        hooks: Optional[Sequence[RequestHook]] = None,
     ):
-        super().__init__(app_version, platform, user_agent)
+        super().__init__(
+            app_version,
+            platform,
+            user_agent,
+            transport,
+            rate_limiter,
+            retry_policy,
+            circuit_breaker,
+            json_codec,
+            host,
+            metrics,
+            hooks,
+        )
         self.phone_number = phone_number
+        self.refresh_token = None
 
     def request_otp_sms(self) -> Dict[str, str]:
         """
         Requests an OTP (One Time Password) SMS to be sent to the given phone number.
         """
-        return self.general_request(
-            url=TinderSMSApiEndpoints.CODE_REQUEST_URL,
-            method="POST",
-            data={"phone_number": self.phone_number},
-            err_msg="Failed to request OTP SMS",
-            verify=False,
-        )
+        return self.general_request(**self._request_otp_sms_call(), verify=False)
 
     def get_refresh_token(self, otp_code: str):
         """
         Retrieves the refresh token from the server.
         """
-
         rsp = self.general_request(
-            url=TinderSMSApiEndpoints.CODE_VALIDATE_URL,
-            method="POST",
-            data={"otp_code": otp_code, "phone_number": self.phone_number},
-            err_msg="Failed to get refresh token",
-            verify=False,
+            **self._get_refresh_token_call(otp_code), verify=False
         )
-
-        if rsp.get("data")["validated"] is False:
-            raise ValueError("OTP code is not valid")
-        self.refresh_token = rsp.get("data")["refresh_token"]
+        self._set_refresh_token(rsp)
 
     def get_auth_token(self) -> str:
         """
         Retrieves the auth token from the server.
         """
-        if self.refresh_token is None:
-            raise ValueError("Refresh token is not obtained yet")
-        rsp = self.general_request(
-            TinderSMSApiEndpoints.TOKEN_URL,
-            data={"refresh_token": self.refresh_token},
-            err_msg="Failed to get API auth token",
-            method="POST",
-            verify=False,
-        )
+        rsp = self.general_request(**self._get_auth_token_call(), verify=False)
         return rsp["data"]["api_token"]
 
 
 class TinderFBAuth(BaseTinderClient):
-    
+    """
+    Handles the Facebook authentication flow (not implemented yet)
+    """
 
 
-class TinderClient(BaseTinderClient):
+class TinderClient(TinderCalls, BaseTinderClient):
     auth_token: str
     app_version: str
     platform: str
     user_agent: str
+    cache: Optional[ResponseCache]
+    store: Optional[ProfileStore]
+    seen: Optional[SeenFilter]
 
     def __init__(
         self,
@@ -153,28 +334,58 @@ class TinderClient(BaseTinderClient):
         app_version: Optional[str] = Defaults.APP_VERSION,
         platform: Optional[str] = Defaults.PLATFORM,
         user_agent: Optional[str] = Defaults.USER_AGENT,
+        transport: Optional[Transport] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        json_codec: Optional[JSONCodec] = None,
+        cache: Optional[ResponseCache] = None,
+        store: Optional[ProfileStore] = None,
+        seen: Optional[SeenFilter] = None,
+        host: Optional[str] = None,
+        metrics: Optional[ClientMetrics] = None,
+        hooks: Optional[Sequence[RequestHook]] = None,
     ):
-        super().__init__(app_version, platform, user_agent)
+        super().__init__(
+            app_version,
+            platform,
+            user_agent,
+            transport,
+            rate_limiter,
+            retry_policy,
+            circuit_breaker,
+            json_codec,
+            host,
+            metrics,
+            hooks,
+        )
         self.auth_token = auth_token
-
-    def get_headers(self) -> Dict[str, str]:
-        return {
-            "app_version": self.app_version,
-            "platform": self.platform,
-            "content-type": "application/json",
-            "User-agent": self.user_agent,
-            "X-Auth-Token": self.auth_token,
-        }
+        # responses of read endpoints are cached only when cache is given
+        self.cache = cache
+        # persistent store is read before going to the network and updated after
+        self.store = store
+        # profiles already swiped on are skipped without calling the API
+        self.seen = seen
+        self.unknown_descriptors = Counter()
+        self._unknown_lock = threading.Lock()
+
+    def _cached(self, endpoint: str, key: Hashable, load: Callable[[], Any]) -> Any:
+        """
+        Returns cached result of the endpoint or loads and caches it
+        """
+        if self.cache is None:
+            return load()
+        found, value = self._cache_lookup(endpoint, key)
+        if not found:
+            value = load()
+            self.cache.set(endpoint, key, value)
+        return value
 
     def get_recommendations(self):
         """
         Returns a list of users that you can swipe on
         """
-        return self.general_request(
-            f"{TinderSMSApiEndpoints.HOST}/users/recs",
-            method="GET",
-            err_msg="Something went wrong with getting recomendations",
-        )
+        return self.general_request(**self._get_recommendations_call())
 
     def get_updates(self, last_activity_date=""):
         """
@@ -182,23 +393,15 @@ class TinderClient(BaseTinderClient):
         The last activity date is defaulted at the beginning of time.
         Format for last_activity_date: "2017-07-09T10:28:13.392Z"
         """
-        return self.general_request(
-            f"{TinderSMSApiEndpoints.HOST}/updates",
-            method="POST",
-            err_msg="Something went wrong with getting updates",
-            data={"last_activity_date": last_activity_date},
-        )
+        return self.general_request(**self._get_updates_call(last_activity_date))
 
     def get_self(self):
         """
         Returns your own profile data
         """
-        res = self.general_request(
-            f"{TinderSMSApiEndpoints.HOST}/profile",
-            method="GET",
-            err_msg="Something went wrong with getting your data",
+        return self._cached(
+            "get_self", None, lambda: self.general_request(**self._get_self_call())
         )
-        return res
 
     def change_preferences(self, **kwargs):
         """
@@ -212,12 +415,10 @@ class TinderClient(BaseTinderClient):
         discoverable: true | false
         {"photo_optimizer_enabled":false}
         """
-        return self.general_request(
-            f"{TinderSMSApiEndpoints.HOST}/profile",
-            method="POST",
-            err_msg="Something went wrong with changing your preferences",
-            data=kwargs,
-        )
+        res = self.general_request(**self._change_preferences_call(kwargs))
+        self.invalidate("get_self")
+        self.invalidate("get_meta")
+        return res
 
     def get_meta(self):
         """
@@ -226,10 +427,8 @@ class TinderClient(BaseTinderClient):
         'status', 'groups', 'products', 'rating', 'tutorials',
         'travel', 'notifications', 'user']
         """
-        return self.general_request(
-            f"{TinderSMSApiEndpoints.HOST}/meta",
-            method="GET",
-            err_msg="Something went wrong with getting your metadata",
+        return self._cached(
+            "get_meta", None, lambda: self.general_request(**self._get_meta_call())
         )
 
     def update_location(self, lat, lon):
@@ -237,90 +436,103 @@ class TinderClient(BaseTinderClient):
         Updates your location to the given float inputs
         Note: Requires a passport / Tinder Plus
         """
-        self.general_request(
-            f"{TinderSMSApiEndpoints.HOST}/passport/user/travel",
-            method="POST",
-            err_msg="Something went wrong with updating your location",
-            data={"lat": lat, "lon": lon},
-        )
+        self.general_request(**self._update_location_call(lat, lon))
+        self._location_changed()
+        if self.store is not None:
+            self.store.mark_profiles_stale()
 
     def reset_real_location(self):
-        return self.general_request(
-            f"{TinderSMSApiEndpoints.HOST}/passport/user/reset",
-            method="POST",
-            err_msg="Something went wrong with resetting your location",
-        )
+        res = self.general_request(**self._reset_real_location_call())
+        self._location_changed()
+        if self.store is not None:
+            self.store.mark_profiles_stale()
+        return res
 
     def get_recommendations_v2(self):
         """
         This works more consistently then the normal get_recommendations becuase it seeems to check new location
         """
-        return self.general_request(
-            f"{TinderSMSApiEndpoints.HOST}/v2/recs/core?locale=en-US",
-            method="GET",
-            err_msg="Something went wrong with getting recomendations",
-        )
+        return self.general_request(**self._get_recommendations_v2_call())
 
     def set_webprofileusername(self, username: str):
         """
         Sets the username for the webprofile: https://www.gotinder.com/@YOURUSERNAME
         """
-        return self.general_request(
-            f"{TinderSMSApiEndpoints.HOST}/profile/{username}",
-            method="PUT",
-            err_msg="Something went wrong with setting your webprofile username",
-            data={"username": username},
-        )
+        res = self.general_request(**self._set_webprofileusername_call(username))
+        self.invalidate("get_self")
+        return res
 
     def reset_webprofileusername(self, username: str):
         """
         Resets the username for the webprofile
         """
-        return self.general_request(
-            f"{TinderSMSApiEndpoints.HOST}/profile/{username}",
-            method="DELETE",
-            err_msg="Something went wrong with resetting your webprofile username",
-        )
+        res = self.general_request(**self._reset_webprofileusername_call(username))
+        self.invalidate("get_self")
+        return res
 
     def get_profile(self, person_id: str) -> Profile:
         """
         Gets a user's profile via their id
         """
-        res = self.general_request(
-            f"{TinderSMSApiEndpoints.HOST}/user/{person_id}",
-            method="GET",
-            err_msg="Something went wrong with getting that person",
+        return self._cached(
+            "get_profile", person_id, lambda: self._load_profile(person_id)
         )
-        return parse_profile_response(res)
+
+    def _load_profile(self, person_id: str) -> Profile:
+        if self.store is not None:
+            profile = self.store.get_profile(person_id)
+            if profile is not None:
+                return profile
+        profile = self.general_request(**self._get_profile_call(person_id))
+        if self.store is not None:
+            self.store.upsert_profile(profile)
+        return profile
+
+    def get_profiles(
+        self,
+        person_ids: Iterable[str],
+        concurrency: int = BulkDefaults.CONCURRENCY,
+        ordered: bool = True,
+    ) -> Iterator[BulkResult[str, Profile]]:
+        """
+        Gets profiles of many users concurrently.
+        Yields one BulkResult per id (in input order or as completed), failed
+        requests are reported in the result instead of aborting the batch.
+        Keep `concurrency` below the transport pool size to reuse connections.
+        """
+        return run_bulk(self.get_profile, person_ids, concurrency, ordered)
 
     def send_msg(self, match_id: str, msg: str):
-        return self.general_request(
-            f"{TinderSMSApiEndpoints.HOST}/user/matches/{match_id}",
-            method="POST",
-            err_msg="Something went wrong. Could not send your message",
-            data={"message": msg},
-        )
+        res = self.general_request(**self._send_msg_call(match_id, msg))
+        self.invalidate("match_info", match_id)
+        return res
+
+    def _swipe(self, person_id: str, call: Call):
+        """
+        Sends the swipe unless the profile was already swiped on (only when seen
+        filter is set). Concurrent swipes of the same profile are sent once.
+        """
+        if self.seen is None:
+            return self.general_request(**call)
+        if not self.seen.reserve(person_id):
+            logger.debug("Skipping already seen profile %s", person_id)
+            return None
+        swiped = False
+        try:
+            rsp = self.general_request(**call)
+            swiped = True
+            return rsp
+        finally:
+            self.seen.release(person_id, swiped)
 
     def superlike(self, person_id: str):
-        return self.general_request(
-            f"{TinderSMSApiEndpoints.HOST}/like/{person_id}/super",
-            method="POST",
-            err_msg="Something went wrong. Could not superlike",
-        )
+        return self._swipe(person_id, self._superlike_call(person_id))
 
     def like(self, person_id: str):
-        return self.general_request(
-            f"{TinderSMSApiEndpoints.HOST}/like/{person_id}",
-            method="GET",
-            err_msg="Something went wrong. Could not like",
-        )
+        return self._swipe(person_id, self._like_call(person_id))
 
     def dislike(self, person_id: str):
-        return self.general_request(
-            f"{TinderSMSApiEndpoints.HOST}/pass/{person_id}",
-            method="GET",
-            err_msg="Something went wrong. Could not dislike",
-        )
+        return self._swipe(person_id, self._dislike_call(person_id))
 
     def report(self, person_id: str, cause: Literal[0, 1, 4], explanation: str):
         """
@@ -330,17 +542,14 @@ class TinderClient(BaseTinderClient):
             4 : Inappropriate Photos and no explanation
         """
         return self.general_request(
-            f"{TinderSMSApiEndpoints.HOST}/report/{person_id}",
-            method="POST",
-            err_msg="Something went wrong. Could not report",
-            data={"cause": cause, "text": explanation},
+            **self._report_call(person_id, cause, explanation)
         )
 
     def match_info(self, match_id: str):
-        return self.general_request(
-            f"{TinderSMSApiEndpoints.HOST}/v2/matches/{match_id}?locale=en&is_tinder_u=false",
-            method="GET",
-            err_msg="Something went wrong. Could not get your match info",
+        return self._cached(
+            "match_info",
+            match_id,
+            lambda: self.general_request(**self._match_info_call(match_id)),
         )
 
     def get_matches(
@@ -349,16 +558,12 @@ class TinderClient(BaseTinderClient):
         """
         Returns a list of matches and the next page token if there is one
         """
-        url = f"{TinderSMSApiEndpoints.HOST}/v2/matches?locale=en&count={limit}&is_tinder_u=false"
-        if next_page_token is not None:
-            url += f"&page_token={next_page_token}"
-
-        res = self.general_request(
-            url,
-            method="GET",
-            err_msg="Something went wrong. Could not get your match info",
+        matches, next_page_token = self.general_request(
+            **self._get_matches_call(limit, next_page_token)
         )
-        return parse_matches(res)
+        if self.store is not None:
+            self.store.upsert_matches(matches)
+        return matches, next_page_token
 
     def get_messages(
         self, match_id: str, limit: int = 60, next_page_token: Optional[str] = None
@@ -366,13 +571,71 @@ class TinderClient(BaseTinderClient):
         """
         Returns a list of messages and the next page token if there is one
         """
-        url = f"{TinderSMSApiEndpoints.HOST}/v2/matches/{match_id}/messages?locale=en&count={limit}"
-        if next_page_token is not None:
-            url += f"&page_token={next_page_token}"
+        messages, next_page_token = self.general_request(
+            **self._get_messages_call(match_id, limit, next_page_token)
+        )
+        if self.store is not None:
+            self.store.upsert_messages(messages)
+        return messages, next_page_token
+
+    def stream_matches(
+        self, limit: int = 60, next_page_token: Optional[str] = None
+    ) -> StreamedPage[Match]:
+        """
+        Streaming variant of get_matches for very large pages, matches are
+        decoded one by one while iterating the result (they are not stored).
+        Next page token is available after the iteration.
+        The page holds a pooled connection until it is read to the end, use it
+        as a context manager (or close it) when it may be dropped earlier.
+        """
+        call = self._stream(self._get_matches_call(limit, next_page_token))
+        return parse_matches_stream(self.general_request(**call))
 
-        res = self.general_request(
-            url,
-            method="GET",
-            err_msg="Something went wrong. Could not get your match info",
+    def stream_messages(
+        self, match_id: str, limit: int = 60, next_page_token: Optional[str] = None
+    ) -> StreamedPage[Message]:
+        """
+        Streaming variant of get_messages, see stream_matches
+        """
+        call = self._stream(self._get_messages_call(match_id, limit, next_page_token))
+        return parse_messages_stream(self.general_request(**call))
+
+    def stream_updates(self, last_activity_date: str = "") -> StreamedUpdates:
+        """
+        Streaming variant of get_updates, yields Match and Message objects one
+        by one, unmatched ids and last activity date are set after the iteration
+        (close it as stream_matches)
+        """
+        call = self._stream(self._get_updates_call(last_activity_date))
+        return parse_updates_stream(self.general_request(**call))
+
+    def iter_matches(
+        self,
+        page_size: int = 60,
+        max_items: Optional[int] = None,
+        max_buffered_pages: int = PaginationDefaults.MAX_BUFFERED_PAGES,
+    ) -> Iterator[Match]:
+        """
+        Yields all matches one by one, next page is prefetched in the background
+        """
+        return iter_paginated(
+            lambda token: self.get_matches(page_size, token),
+            max_items=max_items,
+            max_buffered_pages=max_buffered_pages,
+        )
+
+    def iter_messages(
+        self,
+        match_id: str,
+        page_size: int = 60,
+        max_items: Optional[int] = None,
+        max_buffered_pages: int = PaginationDefaults.MAX_BUFFERED_PAGES,
+    ) -> Iterator[Message]:
+        """
+        Yields all messages of a match one by one, next page is prefetched in the background
+        """
+        return iter_paginated(
+            lambda token: self.get_messages(match_id, page_size, token),
+            max_items=max_items,
+            max_buffered_pages=max_buffered_pages,
         )
-        return parse_messages(res)
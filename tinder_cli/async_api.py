@@ -0,0 +1,665 @@
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+)
+from .parse_utils import (
+    parse_matches_stream,
+    parse_messages_stream,
+    parse_updates_stream,
+    StreamedUpdates,
+)
+from .jsonstream import StreamedPage
+from .models import Profile, Match, Message
+from .transport import AsyncResponse, AsyncTransport, PoolDefaults, Timeout
+from .ratelimit import RateLimiter
+from .resilience import RetryPolicy, CircuitBreaker
+from .errors import TinderAPIError
+from .pagination import aiter_paginated, PaginationDefaults
+from .bulk import arun_bulk, BulkResult, BulkDefaults
+from .cache import ResponseCache
+from .store import ProfileStore
+from .seen import SeenFilter
+from .codec import JSONCodec, get_codec
+from .metrics import ClientMetrics
+from .hooks import HookChain, RequestHook, Span
+from collections import Counter
+from .pipeline import (
+    Call,
+    Defaults,
+    RequestPipeline,
+    TinderCalls,
+    TinderSMSApiEndpoints,
+    TinderSMSCalls,
+)
+import asyncio
+import aiohttp
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncDefaults:
+    # maximum number of requests in flight per client
+    MAX_CONCURRENCY = 32
+
+
+class AIOHTTPTransport(AsyncTransport):
+    """
+    Connection-pooling aiohttp transport used by the async Tinder clients.
+
+    The session is created on the first request (it has to be created inside
+    of the running event loop). Session passed from outside is shared and it
+    is closed by its owner.
+    """
+
+    pool_maxsize: int
+    timeout: Timeout
+
+    def __init__(
+        self,
+        pool_maxsize: int = PoolDefaults.POOL_MAXSIZE,
+        session: Optional[aiohttp.ClientSession] = None,
+        timeout: Timeout = PoolDefaults.TIMEOUT,
+    ) -> None:
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self._owns_session = session is None
+        self._session = session
+        self._closed = False
+
+    def _client_timeout(self) -> aiohttp.ClientTimeout:
+        if self.timeout is None:
+            return aiohttp.ClientTimeout(total=None)
+        if isinstance(self.timeout, tuple):
+            connect, read = self.timeout
+        else:
+            connect = read = self.timeout
+        return aiohttp.ClientTimeout(total=None, sock_connect=connect, sock_read=read)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit_per_host=self.pool_maxsize)
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=self._client_timeout()
+            )
+        return self._session
+
+    async def request(self, method: str, url: str, **kwargs) -> AsyncResponse:
+        """
+        Sends request over pooled connection and reads the whole body
+        """
+        if self._closed:
+            raise RuntimeError("Transport is already closed")
+        async with self._get_session().request(method, url, **kwargs) as rsp:
+            return rsp.status, rsp.headers, await rsp.read()
+
+    async def close(self) -> None:
+        """
+        Closes all pooled connections (of the session created by the transport)
+        """
+        if not self._closed:
+            if self._owns_session and self._session is not None:
+                await self._session.close()
+            self._session = None
+            self._closed = True
+
+
+class AsyncBaseTinderClient(RequestPipeline):
+    """
+    asyncio counterpart of BaseTinderClient
+
+    All requests of a client share one transport (by default aiohttp session
+    with its keep-alive connection pool) and at most `max_concurrency` of them
+    are in flight at once. `pool_maxsize` and `session` configure the default
+    transport only.
+    """
+
+    max_concurrency: int
+    pool_maxsize: int
+    transport: AsyncTransport
+
+    def __init__(
+        self,
+        app_version: str = Defaults.APP_VERSION,
+        platform: str = Defaults.PLATFORM,
+        user_agent: str = Defaults.USER_AGENT,
+        max_concurrency: int = AsyncDefaults.MAX_CONCURRENCY,
+        pool_maxsize: int = PoolDefaults.POOL_MAXSIZE,
+        session: Optional[aiohttp.ClientSession] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        json_codec: Optional[JSONCodec] = None,
+        host: Optional[str] = None,
+        metrics: Optional[ClientMetrics] = None,
+        hooks: Optional[Sequence[RequestHook]] = None,
+        transport: Optional[AsyncTransport] = None,
+    ) -> None:
+        super().__init__(
+            app_version,
+            platform,
+            user_agent,
+            # rate limiter can be shared with sync clients of the same account
+            rate_limiter if rate_limiter is not None else RateLimiter(),
+            retry_policy if retry_policy is not None else RetryPolicy(),
+            circuit_breaker if circuit_breaker is not None else CircuitBreaker(),
+            json_codec if json_codec is not None else get_codec(),
+            host if host is not None else TinderSMSApiEndpoints.HOST,
+            metrics,
+            HookChain(hooks) if hooks else None,
+        )
+        self.max_concurrency = max_concurrency
+        self.pool_maxsize = pool_maxsize
+        # transport passed from outside is shared and it is closed by its owner
+        self._owns_transport = transport is None
+        self.transport = (
+            transport
+            if transport is not None
+            else AIOHTTPTransport(pool_maxsize=pool_maxsize, session=session)
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # semaphore has to be created inside of the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def general_request(
+        self,
+        url: str,
+        method: Literal["GET", "POST", "PUT", "DELETE"],
+        err_msg: str,
+        data: Optional[Dict[str, str]] = None,
+        idempotent: Optional[bool] = None,
+        stream: bool = False,
+        parser: Optional[Callable[[Any], Any]] = None,
+        **kwargs,
+    ) -> Any:
+        """
+        Handles general request to the Tinder API, see BaseTinderClient.general_request
+        With stream=True the raw body is returned instead of the decoded one
+        (the async transports read the whole body).
+        """
+        body, idempotent, span = self._begin(url, method, data, idempotent)
+        attempt = 0
+        try:
+            while True:
+                try:
+                    res = await self._send(url, method, body, stream, span, **kwargs)
+                    break
+                except TinderAPIError as err:
+                    delay = self._retry_delay(
+                        err, attempt, idempotent, url, err_msg, span
+                    )
+                    if delay is None:
+                        raise
+                    await asyncio.sleep(delay)
+                    attempt += 1
+            if parser is not None:
+                res = self._parse(parser, res, span)
+        except BaseException as err:
+            # also on cancellation, hooks (ex. profiler) rely on finish being called
+            self._finish(span, err)
+            raise
+        self._finish(span)
+        return res
+
+    async def _send(
+        self,
+        url: str,
+        method: str,
+        body: Optional[bytes],
+        stream: bool,
+        span: Optional[Span] = None,
+        **kwargs,
+    ) -> Dict[str, str]:
+        """
+        Sends single attempt of the request and decodes its JSON response
+        """
+        probe = self.circuit_breaker.before_request(url)
+        try:
+            return await self._attempt(url, method, body, stream, span, **kwargs)
+        except BaseException:
+            # probe cancelled before its answer must not keep the circuit half-open
+            if probe:
+                self.circuit_breaker.record_aborted(url)
+            raise
+
+    async def _attempt(
+        self,
+        url: str,
+        method: str,
+        body: Optional[bytes],
+        stream: bool,
+        span: Optional[Span],
+        **kwargs,
+    ) -> Dict[str, str]:
+        waited = time.perf_counter()
+        semaphore = self._get_semaphore()
+        await self.rate_limiter.acquire_async(method, url)
+        started = time.perf_counter()
+        try:
+            async with semaphore:
+                # time spent waiting for the semaphore is not network time
+                self._before_send(span, waited)
+                started = time.perf_counter()
+                status, headers, content = await self.transport.request(
+                    method, url, headers=self.get_headers(), data=body, **kwargs
+                )
+        except TinderAPIError:
+            # transport answered itself (ex. request missing in replayed cassette)
+            self._observe_send(url, method, body, time.perf_counter() - started, span)
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            elapsed = time.perf_counter() - started
+            raise self._network_error(
+                url, method, body, elapsed, span, repr(err)
+            ) from err
+        elapsed = time.perf_counter() - started
+        self._observe_send(url, method, body, elapsed, span, status, content)
+        self._check_status(url, method, status, headers)
+        if stream:
+            return content
+        return self._decode(url, status, content, span)
+
+    async def close(self) -> None:
+        """
+        Releases pooled connections owned by the client
+        """
+        if self._owns_transport:
+            await self.transport.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+
+class AsyncTinderSMSAuth(TinderSMSCalls, AsyncBaseTinderClient):
+    """
+    Handles the SMS authentication flow
+    """
+
+    phone_number: str
+    refresh_token: Optional[str]
+
+    def __init__(
+        self,
+        phone_number: int,
+        app_version: Optional[str] = Defaults.APP_VERSION,
+        platform: Optional[str] = Defaults.PLATFORM,
+        user_agent: Optional[str] = Defaults.USER_AGENT,
+        session: Optional[aiohttp.ClientSession] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        json_codec: Optional[JSONCodec] = None,
+        host: Optional[str] = None,
+        metrics: Optional[ClientMetrics] = None,
+        hooks: Optional[Sequence[RequestHook]] = None,
+        transport: Optional[AsyncTransport] = None,
+    ):
+        super().__init__(
+            app_version,
+            platform,
+            user_agent,
+            session=session,
+            rate_limiter=rate_limiter,
+            retry_policy=retry_policy,
+            circuit_breaker=circuit_breaker,
+            json_codec=json_codec,
+            host=host,
+            metrics=metrics,
+            hooks=hooks,
+            transport=transport,
+        )
+        self.phone_number = phone_number
+        self.refresh_token = None
+
+    async def request_otp_sms(self) -> Dict[str, str]:
+        """
+        Requests an OTP (One Time Password) SMS to be sent to the given phone number.
+        """
+        return await self.general_request(**self._request_otp_sms_call(), ssl=False)
+
+    async def get_refresh_token(self, otp_code: str):
+        """
+        Retrieves the refresh token from the server.
+        """
+        rsp = await self.general_request(
+            **self._get_refresh_token_call(otp_code), ssl=False
+        )
+        self._set_refresh_token(rsp)
+
+    async def get_auth_token(self) -> str:
+        """
+        Retrieves the auth token from the server.
+        """
+        rsp = await self.general_request(**self._get_auth_token_call(), ssl=False)
+        return rsp["data"]["api_token"]
+
+
+class AsyncTinderClient(TinderCalls, AsyncBaseTinderClient):
+    """
+    asyncio counterpart of TinderClient, every method returns the same result
+    as its synchronous twin
+    """
+
+    auth_token: str
+    cache: Optional[ResponseCache]
+    store: Optional[ProfileStore]
+    seen: Optional[SeenFilter]
+
+    def __init__(
+        self,
+        auth_token: str,
+        app_version: Optional[str] = Defaults.APP_VERSION,
+        platform: Optional[str] = Defaults.PLATFORM,
+        user_agent: Optional[str] = Defaults.USER_AGENT,
+        max_concurrency: int = AsyncDefaults.MAX_CONCURRENCY,
+        pool_maxsize: int = PoolDefaults.POOL_MAXSIZE,
+        session: Optional[aiohttp.ClientSession] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        json_codec: Optional[JSONCodec] = None,
+        cache: Optional[ResponseCache] = None,
+        store: Optional[ProfileStore] = None,
+        seen: Optional[SeenFilter] = None,
+        host: Optional[str] = None,
+        metrics: Optional[ClientMetrics] = None,
+        hooks: Optional[Sequence[RequestHook]] = None,
+        transport: Optional[AsyncTransport] = None,
+    ):
+        super().__init__(
+            app_version,
+            platform,
+            user_agent,
+            max_concurrency,
+            pool_maxsize,
+            session,
+            rate_limiter,
+            retry_policy,
+            circuit_breaker,
+            json_codec,
+            host,
+            metrics,
+            hooks,
+            transport,
+        )
+        self.auth_token = auth_token
+        # cache can be shared with sync clients of the same account
+        self.cache = cache
+        # store is accessed in worker threads to keep the event loop responsive
+        self.store = store
+        # profiles already swiped on are skipped without calling the API
+        self.seen = seen
+        self.unknown_descriptors = Counter()
+        self._unknown_lock = threading.Lock()
+
+    async def _cached(
+        self, endpoint: str, key: Hashable, load: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Returns cached result of the endpoint or loads and caches it
+        """
+        if self.cache is None:
+            return await load()
+        found, value = self._cache_lookup(endpoint, key)
+        if not found:
+            value = await load()
+            self.cache.set(endpoint, key, value)
+        return value
+
+    async def get_recommendations(self):
+        """
+        Returns a list of users that you can swipe on
+        """
+        return await self.general_request(**self._get_recommendations_call())
+
+    async def get_updates(self, last_activity_date=""):
+        """
+        See TinderClient.get_updates
+        """
+        return await self.general_request(**self._get_updates_call(last_activity_date))
+
+    async def get_self(self):
+        """
+        Returns your own profile data
+        """
+        return await self._cached(
+            "get_self", None, lambda: self.general_request(**self._get_self_call())
+        )
+
+    async def change_preferences(self, **kwargs):
+        """
+        See TinderClient.change_preferences
+        """
+        res = await self.general_request(**self._change_preferences_call(kwargs))
+        self.invalidate("get_self")
+        self.invalidate("get_meta")
+        return res
+
+    async def get_meta(self):
+        """
+        Returns meta data on yourself
+        """
+        return await self._cached(
+            "get_meta", None, lambda: self.general_request(**self._get_meta_call())
+        )
+
+    async def update_location(self, lat, lon):
+        """
+        Updates your location to the given float inputs
+        Note: Requires a passport / Tinder Plus
+        """
+        await self.general_request(**self._update_location_call(lat, lon))
+        self._location_changed()
+        if self.store is not None:
+            await asyncio.to_thread(self.store.mark_profiles_stale)
+
+    async def reset_real_location(self):
+        res = await self.general_request(**self._reset_real_location_call())
+        self._location_changed()
+        if self.store is not None:
+            await asyncio.to_thread(self.store.mark_profiles_stale)
+        return res
+
+    async def get_recommendations_v2(self):
+        """
+        See TinderClient.get_recommendations_v2
+        """
+        return await self.general_request(**self._get_recommendations_v2_call())
+
+    async def set_webprofileusername(self, username: str):
+        """
+        Sets the username for the webprofile: https://www.gotinder.com/@YOURUSERNAME
+        """
+        res = await self.general_request(
+            **self._set_webprofileusername_call(username)
+        )
+        self.invalidate("get_self")
+        return res
+
+    async def reset_webprofileusername(self, username: str):
+        """
+        Resets the username for the webprofile
+        """
+        res = await self.general_request(
+            **self._reset_webprofileusername_call(username)
+        )
+        self.invalidate("get_self")
+        return res
+
+    async def get_profile(self, person_id: str) -> Profile:
+        """
+        Gets a user's profile via their id
+        """
+        return await self._cached(
+            "get_profile", person_id, lambda: self._load_profile(person_id)
+        )
+
+    async def _load_profile(self, person_id: str) -> Profile:
+        if self.store is not None:
+            profile = await asyncio.to_thread(self.store.get_profile, person_id)
+            if profile is not None:
+                return profile
+        profile = await self.general_request(**self._get_profile_call(person_id))
+        if self.store is not None:
+            await asyncio.to_thread(self.store.upsert_profile, profile)
+        return profile
+
+    def get_profiles(
+        self,
+        person_ids: Iterable[str],
+        concurrency: int = BulkDefaults.CONCURRENCY,
+        ordered: bool = True,
+    ) -> AsyncIterator[BulkResult[str, Profile]]:
+        """
+        Gets profiles of many users concurrently, see TinderClient.get_profiles
+        """
+        return arun_bulk(self.get_profile, person_ids, concurrency, ordered)
+
+    async def send_msg(self, match_id: str, msg: str):
+        res = await self.general_request(**self._send_msg_call(match_id, msg))
+        self.invalidate("match_info", match_id)
+        return res
+
+    async def _swipe(self, person_id: str, call: Call):
+        """
+        See TinderClient._swipe
+        """
+        if self.seen is None:
+            return await self.general_request(**call)
+        if not self.seen.reserve(person_id):
+            logger.debug("Skipping already seen profile %s", person_id)
+            return None
+        swiped = False
+        try:
+            rsp = await self.general_request(**call)
+            swiped = True
+            return rsp
+        finally:
+            self.seen.release(person_id, swiped)
+
+    async def superlike(self, person_id: str):
+        return await self._swipe(person_id, self._superlike_call(person_id))
+
+    async def like(self, person_id: str):
+        return await self._swipe(person_id, self._like_call(person_id))
+
+    async def dislike(self, person_id: str):
+        return await self._swipe(person_id, self._dislike_call(person_id))
+
+    async def report(self, person_id: str, cause: Literal[0, 1, 4], explanation: str):
+        """
+        See TinderClient.report
+        """
+        return await self.general_request(
+            **self._report_call(person_id, cause, explanation)
+        )
+
+    async def match_info(self, match_id: str):
+        return await self._cached(
+            "match_info",
+            match_id,
+            lambda: self.general_request(**self._match_info_call(match_id)),
+        )
+
+    async def get_matches(
+        self, limit: int = 60, next_page_token: Optional[str] = None
+    ) -> Tuple[List[Match], Optional[str]]:
+        """
+        Returns a list of matches and the next page token if there is one
+        """
+        matches, next_page_token = await self.general_request(
+            **self._get_matches_call(limit, next_page_token)
+        )
+        if self.store is not None:
+            await asyncio.to_thread(self.store.upsert_matches, matches)
+        return matches, next_page_token
+
+    async def get_messages(
+        self, match_id: str, limit: int = 60, next_page_token: Optional[str] = None
+    ) -> Tuple[List[Message], Optional[str]]:
+        """
+        Returns a list of messages and the next page token if there is one
+        """
+        messages, next_page_token = await self.general_request(
+            **self._get_messages_call(match_id, limit, next_page_token)
+        )
+        if self.store is not None:
+            await asyncio.to_thread(self.store.upsert_messages, messages)
+        return messages, next_page_token
+
+    async def stream_matches(
+        self, limit: int = 60, next_page_token: Optional[str] = None
+    ) -> StreamedPage[Match]:
+        """
+        See TinderClient.stream_matches. The body is received whole, matches
+        are decoded one by one while iterating the result.
+        """
+        call = self._stream(self._get_matches_call(limit, next_page_token))
+        return parse_matches_stream(await self.general_request(**call))
+
+    async def stream_messages(
+        self, match_id: str, limit: int = 60, next_page_token: Optional[str] = None
+    ) -> StreamedPage[Message]:
+        """
+        Streaming variant of get_messages, see stream_matches
+        """
+        call = self._stream(self._get_messages_call(match_id, limit, next_page_token))
+        return parse_messages_stream(await self.general_request(**call))
+
+    async def stream_updates(self, last_activity_date: str = "") -> StreamedUpdates:
+        """
+        Streaming variant of get_updates, see stream_matches
+        """
+        call = self._stream(self._get_updates_call(last_activity_date))
+        return parse_updates_stream(await self.general_request(**call))
+
+    def iter_matches(
+        self,
+        page_size: int = 60,
+        max_items: Optional[int] = None,
+        max_buffered_pages: int = PaginationDefaults.MAX_BUFFERED_PAGES,
+    ) -> AsyncIterator[Match]:
+        """
+        Yields all matches one by one, next page is prefetched by a background task
+        """
+        return aiter_paginated(
+            lambda token: self.get_matches(page_size, token),
+            max_items=max_items,
+            max_buffered_pages=max_buffered_pages,
+        )
+
+    def iter_messages(
+        self,
+        match_id: str,
+        page_size: int = 60,
+        max_items: Optional[int] = None,
+        max_buffered_pages: int = PaginationDefaults.MAX_BUFFERED_PAGES,
+    ) -> AsyncIterator[Message]:
+        """
+        Yields all messages of a match one by one, next page is prefetched by a background task
+        """
+        return aiter_paginated(
+            lambda token: self.get_messages(match_id, page_size, token),
+            max_items=max_items,
+            max_buffered_pages=max_buffered_pages,
+        )
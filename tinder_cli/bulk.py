@@ -0,0 +1,154 @@
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from dataclasses import dataclass
+import asyncio
+
+
+K = TypeVar("K")
+T = TypeVar("T")
+
+_EXHAUSTED = object()
+
+
+class BulkDefaults:
+    CONCURRENCY = 8
+
+
+@dataclass
+class BulkResult(Generic[K, T]):
+    """
+    Outcome of a single item of a bulk operation
+    """
+
+    key: K
+    value: Optional[T] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def run_bulk(
+    func: Callable[[K], T],
+    keys: Iterable[K],
+    concurrency: int = BulkDefaults.CONCURRENCY,
+    ordered: bool = True,
+) -> Iterator[BulkResult[K, T]]:
+    """
+    Calls `func` for every key on a pool of `concurrency` worker threads.
+
+    Results are yielded in the input order (ordered=True) or as soon as they
+    complete. A failing item is reported in its BulkResult and does not abort
+    the rest of the batch. Keys are consumed lazily, so at most `2 * concurrency`
+    calls are pending at any time.
+    """
+    window = 2 * concurrency
+    keys = iter(keys)
+
+    executor = ThreadPoolExecutor(
+        max_workers=concurrency, thread_name_prefix="tinder-bulk"
+    )
+    pending: Dict[Future, Tuple[int, K]] = {}
+    done_ordered: Dict[int, BulkResult[K, T]] = {}
+    next_index = 0
+    next_to_yield = 0
+
+    def submit_more() -> None:
+        nonlocal next_index
+        # results waiting for their turn count against the window as well
+        while len(pending) + len(done_ordered) < window:
+            key = next(keys, _EXHAUSTED)
+            if key is _EXHAUSTED:
+                return
+            pending[executor.submit(func, key)] = (next_index, key)
+            next_index += 1
+
+    try:
+        submit_more()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, key = pending.pop(future)
+                err = future.exception()
+                if err is None:
+                    result = BulkResult(key=key, value=future.result())
+                else:
+                    result = BulkResult(key=key, error=err)
+                if ordered:
+                    done_ordered[index] = result
+                else:
+                    yield result
+            while next_to_yield in done_ordered:
+                yield done_ordered.pop(next_to_yield)
+                next_to_yield += 1
+            submit_more()
+    finally:
+        # consumer may stop early, do not run calls nobody is waiting for
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def arun_bulk(
+    func: Callable[[K], Awaitable[T]],
+    keys: Iterable[K],
+    concurrency: int = BulkDefaults.CONCURRENCY,
+    ordered: bool = True,
+) -> AsyncIterator[BulkResult[K, T]]:
+    """
+    asyncio counterpart of run_bulk, at most `concurrency` coroutines run at once.
+    Keys are consumed lazily as in run_bulk, at most `2 * concurrency` tasks exist.
+    """
+    window = 2 * concurrency
+    keys = iter(keys)
+    semaphore = asyncio.Semaphore(concurrency)
+    pending: Dict["asyncio.Task[BulkResult[K, T]]", int] = {}
+    done_ordered: Dict[int, BulkResult[K, T]] = {}
+    next_index = 0
+    next_to_yield = 0
+
+    async def call(key: K) -> BulkResult[K, T]:
+        async with semaphore:
+            try:
+                return BulkResult(key=key, value=await func(key))
+            except Exception as err:
+                return BulkResult(key=key, error=err)
+
+    def submit_more() -> None:
+        nonlocal next_index
+        # results waiting for their turn count against the window as well
+        while len(pending) + len(done_ordered) < window:
+            key = next(keys, _EXHAUSTED)
+            if key is _EXHAUSTED:
+                return
+            pending[asyncio.ensure_future(call(key))] = next_index
+            next_index += 1
+
+    try:
+        submit_more()
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index = pending.pop(task)
+                if ordered:
+                    done_ordered[index] = task.result()
+                else:
+                    yield task.result()
+            while next_to_yield in done_ordered:
+                yield done_ordered.pop(next_to_yield)
+                next_to_yield += 1
+            submit_more()
+    finally:
+        # consumer may stop early, do not run calls nobody is waiting for
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,114 @@
+from typing import Any, Dict, Hashable, Mapping, Optional, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+import threading
+import time
+
+
+class CacheDefaults:
+    # maximum number of cached responses (all endpoints together)
+    MAX_SIZE = 4096
+    # seconds a cached response stays fresh, endpoints missing here are not cached
+    TTLS = {
+        "get_profile": 30 * 60,
+        "match_info": 5 * 60,
+        "get_meta": 5 * 60,
+        "get_self": 5 * 60,
+    }
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ResponseCache:
+    """
+    Thread safe LRU cache with per endpoint TTLs.
+
+    Entries are keyed by (endpoint, key) where endpoint is the name of the client
+    method (e.g. "get_profile") and key its argument. Values are returned as they
+    were stored (parsed Profile objects or raw JSON), callers must not mutate them.
+    Subclass and override get / set / invalidate to plug in another backend.
+    """
+
+    def __init__(
+        self,
+        max_size: int = CacheDefaults.MAX_SIZE,
+        ttls: Optional[Mapping[str, float]] = None,
+    ) -> None:
+        self.max_size = max_size
+        self.ttls = {**CacheDefaults.TTLS, **(ttls or {})}
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]" = (
+            OrderedDict()
+        )
+        self._stats: Dict[str, CacheStats] = {}
+        self._lock = threading.Lock()
+
+    def _endpoint_stats(self, endpoint: str) -> CacheStats:
+        if endpoint not in self._stats:
+            self._stats[endpoint] = CacheStats()
+        return self._stats[endpoint]
+
+    def is_cached(self, endpoint: str) -> bool:
+        return self.ttls.get(endpoint, 0) > 0
+
+    def get(self, endpoint: str, key: Hashable) -> Tuple[bool, Any]:
+        """
+        Returns (True, value) on hit and (False, None) on miss
+        """
+        with self._lock:
+            stats = self._endpoint_stats(endpoint)
+            entry = self._entries.get((endpoint, key))
+            if entry is None or entry[0] < time.monotonic():
+                stats.misses += 1
+                return False, None
+            self._entries.move_to_end((endpoint, key))
+            stats.hits += 1
+            return True, entry[1]
+
+    def set(self, endpoint: str, key: Hashable, value: Any) -> None:
+        ttl = self.ttls.get(endpoint, 0)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[(endpoint, key)] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end((endpoint, key))
+            while len(self._entries) > self.max_size:
+                (evicted_endpoint, _), _ = self._entries.popitem(last=False)
+                self._endpoint_stats(evicted_endpoint).evictions += 1
+
+    def invalidate(self, endpoint: str, key: Optional[Hashable] = None) -> None:
+        """
+        Drops cached response for the key or all responses of the endpoint (key=None)
+        """
+        with self._lock:
+            if key is not None:
+                keys = [(endpoint, key)] if (endpoint, key) in self._entries else []
+            else:
+                keys = [k for k in self._entries if k[0] == endpoint]
+            for k in keys:
+                del self._entries[k]
+            self._endpoint_stats(endpoint).invalidations += len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, CacheStats]:
+        """
+        Returns copy of hit / miss counters per endpoint
+        """
+        with self._lock:
+            return {name: replace(stats) for name, stats in self._stats.items()}
+
+    def __len__(self) -> int:
+        return len(self._entries)
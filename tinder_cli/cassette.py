@@ -0,0 +1,341 @@
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from requests.structures import CaseInsensitiveDict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from .errors import PermanentError
+from .transport import AsyncResponse, AsyncTransport, HTTPTransport, Transport
+import asyncio
+import base64
+import gzip
+import json
+import logging
+import random
+import requests
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_VERSION = 1
+
+# response headers which are not worth keeping in cassettes
+_SKIPPED_HEADERS = {
+    "set-cookie",
+    "date",
+    "connection",
+    "keep-alive",
+    # bodies are recorded decoded
+    "content-encoding",
+    "content-length",
+    "transfer-encoding",
+}
+
+Key = Tuple[str, str, Optional[str]]
+
+
+class CassetteMissError(PermanentError, LookupError):
+    """
+    Replayed request was never recorded
+    """
+
+
+def _normalize_url(url: str, params: Any = None) -> str:
+    # query parameters are sorted, so the order they are passed in does not matter
+    if params:
+        prepared = requests.PreparedRequest()
+        prepared.prepare_url(url, params)
+        url = prepared.url
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit(parts._replace(query=query))
+
+
+def _normalize_body(body: Any) -> Optional[str]:
+    # JSON bodies are compared by value, codecs differ in whitespace
+    if body is None:
+        return None
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", errors="replace")
+    try:
+        return json.dumps(json.loads(body), sort_keys=True, separators=(",", ":"))
+    except ValueError:
+        return body
+
+
+def request_key(method: str, url: str, body: Any = None, params: Any = None) -> Key:
+    """
+    Returns key matching replayed request with the recorded one
+    (method, url with sorted query, JSON body by value; headers are ignored)
+    """
+    return method.upper(), _normalize_url(url, params), _normalize_body(body)
+
+
+class Cassette:
+    """
+    Recorded request / response pairs.
+
+    Saved as gzipped JSON lines, one interaction per line. Response bodies are
+    kept as text when they are UTF-8 (JSON responses are), base64 otherwise.
+    Request headers (and so the auth token) are never recorded, but response
+    bodies are stored as they are, ex. the refresh token of the login flow.
+    """
+
+    path: Optional[str]
+    interactions: List[Dict[str, Any]]
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self.interactions = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        cassette = cls(path)
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            header = json.loads(next(f))
+            if header.get("version") != CASSETTE_VERSION:
+                raise ValueError(f"Unsupported cassette version: {header!r}")
+            cassette.interactions = [json.loads(line) for line in f]
+        return cassette
+
+    def save(self, path: Optional[str] = None) -> None:
+        path = path if path is not None else self.path
+        if path is None:
+            raise ValueError("Cassette has no path to be saved to")
+        with self._lock:
+            interactions = list(self.interactions)
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            f.write(json.dumps({"version": CASSETTE_VERSION}) + "\n")
+            for interaction in interactions:
+                f.write(json.dumps(interaction, separators=(",", ":")) + "\n")
+        self.path = path
+        logger.debug("Saved %d interactions to %s", len(interactions), path)
+
+    def record(
+        self,
+        key: Key,
+        status: int,
+        headers: Dict[str, str],
+        content: bytes,
+    ) -> None:
+        method, url, body = key
+        interaction: Dict[str, Any] = {
+            "method": method,
+            "url": url,
+            "body": body,
+            "status": status,
+            "headers": {
+                name: value
+                for name, value in headers.items()
+                if name.lower() not in _SKIPPED_HEADERS
+            },
+        }
+        try:
+            interaction["text"] = content.decode("utf-8")
+        except UnicodeDecodeError:
+            interaction["base64"] = base64.b64encode(content).decode("ascii")
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def __len__(self) -> int:
+        return len(self.interactions)
+
+
+def _content(interaction: Dict[str, Any]) -> bytes:
+    if "text" in interaction:
+        return interaction["text"].encode("utf-8")
+    return base64.b64decode(interaction["base64"])
+
+
+class _RecordedStream:
+    """
+    Records body of a streamed response as its chunks are consumed, once the
+    body is read to the end (bodies closed before that are not recorded)
+    """
+
+    def __init__(self, cassette: Cassette, key: Key, rsp: requests.Response) -> None:
+        self._cassette = cassette
+        self._key = key
+        self._rsp = rsp
+        self._iter_content = rsp.iter_content
+        self._recorded = False
+        rsp.iter_content = self.iter_content
+
+    def iter_content(
+        self, chunk_size: Optional[int] = 1, decode_unicode: bool = False
+    ) -> Iterator[Any]:
+        chunks: List[bytes] = []
+        for chunk in self._iter_content(chunk_size, decode_unicode):
+            if isinstance(chunk, str):
+                chunks.append(chunk.encode(self._rsp.encoding or "utf-8"))
+            else:
+                chunks.append(chunk)
+            yield chunk
+        if not self._recorded:
+            self._recorded = True
+            rsp = self._rsp
+            self._cassette.record(
+                self._key, rsp.status_code, dict(rsp.headers), b"".join(chunks)
+            )
+
+
+class RecordingTransport(HTTPTransport):
+    """
+    HTTP transport which records every response into the cassette.
+
+    The cassette is saved when the transport is closed (if it has a path).
+    Streamed responses are recorded as they are consumed, so they are not
+    buffered, error responses are read whole.
+    """
+
+    cassette: Cassette
+
+    def __init__(self, cassette: Cassette, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        rsp = super().request(method, url, **kwargs)
+        key = request_key(method, url, kwargs.get("data"), kwargs.get("params"))
+        if kwargs.get("stream") and rsp.ok:
+            _RecordedStream(self.cassette, key, rsp)
+        else:
+            self.cassette.record(key, rsp.status_code, dict(rsp.headers), rsp.content)
+        return rsp
+
+    def close(self) -> None:
+        if not self._closed and self.cassette.path is not None:
+            self.cassette.save()
+        super().close()
+
+
+class AsyncRecordingTransport(AsyncTransport):
+    """
+    RecordingTransport of the async clients, records responses of `transport`
+    (AIOHTTPTransport created with `kwargs` by default, owned by the recorder)
+    """
+
+    cassette: Cassette
+    transport: AsyncTransport
+
+    def __init__(
+        self, cassette: Cassette, transport: Optional[AsyncTransport] = None, **kwargs
+    ) -> None:
+        # transport passed from outside is shared and it is closed by its owner
+        self._owns_transport = transport is None
+        if transport is None:
+            # aiohttp is imported only by the async clients
+            from .async_api import AIOHTTPTransport
+
+            transport = AIOHTTPTransport(**kwargs)
+        self.cassette = cassette
+        self.transport = transport
+        self._closed = False
+
+    async def request(self, method: str, url: str, **kwargs) -> AsyncResponse:
+        status, headers, content = await self.transport.request(method, url, **kwargs)
+        key = request_key(method, url, kwargs.get("data"), kwargs.get("params"))
+        self.cassette.record(key, status, dict(headers), content)
+        return status, headers, content
+
+    async def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self.cassette.path is not None:
+            self.cassette.save()
+        if self._owns_transport:
+            await self.transport.close()
+
+
+class _Replay:
+    """
+    Recorded interactions served in the recorded order, see ReplayTransport
+    """
+
+    cassette: Cassette
+    latency: float
+    jitter: float
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        seed: Optional[int] = 0,
+    ) -> None:
+        self.cassette = cassette
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._interactions: Dict[Key, List[Dict[str, Any]]] = {}
+        self._served: Dict[Key, int] = {}
+        for interaction in cassette.interactions:
+            key = (interaction["method"], interaction["url"], interaction["body"])
+            self._interactions.setdefault(key, []).append(interaction)
+
+    def _delay(self) -> float:
+        with self._lock:
+            jitter = self._random.uniform(-self.jitter, self.jitter)
+        return max(0.0, self.latency + jitter)
+
+    def _next(
+        self, method: str, url: str, kwargs: Dict[str, Any]
+    ) -> Tuple[Key, Dict[str, Any]]:
+        """
+        Returns key and next recorded interaction of the request
+        """
+        if self._closed:
+            raise RuntimeError("Transport is already closed")
+        key = request_key(method, url, kwargs.get("data"), kwargs.get("params"))
+        recorded = self._interactions.get(key)
+        if not recorded:
+            raise CassetteMissError(
+                f"No recorded response for {key[0]} {key[1]}", url=url
+            )
+        with self._lock:
+            served = self._served.get(key, 0)
+            self._served[key] = served + 1
+        return key, recorded[served % len(recorded)]
+
+
+class ReplayTransport(_Replay, Transport):
+    """
+    Serves responses recorded in the cassette instead of calling the API.
+
+    Every response is delayed by `latency` seconds +- uniformly random `jitter`
+    (seeded, so runs are repeatable). Requests recorded several times are
+    answered in the recorded order, after the last one it starts over.
+    Unrecorded requests raise CassetteMissError.
+    """
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        key, interaction = self._next(method, url, kwargs)
+        delay = self._delay()
+        if delay > 0:
+            time.sleep(delay)
+
+        rsp = requests.Response()
+        rsp.status_code = interaction["status"]
+        rsp.headers = CaseInsensitiveDict(interaction["headers"])
+        rsp.url = key[1]
+        rsp.encoding = "utf-8"
+        # body is already in memory, iter_content serves it in chunks when streaming
+        rsp._content = _content(interaction)
+        rsp._content_consumed = True
+        return rsp
+
+
+class AsyncReplayTransport(_Replay, AsyncTransport):
+    """
+    ReplayTransport of the async clients, the latency is awaited
+    """
+
+    async def request(self, method: str, url: str, **kwargs) -> AsyncResponse:
+        _, interaction = self._next(method, url, kwargs)
+        delay = self._delay()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        headers = CaseInsensitiveDict(interaction["headers"])
+        return interaction["status"], headers, _content(interaction)
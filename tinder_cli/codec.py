@@ -0,0 +1,132 @@
+from typing import Any, Dict, Optional, Type, Union
+from dataclasses import dataclass, replace
+import json
+import threading
+import time
+
+# optional faster backends, used when installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+JSONInput = Union[bytes, bytearray, memoryview, str]
+
+
+@dataclass
+class CodecStats:
+    encoded: int = 0
+    encoded_bytes: int = 0
+    encode_seconds: float = 0.0
+    decoded: int = 0
+    decoded_bytes: int = 0
+    decode_seconds: float = 0.0
+
+
+class JSONCodec:
+    """
+    JSON encoder / decoder used by the clients, counts time spent in it.
+
+    Subclasses implement _dumps (returning bytes) and _loads (accepting bytes
+    or str). Decoding errors are ValueError subclasses in every backend.
+    """
+
+    name = "json"
+
+    def __init__(self) -> None:
+        self._stats = CodecStats()
+        self._lock = threading.Lock()
+
+    def _dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj).encode()
+
+    def _loads(self, data: JSONInput) -> Any:
+        if isinstance(data, memoryview):
+            data = bytes(data)
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        started = time.perf_counter()
+        data = self._dumps(obj)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._stats.encoded += 1
+            self._stats.encoded_bytes += len(data)
+            self._stats.encode_seconds += elapsed
+        return data
+
+    def loads(self, data: JSONInput) -> Any:
+        started = time.perf_counter()
+        obj = self._loads(data)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._stats.decoded += 1
+            self._stats.decoded_bytes += len(data)
+            self._stats.decode_seconds += elapsed
+        return obj
+
+    def stats(self) -> CodecStats:
+        with self._lock:
+            return replace(self._stats)
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def _dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    def _loads(self, data: JSONInput) -> Any:
+        return orjson.loads(data)
+
+
+class UjsonCodec(JSONCodec):
+    name = "ujson"
+
+    def _dumps(self, obj: Any) -> bytes:
+        return ujson.dumps(obj, ensure_ascii=False).encode()
+
+    def _loads(self, data: JSONInput) -> Any:
+        if isinstance(data, (bytearray, memoryview)):
+            data = bytes(data)
+        return ujson.loads(data)
+
+
+CODECS: Dict[str, Type[JSONCodec]] = {
+    "orjson": OrjsonCodec,
+    "ujson": UjsonCodec,
+    "json": JSONCodec,
+}
+
+_AVAILABLE = {"orjson": orjson is not None, "ujson": ujson is not None, "json": True}
+
+
+def get_codec(name: Optional[str] = None) -> JSONCodec:
+    """
+    Returns new codec of the given backend ("orjson", "ujson", "json"),
+    the fastest installed one when name is None
+    """
+    if name is None:
+        name = next(n for n in CODECS if _AVAILABLE[n])
+    if name not in CODECS:
+        raise ValueError(f"Unknown JSON codec: {name}")
+    if not _AVAILABLE[name]:
+        raise ImportError(f"JSON codec {name} is not installed")
+    return CODECS[name]()
+
+
+# shared codec of functions which are not bound to a client (e.g. parsers)
+_default = get_codec()
+
+
+def loads(data: JSONInput) -> Any:
+    return _default.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    return _default.dumps(obj)
@@ -0,0 +1,393 @@
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    get_args,
+    get_origin,
+)
+from dataclasses import fields
+from datetime import date, datetime, timezone
+from .models import AdditionalInfo, Match, Message, Profile
+
+# numpy is optional, it is needed only by the columnar containers
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("Columnar containers require numpy (pip install numpy)")
+
+
+def _literal_values(annotation: Any) -> Optional[Tuple[str, ...]]:
+    """
+    Returns values of Literal or Optional[Literal] annotation, None for other types
+    """
+    if get_origin(annotation) is Union:
+        annotation = next(
+            (arg for arg in get_args(annotation) if arg is not type(None)), None
+        )
+    if get_origin(annotation) is Literal:
+        return get_args(annotation)
+    return None
+
+
+# AdditionalInfo enumerated field name -> its values, code of a value is index + 1
+ADDITIONAL_INFO_CODES: Dict[str, Tuple[str, ...]] = {
+    f.name: values
+    for f in fields(AdditionalInfo)
+    if (values := _literal_values(f.type)) is not None
+}
+# field name -> value -> code (0 for None)
+_ADDITIONAL_INFO_CODE_OF: Dict[str, Dict[Optional[str], int]] = {
+    name: {None: 0, **{value: code for code, value in enumerate(values, 1)}}
+    for name, values in ADDITIONAL_INFO_CODES.items()
+}
+
+
+def _epoch_ms(value: datetime) -> int:
+    # naive datetimes are taken as UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp() * 1000)
+
+
+def _now_ms(now: Optional[datetime]) -> int:
+    return _epoch_ms(now if now is not None else datetime.now(timezone.utc))
+
+
+def _categorize(values: Sequence[str]) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Returns (codes, categories), categories[codes] == values
+    """
+    categories, codes = np.unique(_encode(values), return_inverse=True)
+    return codes.astype(np.int32), categories
+
+
+def _encode(ids: Iterable[str]) -> "np.ndarray":
+    """
+    Returns byte string array of UTF-8 encoded ids (dtype="S" alone accepts ASCII only)
+    """
+    return np.array([value.encode() for value in ids], dtype="S")
+
+
+def _decode(ids: "np.ndarray") -> List[str]:
+    return [value.decode() for value in ids.tolist()]
+
+
+class MatchFrame:
+    """
+    Columns of matches: match_id and profile_id as compact byte string arrays
+    """
+
+    def __init__(self, match_ids: "np.ndarray", profile_ids: "np.ndarray") -> None:
+        _require_numpy()
+        self.match_ids = match_ids
+        self.profile_ids = profile_ids
+
+    @classmethod
+    def from_matches(cls, matches: Iterable[Match]) -> "MatchFrame":
+        _require_numpy()
+        matches = list(matches)
+        return cls(
+            _encode(m.match_id for m in matches),
+            _encode(m.profile_id for m in matches),
+        )
+
+    def __len__(self) -> int:
+        return len(self.match_ids)
+
+    def profile_of(
+        self,
+        match_ids: Union["np.ndarray", Sequence[str]],
+        default: Optional[bytes] = None,
+    ) -> "np.ndarray":
+        """
+        Returns profile ids of the given match ids (vectorized lookup).
+        Unknown match ids raise KeyError, or get `default` when it is given.
+        """
+        if not (isinstance(match_ids, np.ndarray) and match_ids.dtype.kind == "S"):
+            match_ids = _encode(match_ids)
+        if not len(self.match_ids):
+            idx = np.zeros(len(match_ids), dtype=np.intp)
+            found = np.zeros(len(match_ids), dtype=bool)
+        else:
+            order = np.argsort(self.match_ids)
+            idx = order[
+                np.minimum(
+                    np.searchsorted(self.match_ids, match_ids, sorter=order),
+                    len(order) - 1,
+                )
+            ]
+            found = self.match_ids[idx] == match_ids
+        if found.all():
+            return self.profile_ids[idx]
+        if default is None:
+            missing = _decode(np.asarray(match_ids)[~found][:5])
+            raise KeyError(f"Unknown match ids: {', '.join(missing)}")
+        dtype = np.result_type(self.profile_ids, np.array(default))
+        profile_ids = np.full(len(match_ids), default, dtype=dtype)
+        profile_ids[found] = self.profile_ids[idx[found]]
+        return profile_ids
+
+
+class MessageBatch:
+    """
+    Columnar batch of messages.
+
+    sent_ms: int64 epoch milliseconds
+    match_codes / from_codes / to_codes: int32 indexes into match_ids / person_ids
+    ids, match_ids, person_ids: byte string arrays
+    text: object array of message texts (None when built without text)
+    """
+
+    def __init__(
+        self,
+        ids: "np.ndarray",
+        sent_ms: "np.ndarray",
+        match_codes: "np.ndarray",
+        match_ids: "np.ndarray",
+        from_codes: "np.ndarray",
+        to_codes: "np.ndarray",
+        person_ids: "np.ndarray",
+        text: Optional["np.ndarray"] = None,
+    ) -> None:
+        _require_numpy()
+        self.ids = ids
+        self.sent_ms = sent_ms
+        self.match_codes = match_codes
+        self.match_ids = match_ids
+        self.from_codes = from_codes
+        self.to_codes = to_codes
+        self.person_ids = person_ids
+        self.text = text
+
+    @classmethod
+    def from_messages(
+        cls, messages: Iterable[Message], include_text: bool = True
+    ) -> "MessageBatch":
+        """
+        Builds batch out of parsed messages (ex. output of parse_messages)
+        """
+        _require_numpy()
+        messages = list(messages)
+        n = len(messages)
+        match_codes, match_ids = _categorize([m.match_id for m in messages])
+        person_codes, person_ids = _categorize(
+            [m.from_id for m in messages] + [m.to_id for m in messages]
+        )
+        return cls(
+            ids=_encode(m._id for m in messages),
+            sent_ms=np.fromiter(
+                (_epoch_ms(m.sent_date) for m in messages), dtype=np.int64, count=n
+            ),
+            match_codes=match_codes,
+            match_ids=match_ids,
+            from_codes=person_codes[:n],
+            to_codes=person_codes[n:],
+            person_ids=person_ids,
+            text=np.array([m.message for m in messages], dtype=object)
+            if include_text
+            else None,
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def take(self, indices: "np.ndarray") -> "MessageBatch":
+        """
+        Returns batch of the rows at indices (ex. result of argsort or a mask)
+        """
+        return MessageBatch(
+            self.ids[indices],
+            self.sent_ms[indices],
+            self.match_codes[indices],
+            self.match_ids,
+            self.from_codes[indices],
+            self.to_codes[indices],
+            self.person_ids,
+            self.text[indices] if self.text is not None else None,
+        )
+
+    def sort_by_sent(self, descending: bool = False) -> "MessageBatch":
+        order = np.argsort(self.sent_ms, kind="stable")
+        return self.take(order[::-1] if descending else order)
+
+    def seconds_since(self, now: Optional[datetime] = None) -> "np.ndarray":
+        """
+        Returns seconds elapsed since every message was sent
+        """
+        return (_now_ms(now) - self.sent_ms) / 1000.0
+
+    def last_activity_ms(self) -> "np.ndarray":
+        """
+        Returns epoch ms of the newest message of every match (indexed by match code)
+        """
+        last = np.full(len(self.match_ids), np.iinfo(np.int64).min, dtype=np.int64)
+        np.maximum.at(last, self.match_codes, self.sent_ms)
+        return last
+
+    def seconds_since_activity(self, now: Optional[datetime] = None) -> "np.ndarray":
+        """
+        Returns seconds since the last message of every match (indexed by match code)
+        """
+        return (_now_ms(now) - self.last_activity_ms()) / 1000.0
+
+    def response_times(self) -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """
+        Returns (match_codes, responder_codes, seconds) of every reply, a reply is
+        a message following a message of the other person in the same match
+        """
+        order = np.lexsort((self.sent_ms, self.match_codes))
+        match_codes = self.match_codes[order]
+        from_codes = self.from_codes[order]
+        sent_ms = self.sent_ms[order]
+        replies = (match_codes[1:] == match_codes[:-1]) & (
+            from_codes[1:] != from_codes[:-1]
+        )
+        seconds = (sent_ms[1:] - sent_ms[:-1])[replies] / 1000.0
+        return match_codes[1:][replies], from_codes[1:][replies], seconds
+
+    def median_response_time(self, person_id: str) -> Optional[float]:
+        """
+        Returns median reply time (seconds) of the person, None if they never replied
+        """
+        code = np.searchsorted(self.person_ids, person_id.encode())
+        if code >= len(self.person_ids) or self.person_ids[code] != person_id.encode():
+            return None
+        _, responders, seconds = self.response_times()
+        seconds = seconds[responders == code]
+        return float(np.median(seconds)) if len(seconds) else None
+
+    def message_counts(self) -> "np.ndarray":
+        """
+        Returns number of messages of every match (indexed by match code)
+        """
+        return np.bincount(self.match_codes, minlength=len(self.match_ids))
+
+
+class ProfileFrame:
+    """
+    Columnar frame of profiles.
+
+    birth_ms: int64 epoch milliseconds
+    distance_mi: float64, NaN when unknown
+    codes: AdditionalInfo enumerated field -> int8 codes (0 None, -1 unknown
+    value), decode with ADDITIONAL_INFO_CODES[field][code - 1]
+    """
+
+    def __init__(
+        self,
+        ids: "np.ndarray",
+        birth_ms: "np.ndarray",
+        distance_mi: "np.ndarray",
+        codes: Dict[str, "np.ndarray"],
+        names: Optional["np.ndarray"] = None,
+    ) -> None:
+        _require_numpy()
+        self.ids = ids
+        self.birth_ms = birth_ms
+        self.distance_mi = distance_mi
+        self.codes = codes
+        self.names = names
+
+    @classmethod
+    def from_profiles(cls, profiles: Iterable[Profile]) -> "ProfileFrame":
+        _require_numpy()
+        profiles = list(profiles)
+        n = len(profiles)
+        codes = {}
+        for name, code_of in _ADDITIONAL_INFO_CODE_OF.items():
+            codes[name] = np.fromiter(
+                (code_of.get(getattr(p.additional, name), -1) for p in profiles),
+                dtype=np.int8,
+                count=n,
+            )
+        return cls(
+            ids=_encode(p._id for p in profiles),
+            birth_ms=np.fromiter(
+                (_epoch_ms(p.birth_date) for p in profiles), dtype=np.int64, count=n
+            ),
+            distance_mi=np.array(
+                [np.nan if p.distance_mi is None else p.distance_mi for p in profiles],
+                dtype=np.float64,
+            ),
+            codes=codes,
+            names=np.array([p.name for p in profiles], dtype=object),
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def take(self, indices: "np.ndarray") -> "ProfileFrame":
+        return ProfileFrame(
+            self.ids[indices],
+            self.birth_ms[indices],
+            self.distance_mi[indices],
+            {name: codes[indices] for name, codes in self.codes.items()},
+            self.names[indices] if self.names is not None else None,
+        )
+
+    def ages(self, today: Optional[date] = None) -> "np.ndarray":
+        """
+        Returns age in whole years of every profile
+        """
+        today = today if today is not None else date.today()
+        birth = self.birth_ms.astype("datetime64[ms]").astype("datetime64[D]")
+        years = birth.astype("datetime64[Y]")
+        months = birth.astype("datetime64[M]")
+        # month and day packed as month * 100 + day (both zero based)
+        birth_md = (months - years).astype(np.int64) * 100 + (birth - months).astype(
+            np.int64
+        )
+        today_md = (today.month - 1) * 100 + today.day - 1
+        return (
+            today.year
+            - (years.astype(np.int64) + 1970)
+            - (birth_md > today_md).astype(np.int64)
+        )
+
+    def category(self, field: str) -> List[Optional[str]]:
+        """
+        Returns decoded values of the enumerated field ("?" for unknown values)
+        """
+        values = (None,) + ADDITIONAL_INFO_CODES[field]
+        return [
+            values[code] if code >= 0 else "?" for code in self.codes[field].tolist()
+        ]
+
+    def value_counts(self, field: str) -> Dict[Optional[str], int]:
+        """
+        Returns number of profiles with every value of the enumerated field
+        """
+        values = (None,) + ADDITIONAL_INFO_CODES[field]
+        codes, counts = np.unique(self.codes[field], return_counts=True)
+        return {
+            values[code] if code >= 0 else "?": int(count)
+            for code, count in zip(codes.tolist(), counts.tolist())
+        }
+
+    def sort_by(self, column: str, descending: bool = True) -> "ProfileFrame":
+        """
+        Returns frame sorted by "age", "distance_mi" or an enumerated field
+        """
+        if column == "age":
+            # the older, the earlier born
+            keys = -self.birth_ms
+        elif column == "distance_mi":
+            keys = self.distance_mi
+        else:
+            keys = self.codes[column]
+        order = np.argsort(keys, kind="stable")
+        return self.take(order[::-1] if descending else order)
+
+    def ids_list(self) -> List[str]:
+        return _decode(self.ids)
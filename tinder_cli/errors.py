@@ -0,0 +1,80 @@
+from typing import Mapping, Optional
+from .ratelimit import parse_retry_after
+
+
+class TinderAPIError(Exception):
+    """
+    Base class of all errors raised by the Tinder clients
+    """
+
+    def __init__(
+        self, message: str, status_code: Optional[int] = None, url: Optional[str] = None
+    ) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.url = url
+
+
+class TransientError(TinderAPIError):
+    """
+    Error which may go away when the request is repeated (network errors, 5xx, 429)
+    """
+
+
+class RateLimitedError(TransientError):
+    """
+    Server rejected the request because of too many requests (HTTP 429)
+    """
+
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        url: Optional[str] = None,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        super().__init__(message, status_code, url)
+        self.retry_after = retry_after
+
+
+class InvalidResponseError(TransientError):
+    """
+    Response body is not a valid JSON document (e.g. HTML error page of a proxy)
+    """
+
+
+class PermanentError(TinderAPIError):
+    """
+    Error which repeating the same request will not fix (4xx)
+    """
+
+
+class AuthenticationError(PermanentError):
+    """
+    Auth token is missing, invalid or expired (HTTP 401 / 403)
+    """
+
+
+class CircuitOpenError(TinderAPIError):
+    """
+    Request was not sent because the API host is considered degraded
+    """
+
+
+def error_from_status(
+    status_code: int, headers: Mapping, url: str
+) -> Optional[TinderAPIError]:
+    """
+    Returns error matching the HTTP status of the response, None for successful responses
+    """
+    if status_code < 400:
+        return None
+    message = f"HTTP {status_code} from {url}"
+    if status_code == 429:
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+        return RateLimitedError(message, status_code, url, retry_after)
+    if status_code in (401, 403):
+        return AuthenticationError(message, status_code, url)
+    if status_code == 408 or status_code >= 500:
+        return TransientError(message, status_code, url)
+    return PermanentError(message, status_code, url)
@@ -0,0 +1,262 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from dataclasses import dataclass, field
+from .metrics import endpoint_label
+import cProfile
+import hashlib
+import heapq
+import io
+import itertools
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilerDefaults:
+    # number of slowest calls whose profiles are kept
+    SLOWEST = 10
+    # fraction of calls which are profiled
+    SAMPLE_RATE = 1.0
+    # pstats sort key and number of functions in reports
+    SORT = "cumulative"
+    LIMIT = 25
+
+
+@dataclass
+class Span:
+    """
+    One client call of the Tinder API: endpoint, account and time spent per stage.
+
+    `stages` holds seconds per stage, summed over retried attempts: "wait"
+    (circuit breaker and rate limiter), "send" (network), "decode" (JSON),
+    "parse" (into models) and "backoff" (sleeping between attempts).
+    Hooks can keep their own state in `attributes`.
+    """
+
+    endpoint: str
+    account: Optional[str]
+    method: str
+    url: str
+    started: float = field(default_factory=time.perf_counter)
+    stages: Dict[str, float] = field(default_factory=dict)
+    attempts: int = 0
+    status: Optional[int] = None
+    error: Optional[BaseException] = None
+    duration: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def finish(self) -> None:
+        self.duration = time.perf_counter() - self.started
+
+    def summary(self) -> str:
+        """
+        Returns one line description, ex. for logging
+        """
+        stages = " ".join(
+            f"{name}={seconds * 1000:.1f}ms" for name, seconds in self.stages.items()
+        )
+        outcome = type(self.error).__name__ if self.error is not None else self.status
+        duration = (self.duration or 0.0) * 1000
+        return (
+            f"{self.method} {self.endpoint} account={self.account} -> {outcome}"
+            f" in {duration:.1f}ms ({self.attempts} attempts) {stages}"
+        )
+
+
+def account_label(secret: Any) -> str:
+    """
+    Returns short stable label of the account for spans, so the auth token
+    (or phone number) itself never reaches the hooks
+    """
+    return hashlib.sha256(str(secret).encode()).hexdigest()[:8]
+
+
+class RequestHook:
+    """
+    Observer of the client's request lifecycle, override the stages you need.
+
+    before_send: before every attempt is sent
+    after_receive: response of an attempt arrived (also error statuses)
+    on_error: attempt or parsing failed, the call may still be retried
+    after_parse: response was parsed into models (calls which parse only)
+    finish: call is over, `span.duration` and `span.error` are set
+
+    Hooks run synchronously in the calling thread (or event loop), keep them
+    cheap. They must not modify the response or the result.
+    """
+
+    def before_send(self, span: Span) -> None:
+        pass
+
+    def after_receive(self, span: Span, status: int, content: Optional[bytes]) -> None:
+        pass
+
+    def on_error(self, span: Span, error: BaseException) -> None:
+        pass
+
+    def after_parse(self, span: Span, result: Any) -> None:
+        pass
+
+    def finish(self, span: Span) -> None:
+        pass
+
+
+class HookChain:
+    """
+    Runs hooks like middleware: before_send in the given order, the later
+    stages in reverse order. Exceptions of hooks are logged, never raised
+    into the request.
+    """
+
+    hooks: Tuple[RequestHook, ...]
+
+    def __init__(self, hooks: Sequence[RequestHook]) -> None:
+        self.hooks = tuple(hooks)
+        self._reversed = self.hooks[::-1]
+
+    def span(self, url: str, method: str, account: Optional[str]) -> Span:
+        return Span(endpoint_label(url), account, method, url)
+
+    def _call(self, hooks: Tuple[RequestHook, ...], stage: str, *args) -> None:
+        for hook in hooks:
+            try:
+                getattr(hook, stage)(*args)
+            except Exception:
+                logger.exception("Hook %s failed in %s", type(hook).__name__, stage)
+
+    def before_send(self, span: Span) -> None:
+        span.attempts += 1
+        self._call(self.hooks, "before_send", span)
+
+    def after_receive(self, span: Span, status: int, content: Optional[bytes]) -> None:
+        span.status = status
+        self._call(self._reversed, "after_receive", span, status, content)
+
+    def on_error(self, span: Span, error: BaseException) -> None:
+        self._call(self._reversed, "on_error", span, error)
+
+    def after_parse(self, span: Span, result: Any) -> None:
+        self._call(self._reversed, "after_parse", span, result)
+
+    def finish(self, span: Span, error: Optional[BaseException] = None) -> None:
+        span.error = error
+        span.finish()
+        self._call(self._reversed, "finish", span)
+
+
+def _filename(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", text).strip("_")
+
+
+class SlowCallProfiler(RequestHook):
+    """
+    Profiles sampled calls with cProfile and keeps the profiles of the slowest N.
+
+    Profiling runs from the first attempt until the call finishes (retries and
+    parsing included). Only one call per thread is profiled at a time, so in
+    the async client overlapping calls are skipped and a profile also contains
+    other tasks run by the event loop meanwhile.
+
+    ex:
+    profiler = SlowCallProfiler(slowest=5, sample_rate=0.1)
+    client = TinderClient(token, hooks=[profiler])
+    ...
+    print(profiler.report())
+    profiler.dump("profiles")  # .prof files for snakeviz / pstats
+    """
+
+    def __init__(
+        self,
+        slowest: int = ProfilerDefaults.SLOWEST,
+        sample_rate: float = ProfilerDefaults.SAMPLE_RATE,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.slowest = slowest
+        self.sample_rate = sample_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # min heap of (duration, order, span, profile)
+        self._heap: List[Tuple[float, int, Span, cProfile.Profile]] = []
+        self._order = itertools.count()
+        self.profiled = 0
+
+    def before_send(self, span: Span) -> None:
+        if span.attempts > 1 or getattr(self._local, "active", None) is not None:
+            return
+        if self.sample_rate < 1.0:
+            with self._lock:
+                if self._random.random() >= self.sample_rate:
+                    return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+ allows one active profiler per process
+            return
+        self._local.active = span
+        span.attributes["profile"] = profile
+
+    def finish(self, span: Span) -> None:
+        profile = span.attributes.pop("profile", None)
+        if profile is None:
+            return
+        profile.disable()
+        self._local.active = None
+        entry = (span.duration or 0.0, next(self._order), span, profile)
+        with self._lock:
+            self.profiled += 1
+            if len(self._heap) < self.slowest:
+                heapq.heappush(self._heap, entry)
+            elif entry[0] > self._heap[0][0]:
+                heapq.heapreplace(self._heap, entry)
+
+    def results(self) -> List[Tuple[Span, cProfile.Profile]]:
+        """
+        Returns the kept spans with their profiles, slowest first
+        """
+        with self._lock:
+            entries = sorted(self._heap, reverse=True)
+        return [(span, profile) for _, _, span, profile in entries]
+
+    def report(
+        self, sort: str = ProfilerDefaults.SORT, limit: int = ProfilerDefaults.LIMIT
+    ) -> str:
+        """
+        Returns pstats output of the slowest calls
+        """
+        out = io.StringIO()
+        results = self.results()
+        out.write(f"{len(results)} slowest of {self.profiled} profiled calls\n")
+        for rank, (span, profile) in enumerate(results, 1):
+            out.write(f"\n#{rank} {span.summary()}\n")
+            pstats.Stats(profile, stream=out).sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def dump(self, directory: str) -> List[str]:
+        """
+        Writes profile of every kept call as pstats file, returns their paths
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for rank, (span, profile) in enumerate(self.results(), 1):
+            name = _filename(f"{rank:02d}_{span.method}_{span.endpoint}")
+            path = os.path.join(directory, f"{name}.prof")
+            profile.dump_stats(path)
+            paths.append(path)
+        logger.info("Dumped %d profiles to %s", len(paths), directory)
+        return paths
+
+    def clear(self) -> None:
+        with self._lock:
+            self._heap = []
+            self.profiled = 0
@@ -0,0 +1,205 @@
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+import codecs
+import json
+import re
+
+
+T = TypeVar("T")
+
+Path = Tuple[str, ...]
+Body = Union[bytes, Iterable[bytes]]
+
+
+class StreamDefaults:
+    # bytes read from the response at once
+    CHUNK_SIZE = 64 * 1024
+
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+
+class _Reader:
+    """
+    Pull reader of a JSON document arriving in chunks.
+    Only the unconsumed rest of the current chunk is kept in memory.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> None:
+        try:
+            text = self._utf8.decode(next(self._chunks))
+        except StopIteration:
+            text = self._utf8.decode(b"", final=True)
+            self._eof = True
+        self._buf = self._buf[self._pos :] + text
+        self._pos = 0
+
+    def peek(self) -> str:
+        """
+        Returns next non whitespace character ("" at the end of the document)
+        """
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if self._eof:
+                return ""
+            self._fill()
+
+    def take(self, expected: str) -> str:
+        char = self.peek()
+        if char not in expected:
+            raise ValueError(f"Expected one of {expected!r}, got {char!r}")
+        self._pos += 1
+        return char
+
+    def value(self) -> Any:
+        """
+        Decodes next complete JSON value
+        """
+        self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self._buf, self._pos)
+                # a number at the end of the buffer may continue in the next chunk
+                if end < len(self._buf) or self._eof:
+                    self._pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._fill()
+
+
+def _walk(
+    reader: _Reader, path: Path, targets: Set[Path], prefixes: Set[Path]
+) -> Iterator[Tuple[Path, Any, bool]]:
+    char = reader.peek()
+    if path in targets and char == "[":
+        reader.take("[")
+        if reader.peek() == "]":
+            reader.take("]")
+            return
+        while True:
+            yield path, reader.value(), True
+            if reader.take(",]") == "]":
+                return
+    elif path in prefixes and char == "{":
+        reader.take("{")
+        if reader.peek() == "}":
+            reader.take("}")
+            return
+        while True:
+            key = reader.value()
+            reader.take(":")
+            yield from _walk(reader, path + (key,), targets, prefixes)
+            if reader.take(",}") == "}":
+                return
+    else:
+        yield path, reader.value(), False
+
+
+def iter_json(
+    body: Body, targets: Collection[Path]
+) -> Iterator[Tuple[Path, Any, bool]]:
+    """
+    Decodes JSON document incrementally.
+
+    Elements of arrays at `targets` paths (ex. ("data", "matches")) are yielded
+    one by one as (path, element, True). Every other value found on the way is
+    yielded whole as (path, value, False), objects on the way to a target are
+    walked into. Memory use is bounded by the largest single value, not by
+    the document.
+    """
+    if isinstance(body, (bytes, bytearray)):
+        body = [bytes(body)]
+    targets = set(targets)
+    prefixes = {target[:i] for target in targets for i in range(len(target))}
+    reader = _Reader(body)
+    yield from _walk(reader, (), targets, prefixes)
+    if reader.peek() != "":
+        raise ValueError("Extra data after JSON document")
+
+
+class StreamedResponse(Generic[T]):
+    """
+    Items of a streamed response, iterate it once to decode them one by one.
+
+    Values outside of the streamed arrays (ex. next page token) are collected
+    in `values` as they are reached, so they are complete after the iteration.
+
+    The body holds a pooled connection until it is read to the end or the
+    response is closed. Use it as a context manager (or call close) when it
+    may not be iterated to the end, otherwise the connection is released only
+    by garbage collection:
+
+    with client.stream_matches() as page:
+        for match in page:
+            ...
+    """
+
+    def __init__(
+        self,
+        body: Body,
+        targets: Collection[Path],
+        convert: Callable[[Path, Any], Iterable[T]],
+    ) -> None:
+        self.values: Dict[Path, Any] = {}
+        self._body = body
+        self._events = iter_json(body, targets)
+        self._convert = convert
+
+    def __iter__(self) -> Iterator[T]:
+        for path, value, is_item in self._events:
+            if is_item:
+                yield from self._convert(path, value)
+            else:
+                self.values[path] = value
+
+    def consume(self) -> None:
+        """
+        Reads the rest of the response, items left are dropped
+        """
+        for _ in self:
+            pass
+
+    def close(self) -> None:
+        """
+        Stops decoding and releases the connection of the body, items left are dropped
+        """
+        self._events.close()
+        close = getattr(self._body, "close", None)
+        if close is not None:
+            close()
+
+    def __enter__(self) -> "StreamedResponse[T]":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class StreamedPage(StreamedResponse[T]):
+    @property
+    def next_page_token(self) -> Optional[str]:
+        return self.values.get(("data", "next_page_token"))
@@ -0,0 +1,114 @@
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from dataclasses import fields
+from functools import cached_property
+from .models import AdditionalInfo, Profile
+from .parse_utils import (
+    PROFILE_FIELD_PARSERS,
+    Response,
+    decode_response,
+    parse_birth_date,
+    parse_descriptors,
+    parse_photos,
+)
+
+
+class LazyAdditionalInfo:
+    """
+    AdditionalInfo view over raw profile "results", every attribute is parsed on
+    first access and memoized. Descriptor attributes are parsed all at once, on
+    access to any of them (so unknown descriptors raise only then with strict=True)
+    """
+
+    def __init__(self, result: Dict[str, Any], strict: bool = True) -> None:
+        self._result = result
+        self._strict = strict
+
+    @cached_property
+    def _descriptors(self) -> Dict[str, Any]:
+        return parse_descriptors(self._result, self._strict)
+
+    def to_additional_info(self) -> AdditionalInfo:
+        """
+        Returns fully parsed AdditionalInfo
+        """
+        return AdditionalInfo(
+            **{f.name: getattr(self, f.name) for f in fields(AdditionalInfo)}
+        )
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_additional_info()!r})"
+
+
+def _field_property(name: str) -> cached_property:
+    if name in PROFILE_FIELD_PARSERS:
+        parse = PROFILE_FIELD_PARSERS[name]
+        prop = cached_property(lambda self: parse(self._result))
+    else:
+        prop = cached_property(lambda self: self._descriptors.get(name))
+    prop.__set_name__(LazyAdditionalInfo, name)
+    return prop
+
+
+for _field in fields(AdditionalInfo):
+    setattr(LazyAdditionalInfo, _field.name, _field_property(_field.name))
+del _field
+
+
+class LazyProfile:
+    """
+    Profile view over raw /user/{id} (or recommendation) response.
+
+    Has the attributes of Profile, each one is parsed on first access and memoized,
+    so triage looking at few fields (ex. _id, distance_mi, birth_date) does not
+    pay for parsing the whole profile. to_profile() returns the full Profile.
+    """
+
+    def __init__(self, rsp: Response, strict: bool = True) -> None:
+        self._result: Dict[str, Any] = decode_response(rsp)["results"]
+        self._strict = strict
+
+    @cached_property
+    def _id(self) -> str:
+        return self._result["_id"]
+
+    @cached_property
+    def bio(self) -> str:
+        return self._result["bio"]
+
+    @cached_property
+    def birth_date(self) -> datetime:
+        return parse_birth_date(self._result["birth_date"])
+
+    @cached_property
+    def name(self) -> str:
+        return self._result["name"]
+
+    @cached_property
+    def photos(self) -> List[str]:
+        return parse_photos(self._result)
+
+    @cached_property
+    def distance_mi(self) -> Optional[int]:
+        return self._result["distance_mi"]
+
+    @cached_property
+    def additional(self) -> LazyAdditionalInfo:
+        return LazyAdditionalInfo(self._result, self._strict)
+
+    def to_profile(self) -> Profile:
+        """
+        Returns fully parsed Profile, same as parse_profile_response
+        """
+        return Profile(
+            _id=self._id,
+            bio=self.bio,
+            birth_date=self.birth_date,
+            name=self.name,
+            photos=self.photos,
+            distance_mi=self.distance_mi,
+            additional=self.additional.to_additional_info(),
+        )
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(_id={self._id!r}, name={self.name!r})"
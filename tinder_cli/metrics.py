@@ -0,0 +1,372 @@
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+import bisect
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+Labels = Tuple[str, ...]
+
+
+class MetricsDefaults:
+    # latency histogram buckets (seconds)
+    BUCKETS = (
+        0.0005,
+        0.001,
+        0.0025,
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1.0,
+        2.5,
+        5.0,
+        10.0,
+    )
+    EXPORTER_PORT = 9464
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """
+    Monotonic counter with labels
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield (
+                f"{self.name}{_format_labels(self.labelnames, labels)}"
+                f" {_format_value(value)}"
+            )
+
+
+class Histogram:
+    """
+    Histogram with fixed buckets and labels
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = MetricsDefaults.BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> (observations per bucket, +Inf last), sum
+        self._values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            values = self._values.get(labels)
+            if values is None:
+                values = self._values[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            values[0][index] += 1
+            values[1][0] += value
+
+    def count(self, *labels: str) -> int:
+        values = self._values.get(labels)
+        return sum(values[0]) if values else 0
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted(
+                (labels, list(counts), total[0])
+                for labels, (counts, total) in self._values.items()
+            )
+        names = self.labelnames + ("le",)
+        for labels, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = _format_labels(names, labels + (_format_value(bound),))
+                yield f"{self.name}_bucket{le} {cumulative}"
+            plain = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{plain} {_format_value(total)}"
+            yield f"{self.name}_count{plain} {cumulative}"
+
+
+class MetricsRegistry:
+    """
+    In-process collection of metrics, rendered in Prometheus text format
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is registered as {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = MetricsDefaults.BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, help, labelnames, buckets)
+
+    def render(self) -> str:
+        """
+        Returns all metrics in Prometheus text exposition format
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        lines = []
+        for name, metric in metrics:
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+# path segments which are part of endpoint names, any other segment is an id
+_ENDPOINT_SEGMENTS = {
+    "v2",
+    "auth",
+    "sms",
+    "send",
+    "validate",
+    "login",
+    "facebook",
+    "users",
+    "user",
+    "recs",
+    "core",
+    "updates",
+    "profile",
+    "meta",
+    "passport",
+    "travel",
+    "reset",
+    "matches",
+    "messages",
+    "like",
+    "super",
+    "pass",
+    "report",
+}
+
+
+def endpoint_label(url: str) -> str:
+    """
+    Returns path of the url with ids replaced, ex. "/user/{id}" for "/user/5a3f..."
+    (keeps the number of label values small)
+    """
+    segments = urlsplit(url).path.split("/")
+    return "/".join(
+        segment if not segment or segment in _ENDPOINT_SEGMENTS else "{id}"
+        for segment in segments
+    )
+
+
+class ClientMetrics:
+    """
+    Metrics of the Tinder clients: requests and responses per endpoint, network,
+    JSON decode and parse latency, bytes sent / received, retries, cache hits.
+
+    One instance can be shared by several clients, all of them are counted together.
+    """
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None) -> None:
+        self.registry = registry if registry is not None else MetricsRegistry()
+        r = self.registry
+        self.requests = r.counter(
+            "tinder_requests_total", "Requests sent", ("endpoint", "method")
+        )
+        self.responses = r.counter(
+            "tinder_responses_total",
+            "Responses by status code (error when no response came)",
+            ("endpoint", "status"),
+        )
+        self.network_seconds = r.histogram(
+            "tinder_request_seconds", "Network time of requests", ("endpoint",)
+        )
+        self.decode_seconds = r.histogram(
+            "tinder_decode_seconds", "JSON decode time of responses", ("endpoint",)
+        )
+        self.parse_seconds = r.histogram(
+            "tinder_parse_seconds", "Parse time of decoded responses", ("parser",)
+        )
+        self.bytes_sent = r.counter(
+            "tinder_request_bytes_total", "Request body bytes sent", ("endpoint",)
+        )
+        self.bytes_received = r.counter(
+            "tinder_response_bytes_total", "Response body bytes received", ("endpoint",)
+        )
+        self.retries = r.counter(
+            "tinder_retries_total", "Retried request attempts", ("endpoint",)
+        )
+        self.cache = r.counter(
+            "tinder_cache_total", "Response cache lookups", ("endpoint", "result")
+        )
+
+    def observe_request(
+        self,
+        url: str,
+        method: str,
+        status: Optional[int],
+        seconds: float,
+        sent: int,
+        received: int,
+    ) -> None:
+        endpoint = endpoint_label(url)
+        self.requests.inc(endpoint, method)
+        self.responses.inc(endpoint, str(status) if status is not None else "error")
+        self.network_seconds.observe(seconds, endpoint)
+        if sent:
+            self.bytes_sent.inc(endpoint, amount=sent)
+        if received:
+            self.bytes_received.inc(endpoint, amount=received)
+
+    def observe_received(self, url: str, received: int) -> None:
+        self.bytes_received.inc(endpoint_label(url), amount=received)
+
+    def observe_decode(self, url: str, seconds: float) -> None:
+        self.decode_seconds.observe(seconds, endpoint_label(url))
+
+    def observe_retry(self, url: str) -> None:
+        self.retries.inc(endpoint_label(url))
+
+    def observe_cache(self, endpoint: str, hit: bool) -> None:
+        self.cache.inc(endpoint, "hit" if hit else "miss")
+
+    def render(self) -> str:
+        return self.registry.render()
+
+
+def timed_parse(
+    metrics: Optional[ClientMetrics], parser: Callable[..., T], *args, **kwargs
+) -> T:
+    """
+    Calls parser, its duration is observed when metrics are enabled
+    ex: timed_parse(client.metrics, parse_matches, rsp)
+    """
+    if metrics is None:
+        return parser(*args, **kwargs)
+    started = time.perf_counter()
+    try:
+        return parser(*args, **kwargs)
+    finally:
+        metrics.parse_seconds.observe(time.perf_counter() - started, parser.__name__)
+
+
+class MetricsExporter:
+    """
+    Tiny HTTP server exposing the registry at /metrics for Prometheus scraping,
+    runs in a background thread (start / stop or context manager)
+    """
+
+    def __init__(
+        self,
+        registry: MetricsRegistry,
+        host: str = "127.0.0.1",
+        port: int = MetricsDefaults.EXPORTER_PORT,
+    ) -> None:
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _handler(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args) -> None:
+                logger.debug("Metrics exporter: " + format, *args)
+
+        return Handler
+
+    def start(self) -> "MetricsExporter":
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        # port 0 picks a free port
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info("Serving metrics on http://%s:%d/metrics", self.host, self.port)
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread = None
+
+    def __enter__(self) -> "MetricsExporter":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
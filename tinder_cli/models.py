@@ -3,7 +3,7 @@ from datetime import datetime
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class AdditionalInfo:
     """
     Additional info about tinder user profile (non mandatory fields)
@@ -25,7 +25,22 @@ class AdditionalInfo:
     # languages
     languages: Optional[List[str]] = None  # maximum 5
     # basics
-    zodiac_sign: Optional[str] = None
+    zodiac_sign: Optional[
+        Literal[
+            "Capricorn",
+            "Aquarius",
+            "Pisces",
+            "Aries",
+            "Taurus",
+            "Gemini",
+            "Cancer",
+            "Leo",
+            "Virgo",
+            "Libra",
+            "Scorpio",
+            "Sagittarius",
+        ]
+    ] = None
     education_level: Optional[
         Literal[
             "Bachelor degree",
@@ -175,7 +190,7 @@ class AdditionalInfo:
     ] = None  # max 3
 
 
-@dataclass
+@dataclass(slots=True)
 class Profile:
     """
     Tinder user profile info
@@ -190,7 +205,7 @@ class Profile:
     additional: AdditionalInfo
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     """
     Tinder single message info
@@ -204,7 +219,7 @@ class Message:
     match_id: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Match:
     """
     Tinder match info (profile_id + match_id)
@@ -212,3 +227,15 @@ class Match:
 
     match_id: str
     profile_id: str
+
+
+@dataclass(slots=True)
+class Updates:
+    """
+    Tinder account changes since the last activity date
+    """
+
+    matches: List[Match]
+    messages: List[Message]
+    unmatched_ids: List[str]  # match ids of unmatched / blocked matches
+    last_activity_date: Optional[str]  # to be used for the next request
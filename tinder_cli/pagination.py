@@ -0,0 +1,139 @@
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+import asyncio
+import queue
+import threading
+
+
+T = TypeVar("T")
+
+Page = Tuple[List[T], Optional[str]]
+
+
+class PaginationDefaults:
+    # pages fetched ahead of the consumer (keeps memory bounded)
+    MAX_BUFFERED_PAGES = 1
+
+
+class _PageError:
+    """
+    Wraps exception raised by the background fetcher so it can be re-raised in consumer
+    """
+
+    def __init__(self, err: BaseException) -> None:
+        self.err = err
+
+
+_END = object()
+
+
+def iter_paginated(
+    fetch_page: Callable[[Optional[str]], Page],
+    max_items: Optional[int] = None,
+    max_buffered_pages: int = PaginationDefaults.MAX_BUFFERED_PAGES,
+) -> Iterator[T]:
+    """
+    Yields items of paginated endpoint one by one.
+
+    `fetch_page` is called with the page token of the previous page (None for the
+    first one) in a background thread, so next page is downloaded while the
+    caller consumes current one. At most `max_buffered_pages` pages wait in the
+    buffer, the fetcher blocks when the buffer is full.
+    """
+    if max_items is not None and max_items <= 0:
+        return
+
+    pages: "queue.Queue" = queue.Queue(maxsize=max(1, max_buffered_pages))
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        # blocks until there is space in the buffer or the consumer has gone away
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        token = None
+        try:
+            while not stop.is_set():
+                items, token = fetch_page(token)
+                if not put(items) or token is None or len(items) == 0:
+                    break
+        except Exception as err:
+            put(_PageError(err))
+        put(_END)
+
+    fetcher = threading.Thread(target=produce, name="tinder-page-prefetch", daemon=True)
+    fetcher.start()
+
+    yielded = 0
+    try:
+        while True:
+            page = pages.get()
+            if page is _END:
+                return
+            if isinstance(page, _PageError):
+                raise page.err
+            for item in page:
+                yield item
+                yielded += 1
+                if max_items is not None and yielded >= max_items:
+                    return
+    finally:
+        stop.set()
+
+
+async def aiter_paginated(
+    fetch_page: Callable[[Optional[str]], Awaitable[Page]],
+    max_items: Optional[int] = None,
+    max_buffered_pages: int = PaginationDefaults.MAX_BUFFERED_PAGES,
+) -> AsyncIterator[T]:
+    """
+    asyncio counterpart of iter_paginated, next page is fetched by a background task
+    """
+    if max_items is not None and max_items <= 0:
+        return
+
+    pages: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_buffered_pages))
+
+    async def produce() -> None:
+        token = None
+        try:
+            while True:
+                items, token = await fetch_page(token)
+                await pages.put(items)
+                if token is None or len(items) == 0:
+                    break
+        except Exception as err:
+            await pages.put(_PageError(err))
+        await pages.put(_END)
+
+    fetcher = asyncio.create_task(produce())
+
+    yielded = 0
+    try:
+        while True:
+            page = await pages.get()
+            if page is _END:
+                return
+            if isinstance(page, _PageError):
+                raise page.err
+            for item in page:
+                yield item
+                yielded += 1
+                if max_items is not None and yielded >= max_items:
+                    return
+    finally:
+        fetcher.cancel()
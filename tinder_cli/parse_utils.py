@@ -1,6 +1,11 @@
-from tinder_cli.models import Profile, AdditionalInfo, Match, Message
-from typing import Dict, Tuple, List, Optional, Any
+from tinder_cli.models import Profile, AdditionalInfo, Match, Message, Updates
+from tinder_cli.codec import JSONInput, loads
+from tinder_cli.jsonstream import Body, Path, StreamedPage, StreamedResponse
+from typing import Callable, Dict, Tuple, List, Optional, Any, Union
+from collections import Counter
+from functools import lru_cache
 import logging
+import sys
 from datetime import datetime
 
 
@@ -8,65 +13,82 @@ logger = logging.getLogger(__name__)
 
 DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%f%z"
 
+# fromisoformat accepts "Z" suffix and any number of fraction digits since 3.11
+_ISOFORMAT_Z = sys.version_info >= (3, 11)
+
+
+def parse_datetime(value: str) -> datetime:
+    """
+    Parse Tinder timestamp (ex. "2017-07-09T10:28:13.392Z") into aware datetime
+    Same result as datetime.strptime(value, DATETIME_FORMAT), several times faster
+    """
+    try:
+        if _ISOFORMAT_Z:
+            return datetime.fromisoformat(value)
+        if value.endswith("Z"):
+            return datetime.fromisoformat(value[:-1] + "+00:00")
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return datetime.strptime(value, DATETIME_FORMAT)
+
+
+# birth dates repeat a lot (many users share a day and Tinder keeps the time part)
+parse_birth_date = lru_cache(maxsize=4096)(parse_datetime)
+
+
+Response = Union[Dict[str, Any], JSONInput]
+
+
+def decode_response(rsp: Response) -> Dict[str, Any]:
+    """
+    Returns decoded response, raw JSON (bytes or str) is decoded with the fastest codec
+    """
+    if isinstance(rsp, dict):
+        return rsp
+    return loads(rsp)
+
+
+# (section name, descriptor name) -> (AdditionalInfo attribute, is multicategorical)
+DESCRIPTOR_REGISTRY: Dict[Tuple[str, Optional[str]], Tuple[str, bool]] = {
+    ("Basics", "Zodiac"): ("zodiac_sign", False),
+    ("Basics", "Education"): ("education_level", False),
+    ("Basics", "Family Plans"): ("children_attitude", False),
+    ("Basics", "COVID Vaccine"): ("vaccination_status", False),
+    ("Basics", "Personality Type"): ("personality_type", False),
+    ("Basics", "Communication Style"): ("communication_style", False),
+    ("Basics", "Love Style"): ("love_receive_language", False),
+    ("Lifestyle", "Pets"): ("pets", False),
+    ("Lifestyle", "Drinking"): ("drinking", False),
+    ("Lifestyle", "Smoking"): ("smoking", False),
+    ("Lifestyle", "Workout"): ("training_frequency", False),
+    ("Lifestyle", "Dietary Preference"): ("diet_preferences", False),
+    ("Lifestyle", "Social Media"): ("social_media_presence", False),
+    ("Lifestyle", "Sleeping Habits"): ("sleeping_habits", False),
+    ("Relationship Goals", "Looking for"): ("relationship_goals", False),
+    ("Languages I Know", None): ("languages", True),
+}
+
+# descriptors which are recognised by name whatever section they are sent in
+_DESCRIPTORS_BY_NAME: Dict[str, Tuple[str, bool]] = {
+    "Languages I Know": ("languages", True),
+}
+
 
 def match_additional_info_attr_name(
-    descriptor_section: str, descriptor_name: str
+    descriptor_section: str, descriptor_name: Optional[str]
 ) -> Tuple[str, bool]:
     """
     str: Return attribute name for AdditionalInfo class based on descriptor section and name
     bools: returns if attribute is multicategorcial or not (True if multicategorcial)
     """
-
-    def raise_err():
+    attr = DESCRIPTOR_REGISTRY.get((descriptor_section, descriptor_name))
+    if attr is None:
+        attr = _DESCRIPTORS_BY_NAME.get(descriptor_name or descriptor_section)
+    if attr is None:
         raise ValueError(
             f"Unknown descriptor section and name: {descriptor_section} {descriptor_name}"
         )
-
-    match (descriptor_section, descriptor_name):
-        case ("Basics", _):
-            match (descriptor_name):
-                case ("Zodiac"):
-                    return "zodiac_sign", False
-                case ("Education"):
-                    return "education_level", False
-                case ("Family Plans"):
-                    return "children_attitude", False
-                case ("COVID Vaccine"):
-                    return "covid_vaccine", False
-                case ("Personality Type"):
-                    return "personality_type", False
-                case ("Communication Style"):
-                    return "communication_style", False
-                case ("Love Style"):
-                    return "love_receive_language", False
-                case _:
-                    raise_err()
-        case ("Lifestyle", _):
-            match (descriptor_name):
-                case ("Pets"):
-                    return "pets", False
-                case ("Drinking"):
-                    return "drinking", False
-                case ("Smoking"):
-                    return "smoking", False
-                case ("Workout"):
-                    return "training_frequency", False
-                case ("Dietary Preference"):
-                    return "diet_preferences", False
-                case ("Social Media"):
-                    return "social_media_presence", False
-                case ("Sleeping Habits"):
-                    return "sleeping_habits", False
-                case _:
-                    raise_err()
-        case ("Relationship Goals", "Looking for"):
-            return "relationship_goals", False
-        case ("Lifestyle", "Pets"):
-            return "pets", False
-        case ("Languages I Know", None):
-            return "languages", True
-        case _:
-            raise_err()
+    return attr
 
 
 def parse_gender(result: Dict[str, Any]) -> Optional[str]:
@@ -91,109 +113,328 @@ def parse_gender(result: Dict[str, Any]) -> Optional[str]:
             return None
 
 
-def parse_profile_response(rsp: Dict[str, Any]) -> Profile:
-    """
-    Parse profile response from Tinder API
-    """
+def _parse_schools(result: Dict[str, Any]) -> Optional[List[str]]:
+    if len(result["schools"]) > 0:
+        return [school["name"] for school in result["schools"]]
+    return None
 
-    result = rsp["results"]
 
-    additional_info = AdditionalInfo()
-    # parse schools
-    if len(result["schools"]) > 0:
-        additional_info.schools = [school["name"] for school in result["schools"]]
-    # parse passions / interests
-    if len(result["user_interests"]["selected_interests"]) > 0:
-        additional_info.passions = [
-            passion["name"]
-            for passion in result["user_interests"]["selected_interests"]
-        ]
-    # add job title if exists (not sure if there can be more than one job possible)
-    if len(result["jobs"]) > 0:
-        job = result["jobs"][0]
-        if "title" in job:
-            additional_info.job_title = job["title"]["name"]
-        if "company" in job:
-            additional_info.company = job["company"]["name"]
-
-    # parse location (usually city)
+def _parse_passions(result: Dict[str, Any]) -> Optional[List[str]]:
+    # passions / interests
+    interests = result["user_interests"]["selected_interests"]
+    if len(interests) > 0:
+        return [passion["name"] for passion in interests]
+    return None
+
+
+def _parse_job(result: Dict[str, Any], key: str) -> Optional[str]:
+    # not sure if there can be more than one job possible, the first one is taken
+    if len(result["jobs"]) > 0 and key in result["jobs"][0]:
+        return result["jobs"][0][key]["name"]
+    return None
+
+
+def _parse_location(result: Dict[str, Any]) -> Optional[str]:
+    # usually city
     if "city" in result:
-        additional_info.location = result["city"]["name"]
+        return result["city"]["name"]
+    return None
 
-    # parse gender
-    additional_info.gender = parse_gender(result)
-    # parse sexual orientations
+
+def _parse_sexual_orientations(result: Dict[str, Any]) -> Optional[List[str]]:
     if "sexual_orientations" in result:
-        additional_info.sexual_orientations = [
-            orientation["name"] for orientation in result["sexual_orientations"]
-        ]
+        return [orientation["name"] for orientation in result["sexual_orientations"]]
+    return None
+
 
-    # parse additional features from "selected_descriptors" category
+# AdditionalInfo attribute -> parser of its value out of profile "results"
+# (attributes which are not listed here come from "selected_descriptors")
+PROFILE_FIELD_PARSERS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "schools": _parse_schools,
+    "passions": _parse_passions,
+    "job_title": lambda result: _parse_job(result, "title"),
+    "company": lambda result: _parse_job(result, "company"),
+    "location": _parse_location,
+    "gender": parse_gender,
+    "sexual_orientations": _parse_sexual_orientations,
+}
+
+
+def parse_descriptors(
+    result: Dict[str, Any],
+    strict: bool = True,
+    unknown: Optional["Counter[Tuple[str, Optional[str]]]"] = None,
+) -> Dict[str, Any]:
+    """
+    Returns AdditionalInfo attributes parsed from "selected_descriptors" category
+    Unknown descriptors raise ValueError, with strict=False they are skipped and
+    their (section name, descriptor name) counted in `unknown` if given
+    """
+    additional: Dict[str, Any] = {}
     for descriptor in result["selected_descriptors"]:
-        attr_name, is_multisel = match_additional_info_attr_name(
-            descriptor["section_name"], descriptor.get("name")
-        )
+        section, name = descriptor.get("section_name"), descriptor.get("name")
+        attr = DESCRIPTOR_REGISTRY.get((section, name))
+        if attr is None:
+            try:
+                attr = match_additional_info_attr_name(section, name)
+            except ValueError:
+                if strict:
+                    raise
+                if unknown is not None:
+                    unknown[(section, name)] += 1
+                logger.debug("Skipping unknown descriptor %s %s", section, name)
+                continue
+        attr_name, is_multisel = attr
         value = [desc["name"] for desc in descriptor["choice_selections"]]
-        if is_multisel is False:
-            value = value[0]
-        setattr(additional_info, attr_name, value)
-
-    # parse photos ignoring videos
-    photos = []
-    for photo in result["photos"]:
-        if photo["url"].endswith(".webp"):
+        if not value:
             continue
-        photos.append(photo["url"])
+        # single choice values repeat across profiles, share one string per value
+        additional[attr_name] = value if is_multisel else sys.intern(value[0])
+    return additional
+
+
+def parse_photos(result: Dict[str, Any]) -> List[str]:
+    """
+    Returns photo urls ignoring videos
+    """
+    return [
+        photo["url"] for photo in result["photos"] if not photo["url"].endswith(".webp")
+    ]
+
+
+def parse_profile_response(
+    rsp: Response,
+    strict: bool = True,
+    unknown: Optional["Counter[Tuple[str, Optional[str]]]"] = None,
+) -> Profile:
+    """
+    Parse profile response from Tinder API
+    Unknown descriptors raise ValueError, with strict=False they are skipped and
+    counted in `unknown` if given
+    """
+    rsp = decode_response(rsp)
+
+    result = rsp["results"]
+
+    # collected first, building AdditionalInfo at once is cheaper than setting fields
+    additional: Dict[str, Any] = {}
+    for attr_name, parse in PROFILE_FIELD_PARSERS.items():
+        value = parse(result)
+        if value is not None:
+            additional[attr_name] = value
+    additional.update(parse_descriptors(result, strict, unknown))
 
     # load mandatory fields
     return Profile(
         _id=result["_id"],
         bio=result["bio"],
-        birth_date=datetime.strptime(result["birth_date"], DATETIME_FORMAT),
+        birth_date=parse_birth_date(result["birth_date"]),
         name=result["name"],
-        photos=photos,
+        photos=parse_photos(result),
         distance_mi=result["distance_mi"],
-        additional=additional_info,
+        additional=AdditionalInfo(**additional),
+    )
+
+
+def parse_profile_response_lenient(
+    rsp: Response, unknown: Optional["Counter[Tuple[str, Optional[str]]]"] = None
+) -> Profile:
+    """
+    parse_profile_response with strict=False, used by the clients so that a
+    descriptor Tinder adds later does not fail the whole profile
+    """
+    return parse_profile_response(rsp, strict=False, unknown=unknown)
+
+
+def parse_match(match: Dict[str, Any]) -> Match:
+    """
+    Parse single match of the match response
+    """
+    return Match(match_id=match["_id"], profile_id=match["person"]["_id"])
+
+
+def parse_message(message: Dict[str, Any], match_id: Optional[str] = None) -> Message:
+    """
+    Parse single message, `match_id` is used when the message does not carry it
+    """
+    return Message(
+        _id=message["_id"],
+        match_id=message.get("match_id", match_id),
+        message=message["message"],
+        sent_date=parse_datetime(message["sent_date"]),
+        from_id=message["from"],
+        to_id=message["to"],
     )
 
 
-def parse_matches(rsp: Dict[str, Any]) -> Tuple[List[Match], Optional[str]]:
+def parse_update_match(
+    match: Dict[str, Any]
+) -> Tuple[Optional[Match], List[Message], Optional[str]]:
+    """
+    Parse single match of the updates response
+    Returns the match (None if it has no person), its messages and last activity date
+    """
+    match_id = match.get("_id", match.get("id"))
+    parsed = None
+    if "person" in match:
+        parsed = Match(match_id=match_id, profile_id=match["person"]["_id"])
+    messages = [
+        parse_message(message, match_id) for message in match.get("messages", [])
+    ]
+    return parsed, messages, match.get("last_activity_date")
+
+
+def parse_matches(rsp: Response) -> Tuple[List[Match], Optional[str]]:
     """
     Extract match ids from match response
     Additionally returns next page token for paginiation if there are more matches
     """
+    rsp = decode_response(rsp)
 
     next_page_token: Optional[str] = rsp["data"].get("next_page_token")
-    matches: List[Match] = []
-
-    for match in rsp["data"]["matches"]:
-        m = Match(
-            match_id=match["_id"],
-            profile_id=match["person"]["_id"],
-        )
-        matches.append(m)
+    matches = [parse_match(match) for match in rsp["data"]["matches"]]
 
     return matches, next_page_token
 
 
-def parse_messages(rsp: Dict[str, Any]) -> Tuple[List[Message], Optional[str]]:
+def parse_messages(rsp: Response) -> Tuple[List[Message], Optional[str]]:
     """
     Extract messages from message response
     Additionally returns next page token for paginiation if there are more messages
     """
+    rsp = decode_response(rsp)
 
     next_page_token: Optional[str] = rsp["data"].get("next_page_token")
+    messages = [parse_message(message) for message in rsp["data"]["messages"]]
+
+    return messages, next_page_token
+
+
+def parse_updates(rsp: Response) -> Updates:
+    """
+    Extract matches, messages and unmatches from updates response
+    Last activity date is taken from the response or from the newest match activity
+    """
+    rsp = decode_response(rsp)
+
+    matches: List[Match] = []
     messages: List[Message] = []
+    last_activity_date: Optional[str] = rsp.get("last_activity_date")
+
+    for match in rsp.get("matches", []):
+        parsed, match_messages, activity = parse_update_match(match)
+        if parsed is not None:
+            matches.append(parsed)
+        messages.extend(match_messages)
+        if activity and (last_activity_date is None or activity > last_activity_date):
+            last_activity_date = activity
+
+    return Updates(
+        matches=matches,
+        messages=messages,
+        unmatched_ids=list(rsp.get("blocks", [])),
+        last_activity_date=last_activity_date,
+    )
+
+
+def parse_matches_stream(body: Body) -> StreamedPage[Match]:
+    """
+    Streaming variant of parse_matches, `body` is raw response (bytes or chunks).
+    Matches are decoded one by one while iterating, next_page_token is
+    available after the iteration.
+    """
+    return StreamedPage(
+        body, [("data", "matches")], lambda path, match: [parse_match(match)]
+    )
+
+
+def parse_messages_stream(body: Body) -> StreamedPage[Message]:
+    """
+    Streaming variant of parse_messages, see parse_matches_stream
+    """
+    return StreamedPage(
+        body, [("data", "messages")], lambda path, message: [parse_message(message)]
+    )
+
+
+class StreamedUpdates(StreamedResponse[Union[Match, Message]]):
+    """
+    Matches and messages of streamed updates response, unmatched ids and last
+    activity date are complete after the iteration
+    """
+
+    def __init__(self, body: Body) -> None:
+        super().__init__(body, [("matches",)], self._convert_match)
+        self._last_match_activity: Optional[str] = None
+
+    def _convert_match(
+        self, path: Path, match: Dict[str, Any]
+    ) -> List[Union[Match, Message]]:
+        parsed, messages, activity = parse_update_match(match)
+        if activity and (
+            self._last_match_activity is None or activity > self._last_match_activity
+        ):
+            self._last_match_activity = activity
+        return ([parsed] if parsed is not None else []) + messages
 
-    for message in rsp["data"]["messages"]:
-        m = Message(
-            _id=message["_id"],
-            match_id=message["match_id"],
-            message=message["message"],
-            sent_date=datetime.strptime(message["sent_date"], DATETIME_FORMAT),
-            from_id=message["from"],
-            to_id=message["to"],
+    @property
+    def unmatched_ids(self) -> List[str]:
+        return list(self.values.get(("blocks",), []))
+
+    @property
+    def last_activity_date(self) -> Optional[str]:
+        dates = [self.values.get(("last_activity_date",)), self._last_match_activity]
+        return max((date for date in dates if date), default=None)
+
+
+def parse_updates_stream(body: Body) -> StreamedUpdates:
+    """
+    Streaming variant of parse_updates, yields Match and Message objects
+    """
+    return StreamedUpdates(body)
+
+
+def parse_recommendations(
+    rsp: Response, unknown: Optional["Counter[Tuple[str, Optional[str]]]"] = None
+) -> List[Profile]:
+    """
+    Parse recommendations (/v2/recs/core) response into profiles
+    Results which are not users or cannot be parsed are skipped, unknown
+    descriptors are skipped and counted in `unknown` if given
+    """
+    rsp = decode_response(rsp)
+
+    profiles: List[Profile] = []
+
+    for rec in rsp.get("data", {}).get("results", []):
+        if rec.get("type", "user") != "user" or "user" not in rec:
+            continue
+        user = rec["user"]
+        interests = rec.get("experiment_info", {}).get(
+            "user_interests", user.get("user_interests", {})
         )
-        messages.append(m)
+        # recs carry distance and interests outside of the user object (copied,
+        # the response is not modified)
+        result = {
+            "schools": [],
+            "jobs": [],
+            "selected_descriptors": [],
+            "photos": [],
+            "bio": "",
+            "show_gender_on_profile": "gender" in user,
+            **user,
+            "distance_mi": rec.get("distance_mi", user.get("distance_mi")),
+            "user_interests": {"selected_interests": [], **interests},
+        }
+        try:
+            profiles.append(
+                parse_profile_response(
+                    {"results": result}, strict=False, unknown=unknown
+                )
+            )
+        except (KeyError, ValueError) as err:
+            logger.debug(
+                "Skipping unparsable recommendation %s: %r", user.get("_id"), err
+            )
 
-    return messages, next_page_token
+    return profiles
@@ -0,0 +1,541 @@
+from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Tuple
+from collections import Counter
+from .models import Profile
+from .parse_utils import parse_profile_response_lenient, parse_matches, parse_messages
+from .ratelimit import RateLimiter
+from .resilience import RetryPolicy, CircuitBreaker
+from .errors import (
+    TinderAPIError,
+    TransientError,
+    RateLimitedError,
+    InvalidResponseError,
+    error_from_status,
+)
+from .cache import ResponseCache
+from .store import ProfileStore
+from .seen import SeenFilter
+from .codec import JSONCodec
+from .metrics import ClientMetrics, timed_parse
+from .hooks import HookChain, Span, account_label
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+# keyword arguments of general_request for one API call
+Call = Dict[str, Any]
+
+
+class Defaults:
+    APP_VERSION = "6.9.4"
+    PLATFORM = "ios"
+    USER_AGENT = "Tinder/7.5.3 (iPhone; iOS 10.3.2; Scale/2.00)"
+
+
+class TinderSMSApiEndpoints:
+    HOST = "https://api.gotinder.com"
+    CODE_REQUEST_PATH = "/v2/auth/sms/send?auth_type=sms"
+    CODE_VALIDATE_PATH = "/v2/auth/sms/validate?auth_type=sms"
+    TOKEN_PATH = "/v2/auth/login/sms"
+    CODE_REQUEST_URL = f"{HOST}{CODE_REQUEST_PATH}"
+    CODE_VALIDATE_URL = f"{HOST}{CODE_VALIDATE_PATH}"
+    TOKEN_URL = f"{HOST}{TOKEN_PATH}"
+
+
+class RequestPipeline:
+    """
+    Steps of a Tinder API call which do no I/O, shared by the sync and async
+    clients (BaseTinderClient, AsyncBaseTinderClient).
+
+    A call is _begin, then per attempt _before_send, the transport request,
+    _observe_send (or _network_error), _check_status and _decode, with
+    _retry_delay between attempts, _parse and finally _finish. The clients add
+    only the waiting (rate limiter, semaphore), the transport request and the
+    sleeping between attempts.
+    """
+
+    app_version: str
+    platform: str
+    user_agent: str
+    rate_limiter: RateLimiter
+    retry_policy: RetryPolicy
+    circuit_breaker: CircuitBreaker
+    json_codec: JSONCodec
+    host: str
+    metrics: Optional[ClientMetrics]
+    hooks: Optional[HookChain]
+
+    def __init__(
+        self,
+        app_version: str,
+        platform: str,
+        user_agent: str,
+        rate_limiter: RateLimiter,
+        retry_policy: RetryPolicy,
+        circuit_breaker: CircuitBreaker,
+        json_codec: JSONCodec,
+        host: str,
+        metrics: Optional[ClientMetrics],
+        hooks: Optional[HookChain],
+    ) -> None:
+        self.app_version = app_version
+        self.platform = platform
+        self.user_agent = user_agent
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+        self.json_codec = json_codec
+        self.host = host
+        self.metrics = metrics
+        self.hooks = hooks
+
+    @property
+    def account(self) -> Optional[str]:
+        """
+        Label of the client's account in spans
+        """
+        return None
+
+    def get_headers(self) -> Dict[str, str]:
+        """
+        Returns the headers for the Tinder API
+        """
+        return {
+            "app_version": self.app_version,
+            "platform": self.platform,
+            "content-type": "application/json",
+            "User-agent": self.user_agent,
+        }
+
+    def _begin(
+        self,
+        url: str,
+        method: str,
+        data: Optional[Dict[str, Any]],
+        idempotent: Optional[bool],
+    ) -> Tuple[Optional[bytes], bool, Optional[Span]]:
+        """
+        Returns encoded body, whether the call can be retried and its span
+        """
+        body = self.json_codec.dumps(data) if data else None
+        if idempotent is None:
+            idempotent = self.retry_policy.is_idempotent(method)
+        self.retry_policy.request_sent()
+        span = None
+        if self.hooks is not None:
+            span = self.hooks.span(url, method, self.account)
+        return body, idempotent, span
+
+    def _retry_delay(
+        self,
+        err: TinderAPIError,
+        attempt: int,
+        idempotent: bool,
+        url: str,
+        err_msg: str,
+        span: Optional[Span],
+    ) -> Optional[float]:
+        """
+        Returns seconds to sleep before the next attempt, None when the error
+        is final (the caller raises it)
+        """
+        if span is not None:
+            self.hooks.on_error(span, err)
+        if not self.retry_policy.should_retry(err, attempt, idempotent):
+            logger.error("%s:\n %s", err_msg, err)
+            return None
+        if self.metrics is not None:
+            self.metrics.observe_retry(url)
+        delay = self.retry_policy.backoff(err, attempt)
+        logger.warning("%s: %s, retrying in %.2f s", err_msg, err, delay)
+        if span is not None:
+            span.add("backoff", delay)
+        return delay
+
+    def _finish(self, span: Optional[Span], error: Optional[BaseException] = None):
+        if span is not None:
+            self.hooks.finish(span, error)
+
+    def _parse(
+        self, parser: Callable[[Any], Any], res: Any, span: Optional[Span]
+    ) -> Any:
+        """
+        Parses decoded response, parse time is recorded in metrics and span
+        """
+        if span is None:
+            return timed_parse(self.metrics, parser, res)
+        started = time.perf_counter()
+        try:
+            result = timed_parse(self.metrics, parser, res)
+        except Exception as err:
+            self.hooks.on_error(span, err)
+            raise
+        finally:
+            span.add("parse", time.perf_counter() - started)
+        self.hooks.after_parse(span, result)
+        return result
+
+    def _before_send(self, span: Optional[Span], waited: float) -> None:
+        """
+        Records time spent waiting since `waited` (perf_counter) in the span
+        """
+        if span is not None:
+            span.add("wait", time.perf_counter() - waited)
+            self.hooks.before_send(span)
+
+    def _observe_send(
+        self,
+        url: str,
+        method: str,
+        body: Optional[bytes],
+        elapsed: float,
+        span: Optional[Span],
+        status: Optional[int] = None,
+        content: Optional[bytes] = None,
+    ) -> None:
+        """
+        Records sent attempt in metrics and span, status is None when no
+        response arrived, content is None also for streamed responses (their
+        body is counted as it is read)
+        """
+        if self.metrics is not None:
+            self.metrics.observe_request(
+                url,
+                method,
+                status,
+                elapsed,
+                len(body or b""),
+                0 if content is None else len(content),
+            )
+        if span is not None:
+            span.add("send", elapsed)
+            if status is not None:
+                self.hooks.after_receive(span, status, content)
+
+    def _network_error(
+        self,
+        url: str,
+        method: str,
+        body: Optional[bytes],
+        elapsed: float,
+        span: Optional[Span],
+        message: str,
+    ) -> TransientError:
+        """
+        Records attempt which got no response, returns the error to raise
+        """
+        self.circuit_breaker.record_failure(url)
+        self._observe_send(url, method, body, elapsed, span)
+        return TransientError(message, url=url)
+
+    def _check_status(
+        self, url: str, method: str, status: int, headers: Mapping[str, str]
+    ) -> None:
+        """
+        Feeds the response to the rate limiter and circuit breaker, raises
+        TinderAPIError subclass for error statuses
+        """
+        self.rate_limiter.feedback(method, url, status, headers)
+        error = error_from_status(status, headers, url)
+        transient = isinstance(error, TransientError)
+        if transient and not isinstance(error, RateLimitedError):
+            self.circuit_breaker.record_failure(url)
+            raise error
+        # any other answer means the API host is up
+        self.circuit_breaker.record_success(url)
+        if error is not None:
+            raise error
+
+    def _decode(
+        self, url: str, status: int, content: bytes, span: Optional[Span]
+    ) -> Any:
+        """
+        Decodes JSON response, decode time is recorded in metrics and span
+        """
+        metrics = self.metrics
+        try:
+            if metrics is None and span is None:
+                return self.json_codec.loads(content)
+            started = time.perf_counter()
+            decoded = self.json_codec.loads(content)
+            elapsed = time.perf_counter() - started
+            if metrics is not None:
+                metrics.observe_decode(url, elapsed)
+            if span is not None:
+                span.add("decode", elapsed)
+            return decoded
+        except ValueError as err:
+            raise InvalidResponseError(
+                f"Response from {url} is not valid JSON", status, url
+            ) from err
+
+
+class TinderSMSCalls:
+    """
+    Calls of the SMS authentication flow shared by TinderSMSAuth and
+    AsyncTinderSMSAuth, see TinderCalls
+    """
+
+    phone_number: int
+    refresh_token: Optional[str]
+    host: str
+
+    @property
+    def account(self) -> Optional[str]:
+        return account_label(self.phone_number)
+
+    def _request_otp_sms_call(self) -> Call:
+        return dict(
+            url=f"{self.host}{TinderSMSApiEndpoints.CODE_REQUEST_PATH}",
+            method="POST",
+            data={"phone_number": self.phone_number},
+            err_msg="Failed to request OTP SMS",
+        )
+
+    def _get_refresh_token_call(self, otp_code: str) -> Call:
+        return dict(
+            url=f"{self.host}{TinderSMSApiEndpoints.CODE_VALIDATE_PATH}",
+            method="POST",
+            data={"otp_code": otp_code, "phone_number": self.phone_number},
+            err_msg="Failed to get refresh token",
+        )
+
+    def _set_refresh_token(self, rsp: Dict[str, Any]) -> None:
+        if rsp.get("data")["validated"] is False:
+            raise ValueError("OTP code is not valid")
+        self.refresh_token = rsp.get("data")["refresh_token"]
+
+    def _get_auth_token_call(self) -> Call:
+        if self.refresh_token is None:
+            raise ValueError("Refresh token is not obtained yet")
+        return dict(
+            url=f"{self.host}{TinderSMSApiEndpoints.TOKEN_PATH}",
+            data={"refresh_token": self.refresh_token},
+            err_msg="Failed to get API auth token",
+            method="POST",
+        )
+
+
+class TinderCalls:
+    """
+    Calls of the Tinder API shared by TinderClient and AsyncTinderClient.
+
+    `_<method>_call` returns keyword arguments of general_request for the
+    client method of the same name, the clients only send them.
+    """
+
+    auth_token: str
+    host: str
+    metrics: Optional[ClientMetrics]
+    cache: Optional[ResponseCache]
+    store: Optional[ProfileStore]
+    seen: Optional[SeenFilter]
+    # (section name, descriptor name) -> count of descriptors skipped as unknown
+    unknown_descriptors: "Counter[Tuple[str, Optional[str]]]"
+    _unknown_lock: threading.Lock
+
+    @property
+    def account(self) -> Optional[str]:
+        return account_label(self.auth_token)
+
+    def parse_profile_response_lenient(self, rsp: Any) -> Profile:
+        """
+        parse_profile_response_lenient counting unknown descriptors of this client
+        """
+        unknown: "Counter[Tuple[str, Optional[str]]]" = Counter()
+        profile = parse_profile_response_lenient(rsp, unknown)
+        if unknown:
+            with self._unknown_lock:
+                self.unknown_descriptors.update(unknown)
+        return profile
+
+    def get_headers(self) -> Dict[str, str]:
+        return {
+            "app_version": self.app_version,
+            "platform": self.platform,
+            "content-type": "application/json",
+            "User-agent": self.user_agent,
+            "X-Auth-Token": self.auth_token,
+        }
+
+    def _cache_lookup(self, endpoint: str, key: Hashable) -> Tuple[bool, Any]:
+        found, value = self.cache.get(endpoint, key)
+        if self.metrics is not None:
+            self.metrics.observe_cache(endpoint, found)
+        return found, value
+
+    def invalidate(self, endpoint: str, key: Optional[Hashable] = None) -> None:
+        """
+        Drops cached result of the endpoint method (all of them when key is None)
+        ex: invalidate("get_profile", person_id)
+        """
+        if self.cache is not None:
+            self.cache.invalidate(endpoint, key)
+
+    def _location_changed(self) -> None:
+        # distances of cached profiles are relative to your location (the
+        # clients mark the profiles of the store stale as well)
+        self.invalidate("get_self")
+        self.invalidate("get_meta")
+        self.invalidate("get_profile")
+
+    def _get_recommendations_call(self) -> Call:
+        return dict(
+            url=f"{self.host}/users/recs",
+            method="GET",
+            err_msg="Something went wrong with getting recomendations",
+        )
+
+    def _get_updates_call(self, last_activity_date: str) -> Call:
+        return dict(
+            url=f"{self.host}/updates",
+            method="POST",
+            err_msg="Something went wrong with getting updates",
+            data={"last_activity_date": last_activity_date},
+            idempotent=True,
+        )
+
+    def _get_self_call(self) -> Call:
+        return dict(
+            url=f"{self.host}/profile",
+            method="GET",
+            err_msg="Something went wrong with getting your data",
+        )
+
+    def _change_preferences_call(self, preferences: Dict[str, Any]) -> Call:
+        return dict(
+            url=f"{self.host}/profile",
+            method="POST",
+            err_msg="Something went wrong with changing your preferences",
+            data=preferences,
+        )
+
+    def _get_meta_call(self) -> Call:
+        return dict(
+            url=f"{self.host}/meta",
+            method="GET",
+            err_msg="Something went wrong with getting your metadata",
+        )
+
+    def _update_location_call(self, lat: float, lon: float) -> Call:
+        return dict(
+            url=f"{self.host}/passport/user/travel",
+            method="POST",
+            err_msg="Something went wrong with updating your location",
+            data={"lat": lat, "lon": lon},
+        )
+
+    def _reset_real_location_call(self) -> Call:
+        return dict(
+            url=f"{self.host}/passport/user/reset",
+            method="POST",
+            err_msg="Something went wrong with resetting your location",
+        )
+
+    def _get_recommendations_v2_call(self) -> Call:
+        return dict(
+            url=f"{self.host}/v2/recs/core?locale=en-US",
+            method="GET",
+            err_msg="Something went wrong with getting recomendations",
+        )
+
+    def _set_webprofileusername_call(self, username: str) -> Call:
+        return dict(
+            url=f"{self.host}/profile/{username}",
+            method="PUT",
+            err_msg="Something went wrong with setting your webprofile username",
+            data={"username": username},
+        )
+
+    def _reset_webprofileusername_call(self, username: str) -> Call:
+        return dict(
+            url=f"{self.host}/profile/{username}",
+            method="DELETE",
+            err_msg="Something went wrong with resetting your webprofile username",
+        )
+
+    def _get_profile_call(self, person_id: str) -> Call:
+        return dict(
+            url=f"{self.host}/user/{person_id}",
+            method="GET",
+            err_msg="Something went wrong with getting that person",
+            parser=self.parse_profile_response_lenient,
+        )
+
+    def _send_msg_call(self, match_id: str, msg: str) -> Call:
+        return dict(
+            url=f"{self.host}/user/matches/{match_id}",
+            method="POST",
+            err_msg="Something went wrong. Could not send your message",
+            data={"message": msg},
+        )
+
+    def _superlike_call(self, person_id: str) -> Call:
+        return dict(
+            url=f"{self.host}/like/{person_id}/super",
+            method="POST",
+            err_msg="Something went wrong. Could not superlike",
+        )
+
+    def _like_call(self, person_id: str) -> Call:
+        return dict(
+            url=f"{self.host}/like/{person_id}",
+            method="GET",
+            err_msg="Something went wrong. Could not like",
+        )
+
+    def _dislike_call(self, person_id: str) -> Call:
+        return dict(
+            url=f"{self.host}/pass/{person_id}",
+            method="GET",
+            err_msg="Something went wrong. Could not dislike",
+        )
+
+    def _report_call(self, person_id: str, cause: int, explanation: str) -> Call:
+        return dict(
+            url=f"{self.host}/report/{person_id}",
+            method="POST",
+            err_msg="Something went wrong. Could not report",
+            data={"cause": cause, "text": explanation},
+        )
+
+    def _match_info_call(self, match_id: str) -> Call:
+        return dict(
+            url=f"{self.host}/v2/matches/{match_id}?locale=en&is_tinder_u=false",
+            method="GET",
+            err_msg="Something went wrong. Could not get your match info",
+        )
+
+    def _get_matches_call(self, limit: int, next_page_token: Optional[str]) -> Call:
+        url = f"{self.host}/v2/matches?locale=en&count={limit}&is_tinder_u=false"
+        if next_page_token is not None:
+            url += f"&page_token={next_page_token}"
+        return dict(
+            url=url,
+            method="GET",
+            err_msg="Something went wrong. Could not get your match info",
+            parser=parse_matches,
+        )
+
+    def _get_messages_call(
+        self, match_id: str, limit: int, next_page_token: Optional[str]
+    ) -> Call:
+        url = f"{self.host}/v2/matches/{match_id}/messages?locale=en&count={limit}"
+        if next_page_token is not None:
+            url += f"&page_token={next_page_token}"
+        return dict(
+            url=url,
+            method="GET",
+            err_msg="Something went wrong. Could not get your match info",
+            parser=parse_messages,
+        )
+
+    def _stream(self, call: Call) -> Call:
+        """
+        Streamed variant of the call, its raw body is parsed by the caller
+        """
+        call.pop("parser", None)
+        call["stream"] = True
+        return call
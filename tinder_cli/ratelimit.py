@@ -0,0 +1,225 @@
+from typing import Dict, Mapping, Optional
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+from random import uniform
+import asyncio
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class EndpointClass:
+    SWIPES = "swipes"
+    SUPERLIKES = "superlikes"
+    MESSAGES = "messages"
+    READS = "reads"
+    WRITES = "writes"
+
+
+@dataclass
+class Budget:
+    """
+    Request budget of one endpoint class: sustained rate and burst size
+    """
+
+    rate: float  # requests per second
+    burst: int = 1
+
+
+class RateLimitDefaults:
+    BUDGETS = {
+        EndpointClass.SWIPES: Budget(rate=2.0, burst=5),
+        EndpointClass.SUPERLIKES: Budget(rate=0.2, burst=1),
+        EndpointClass.MESSAGES: Budget(rate=0.5, burst=3),
+        EndpointClass.READS: Budget(rate=5.0, burst=10),
+        EndpointClass.WRITES: Budget(rate=1.0, burst=2),
+    }
+    # rate is multiplied by this factor on every 429 response
+    DECREASE_FACTOR = 0.5
+    # rate never drops below this fraction of the budget
+    MIN_RATE_FRACTION = 0.05
+    # fraction of the budget regained with every successful response
+    INCREASE_FRACTION = 0.05
+    # pause applied on 429 without Retry-After header (seconds)
+    DEFAULT_RETRY_AFTER = 1.0
+
+
+def classify_endpoint(method: str, url: str) -> str:
+    """
+    Returns endpoint class (one of EndpointClass) of the request
+    """
+    path = urlsplit(url).path
+    if path.startswith("/like/") and path.endswith("/super"):
+        return EndpointClass.SUPERLIKES
+    if path.startswith("/like/") or path.startswith("/pass/"):
+        return EndpointClass.SWIPES
+    if path.startswith("/user/matches/") and method == "POST":
+        return EndpointClass.MESSAGES
+    if method == "GET" or path == "/updates":
+        return EndpointClass.READS
+    return EndpointClass.WRITES
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Returns number of seconds from Retry-After header (delta seconds or HTTP date)
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """
+    Thread safe token bucket with adaptive refill rate (AIMD).
+
+    Callers reserve a token and get back how long they have to wait for it, so
+    the same bucket can be used by threads (time.sleep) and asyncio tasks
+    (asyncio.sleep) at once. The lock is only held for the bookkeeping.
+    """
+
+    def __init__(self, budget: Budget) -> None:
+        self.max_rate = budget.rate
+        self.min_rate = budget.rate * RateLimitDefaults.MIN_RATE_FRACTION
+        self.rate = budget.rate
+        self.capacity = budget.burst
+        self.tokens = float(budget.burst)
+        # refill starts at this moment, it is in the future while server asks to back off
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self._updated = now
+
+    def reserve(self) -> float:
+        """
+        Takes one token and returns number of seconds to wait before using it
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            wait = max(0.0, self._updated - now)
+            if self.tokens < 0:
+                wait += -self.tokens / self.rate
+            return wait
+
+    def throttled(self, retry_after: Optional[float]) -> None:
+        """
+        Slows the bucket down after the server rejected a request
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate * RateLimitDefaults.DECREASE_FACTOR)
+            if retry_after is None:
+                retry_after = RateLimitDefaults.DEFAULT_RETRY_AFTER
+            # pause the refill and drop the burst so requests resume at the reduced rate
+            self._updated = max(self._updated, now + retry_after)
+            self.tokens = min(self.tokens, 0.0)
+
+    def succeeded(self) -> None:
+        """
+        Slowly restores the configured rate after successful responses
+        """
+        if self.rate >= self.max_rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = min(
+                self.max_rate,
+                self.rate + self.max_rate * RateLimitDefaults.INCREASE_FRACTION,
+            )
+
+
+class HumanJitter:
+    """
+    Optional pacing policy adding random delay between requests to appear as a real user
+    """
+
+    def __init__(self, min_delay: float = 0.0, max_delay: float = 3.0) -> None:
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+
+    def delay(self, endpoint_class: Optional[str] = None) -> float:
+        return uniform(self.min_delay, self.max_delay)
+
+
+class RateLimiter:
+    """
+    Client side request scheduler with one token bucket per endpoint class.
+
+    One instance can be shared by several clients (of the same account), all
+    threads and asyncio tasks using it are throttled together.
+    """
+
+    buckets: Dict[str, TokenBucket]
+    pacing: Optional[HumanJitter]
+
+    def __init__(
+        self,
+        budgets: Optional[Mapping[str, Budget]] = None,
+        pacing: Optional[HumanJitter] = None,
+    ) -> None:
+        budgets = {**RateLimitDefaults.BUDGETS, **(budgets or {})}
+        self.buckets = {name: TokenBucket(budget) for name, budget in budgets.items()}
+        self.pacing = pacing
+
+    def _delay(self, method: str, url: str) -> float:
+        endpoint_class = classify_endpoint(method, url)
+        delay = self.buckets[endpoint_class].reserve()
+        if self.pacing is not None:
+            delay += self.pacing.delay(endpoint_class)
+        if delay > 0:
+            logger.debug("Throttling %s request for %.3f s", endpoint_class, delay)
+        return delay
+
+    def acquire(self, method: str, url: str) -> None:
+        """
+        Blocks current thread until the request is allowed to be sent
+        """
+        delay = self._delay(method, url)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, method: str, url: str) -> None:
+        """
+        Suspends current task until the request is allowed to be sent
+        """
+        delay = self._delay(method, url)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def feedback(self, method: str, url: str, status_code: int, headers: Mapping) -> None:
+        """
+        Adapts refill rate of the endpoint class based on the server response
+        """
+        bucket = self.buckets[classify_endpoint(method, url)]
+        # 503 with Retry-After is the server asking to back off as well
+        if status_code == 429 or (status_code == 503 and "Retry-After" in headers):
+            retry_after = parse_retry_after(headers.get("Retry-After"))
+            logger.warning(
+                "Rate limited by server on %s, retrying after %s s", url, retry_after
+            )
+            bucket.throttled(retry_after)
+        elif status_code < 400:
+            bucket.succeeded()
@@ -0,0 +1,336 @@
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from collections import Counter, OrderedDict
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, replace
+from .models import Profile
+from .parse_utils import parse_recommendations
+from .metrics import timed_parse
+from .seen import SeenFilter
+import asyncio
+import logging
+import queue
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+
+class RecsDefaults:
+    # maximum number of candidates waiting in the buffer
+    MAX_BUFFERED = 60
+    # buffer is refilled as soon as it holds this many candidates or less
+    LOW_WATER_MARK = 15
+    # seconds to wait before asking again after recs ran out or the request failed
+    RETRY_DELAY = 10.0
+    # number of most recently handed out ids remembered to drop repeated recs,
+    # older ones are left to the seen filter
+    MAX_HANDED = 10_000
+
+
+@dataclass
+class FeederStats:
+    fetches: int = 0
+    failed_fetches: int = 0
+    empty_fetches: int = 0  # fetches which brought no new candidates
+    received: int = 0
+    duplicates: int = 0
+    handed_out: int = 0
+    waits: int = 0  # get calls which found the buffer empty
+    buffered: int = 0
+
+
+class _FeederBase(ABC):
+    def __init__(
+        self,
+        client,
+        max_buffered: int,
+        low_water_mark: int,
+        retry_delay: float,
+        seen: Optional[SeenFilter],
+        max_handed: int,
+    ) -> None:
+        if not 0 <= low_water_mark < max_buffered:
+            raise ValueError("low_water_mark has to be between 0 and max_buffered")
+        self.client = client
+        self.max_buffered = max_buffered
+        self.low_water_mark = low_water_mark
+        self.retry_delay = retry_delay
+        # profiles swiped on (in any session) are dropped, client's filter by default
+        self.seen = seen if seen is not None else getattr(client, "seen", None)
+        # profiles handed out by this feeder, they may not be swiped on yet (LRU)
+        self.max_handed = max_handed
+        self._handed_ids: "OrderedDict[str, None]" = OrderedDict()
+        self._stats = FeederStats()
+        # (section name, descriptor name) -> count of descriptors skipped as unknown
+        self.unknown_descriptors: "Counter[Tuple[str, Optional[str]]]" = Counter()
+        self._lock = threading.Lock()
+
+    def _accept(self, rsp: Dict[str, Any]) -> List[Profile]:
+        """
+        Parses recs response, returns only candidates which were not seen before
+        """
+        unknown: "Counter[Tuple[str, Optional[str]]]" = Counter()
+        profiles = timed_parse(
+            getattr(self.client, "metrics", None), parse_recommendations, rsp, unknown
+        )
+        fresh: List[Profile] = []
+        with self._lock:
+            self.unknown_descriptors.update(unknown)
+            self._stats.fetches += 1
+            self._stats.received += len(profiles)
+            for profile in profiles:
+                if profile._id in self._handed_ids:
+                    self._handed_ids.move_to_end(profile._id)
+                    self._stats.duplicates += 1
+                    continue
+                if self.seen is not None and profile._id in self.seen:
+                    self._stats.duplicates += 1
+                    continue
+                self._remember(profile._id)
+                fresh.append(profile)
+            if not fresh:
+                self._stats.empty_fetches += 1
+        return fresh
+
+    def _remember(self, person_id: str) -> None:
+        # called with self._lock held
+        self._handed_ids[person_id] = None
+        self._handed_ids.move_to_end(person_id)
+        while len(self._handed_ids) > self.max_handed:
+            self._handed_ids.popitem(last=False)
+
+    def _fetch_failed(self) -> None:
+        logger.exception("Fetching recommendations failed")
+        with self._lock:
+            self._stats.failed_fetches += 1
+
+    def _handed_out(self, waited: bool) -> None:
+        with self._lock:
+            self._stats.handed_out += 1
+            self._stats.waits += waited
+
+    def mark_seen(self, person_id: str) -> None:
+        """
+        Marks profile as seen (e.g. swiped elsewhere), it will not be handed out
+        """
+        with self._lock:
+            self._remember(person_id)
+
+    @abstractmethod
+    def _buffered(self) -> int:
+        """
+        Number of candidates waiting in the buffer
+        """
+
+    def stats(self) -> FeederStats:
+        with self._lock:
+            return replace(self._stats, buffered=self._buffered())
+
+
+class RecommendationFeeder(_FeederBase):
+    """
+    Buffer of swipe candidates refilled from get_recommendations_v2 in the background.
+
+    Once the buffer drops to `low_water_mark` candidates a background thread
+    fetches next recs, so consumers are served from the buffer while the
+    request is in flight. Profiles already handed out or found in the seen
+    filter (the client's one unless `seen` is given) are dropped, at most
+    `max_buffered` candidates are kept. Only the last `max_handed` handed out
+    ids are remembered, older ones are expected to be in the seen filter.
+
+    with RecommendationFeeder(client) as feeder:
+        for profile in feeder:
+            ...
+    """
+
+    def __init__(
+        self,
+        client,
+        max_buffered: int = RecsDefaults.MAX_BUFFERED,
+        low_water_mark: int = RecsDefaults.LOW_WATER_MARK,
+        retry_delay: float = RecsDefaults.RETRY_DELAY,
+        seen: Optional[SeenFilter] = None,
+        max_handed: int = RecsDefaults.MAX_HANDED,
+    ) -> None:
+        super().__init__(
+            client, max_buffered, low_water_mark, retry_delay, seen, max_handed
+        )
+        self._buffer: "queue.Queue[Profile]" = queue.Queue(maxsize=max_buffered)
+        self._refill = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _buffered(self) -> int:
+        return self._buffer.qsize()
+
+    def start(self) -> None:
+        """
+        Starts the background refill thread
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="tinder-recs-feeder", daemon=True
+        )
+        self._thread.start()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        with self._refill:
+            self._refill.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def __enter__(self) -> "RecommendationFeeder":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _put(self, profile: Profile) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._buffer.put(profile, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self) -> None:
+        while True:
+            with self._refill:
+                self._refill.wait_for(
+                    lambda: self._stop.is_set()
+                    or self._buffer.qsize() <= self.low_water_mark
+                )
+            if self._stop.is_set():
+                return
+            try:
+                rsp = self.client.get_recommendations_v2()
+            except Exception:
+                self._fetch_failed()
+                self._stop.wait(self.retry_delay)
+                continue
+            profiles = self._accept(rsp)
+            if not profiles:
+                self._stop.wait(self.retry_delay)
+                continue
+            for profile in profiles:
+                if not self._put(profile):
+                    return
+
+    def get(self, timeout: Optional[float] = None) -> Profile:
+        """
+        Returns next candidate, waits only when the buffer is empty.
+        Raises queue.Empty if no candidate arrives within timeout.
+        """
+        waited = False
+        try:
+            profile = self._buffer.get_nowait()
+        except queue.Empty:
+            waited = True
+            profile = self._buffer.get(timeout=timeout)
+        self._handed_out(waited)
+        if self._buffer.qsize() <= self.low_water_mark:
+            with self._refill:
+                self._refill.notify()
+        return profile
+
+    def __iter__(self) -> Iterator[Profile]:
+        while not self._stop.is_set():
+            try:
+                yield self.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+
+class AsyncRecommendationFeeder(_FeederBase):
+    """
+    asyncio variant of RecommendationFeeder, `client` has to be AsyncTinderClient
+    """
+
+    def __init__(
+        self,
+        client,
+        max_buffered: int = RecsDefaults.MAX_BUFFERED,
+        low_water_mark: int = RecsDefaults.LOW_WATER_MARK,
+        retry_delay: float = RecsDefaults.RETRY_DELAY,
+        seen: Optional[SeenFilter] = None,
+        max_handed: int = RecsDefaults.MAX_HANDED,
+    ) -> None:
+        super().__init__(
+            client, max_buffered, low_water_mark, retry_delay, seen, max_handed
+        )
+        self._buffer: Optional[asyncio.Queue] = None
+        self._refill: Optional[asyncio.Condition] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _buffered(self) -> int:
+        return self._buffer.qsize() if self._buffer is not None else 0
+
+    def start(self) -> None:
+        """
+        Starts the background refill task (has to be called in a running loop)
+        """
+        if self._task is not None and not self._task.done():
+            return
+        if self._buffer is None:
+            self._buffer = asyncio.Queue(maxsize=self.max_buffered)
+            self._refill = asyncio.Condition()
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def __aenter__(self) -> "AsyncRecommendationFeeder":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _run(self) -> None:
+        while True:
+            async with self._refill:
+                await self._refill.wait_for(
+                    lambda: self._buffer.qsize() <= self.low_water_mark
+                )
+            try:
+                rsp = await self.client.get_recommendations_v2()
+            except Exception:
+                self._fetch_failed()
+                await asyncio.sleep(self.retry_delay)
+                continue
+            profiles = self._accept(rsp)
+            if not profiles:
+                await asyncio.sleep(self.retry_delay)
+                continue
+            for profile in profiles:
+                await self._buffer.put(profile)
+
+    async def get(self) -> Profile:
+        """
+        Returns next candidate, waits only when the buffer is empty
+        """
+        if self._task is None:
+            self.start()
+        waited = self._buffer.empty()
+        profile = await self._buffer.get()
+        self._handed_out(waited)
+        if self._buffer.qsize() <= self.low_water_mark:
+            async with self._refill:
+                self._refill.notify()
+        return profile
+
+    async def __aiter__(self) -> AsyncIterator[Profile]:
+        while True:
+            yield await self.get()
@@ -0,0 +1,175 @@
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+from random import uniform
+from .errors import CircuitOpenError, RateLimitedError, TransientError
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class RetryDefaults:
+    MAX_ATTEMPTS = 3
+    BASE_DELAY = 0.5  # seconds
+    MAX_DELAY = 20.0  # seconds
+    # retries may add at most this fraction of extra requests on top of the regular ones
+    BUDGET_RATIO = 0.2
+    # at most this many retries can be saved up (also the initial budget)
+    MAX_BUDGET = 10.0
+    IDEMPOTENT_METHODS = frozenset({"GET", "PUT", "DELETE"})
+
+
+class CircuitDefaults:
+    # consecutive failures which open the circuit
+    FAILURE_THRESHOLD = 5
+    # seconds the circuit stays open before a probe request is let through
+    RESET_TIMEOUT = 30.0
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter for transient errors of idempotent requests.
+
+    Retries are limited by a budget (a fraction of regular requests), so during
+    an outage the client does not multiply its load on the API.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = RetryDefaults.MAX_ATTEMPTS,
+        base_delay: float = RetryDefaults.BASE_DELAY,
+        max_delay: float = RetryDefaults.MAX_DELAY,
+        budget_ratio: float = RetryDefaults.BUDGET_RATIO,
+    ) -> None:
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget_ratio = budget_ratio
+        self._budget = RetryDefaults.MAX_BUDGET
+        self._lock = threading.Lock()
+
+    def is_idempotent(self, method: str) -> bool:
+        return method in RetryDefaults.IDEMPOTENT_METHODS
+
+    def request_sent(self) -> None:
+        """
+        Every regular request earns a fraction of a retry
+        """
+        with self._lock:
+            self._budget = min(
+                RetryDefaults.MAX_BUDGET, self._budget + self.budget_ratio
+            )
+
+    def should_retry(self, err: Exception, attempt: int, idempotent: bool) -> bool:
+        """
+        Returns True (and spends the budget) if failed attempt number `attempt` should be repeated
+        """
+        if not isinstance(err, TransientError) or not idempotent:
+            return False
+        if attempt + 1 >= self.max_attempts:
+            return False
+        with self._lock:
+            if self._budget < 1:
+                logger.warning("Retry budget exhausted, not retrying %s", err.url)
+                return False
+            self._budget -= 1
+        return True
+
+    def backoff(self, err: Exception, attempt: int) -> float:
+        """
+        Returns number of seconds to wait before the next attempt
+        """
+        delay = uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+        if isinstance(err, RateLimitedError) and err.retry_after is not None:
+            delay = max(delay, err.retry_after)
+        return delay
+
+
+class _Circuit:
+    def __init__(self) -> None:
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+
+
+class CircuitBreaker:
+    """
+    Per host circuit breaker.
+
+    After `failure_threshold` consecutive transient failures the circuit opens
+    and requests to the host fail fast with CircuitOpenError. When `reset_timeout`
+    passes a single probe request is let through, its success closes the circuit.
+    A probe which ends without an answer (cancelled, unexpected error) has to be
+    released with record_aborted, so the next request can probe again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = CircuitDefaults.FAILURE_THRESHOLD,
+        reset_timeout: float = CircuitDefaults.RESET_TIMEOUT,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._circuits: Dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    def _circuit(self, url: str) -> _Circuit:
+        host = urlsplit(url).netloc
+        if host not in self._circuits:
+            self._circuits[host] = _Circuit()
+        return self._circuits[host]
+
+    def is_open(self, url: str) -> bool:
+        with self._lock:
+            return self._circuit(url).opened_at is not None
+
+    def before_request(self, url: str) -> bool:
+        """
+        Raises CircuitOpenError if the request must not be sent,
+        returns True if the request is the probe of a half-open circuit
+        """
+        with self._lock:
+            circuit = self._circuit(url)
+            if circuit.opened_at is None:
+                return False
+            elapsed = time.monotonic() - circuit.opened_at
+            if elapsed >= self.reset_timeout and not circuit.probing:
+                circuit.probing = True
+                return True
+        raise CircuitOpenError(
+            f"Circuit open for {urlsplit(url).netloc}, API is considered degraded",
+            url=url,
+        )
+
+    def record_success(self, url: str) -> None:
+        with self._lock:
+            circuit = self._circuit(url)
+            if circuit.opened_at is not None:
+                logger.warning("Circuit closed for %s", urlsplit(url).netloc)
+            circuit.failures = 0
+            circuit.opened_at = None
+            circuit.probing = False
+
+    def record_aborted(self, url: str) -> None:
+        """
+        Releases the probe which ended without success or failure being recorded
+        """
+        with self._lock:
+            self._circuit(url).probing = False
+
+    def record_failure(self, url: str) -> None:
+        with self._lock:
+            circuit = self._circuit(url)
+            circuit.failures += 1
+            if circuit.probing or (
+                circuit.opened_at is None and circuit.failures >= self.failure_threshold
+            ):
+                logger.warning(
+                    "Circuit opened for %s after %d failures",
+                    urlsplit(url).netloc,
+                    circuit.failures,
+                )
+                circuit.opened_at = time.monotonic()
+                circuit.probing = False
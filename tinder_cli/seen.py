@@ -0,0 +1,245 @@
+from typing import Iterator, List, Optional, Set, Tuple
+import hashlib
+import math
+import mmap
+import os
+import struct
+import threading
+
+
+class SeenDefaults:
+    # number of ids the first filter is sized for, next ones grow GROWTH times
+    # (with the defaults the first filter, so the file, takes 197,818 bytes)
+    INITIAL_CAPACITY = 100_000
+    # probability that an id never added is reported as seen
+    ERROR_RATE = 0.001
+    GROWTH = 2
+    # error rate of every next filter is multiplied by this ratio (total stays bounded)
+    TIGHTENING_RATIO = 0.5
+
+
+# file header: magic, initial capacity, error rate, number of filters
+_HEADER = struct.Struct("<8sQdQ")
+# filter header: capacity, count, number of hashes, number of bits
+_FILTER = struct.Struct("<QQQQ")
+_MAGIC = b"TSEEN001"
+
+
+class _Slice:
+    """
+    Position of a single Bloom filter inside the mapped file
+    """
+
+    def __init__(
+        self, offset: int, capacity: int, count: int, hashes: int, bits: int
+    ) -> None:
+        self.offset = offset
+        self.capacity = capacity
+        self.count = count
+        self.hashes = hashes
+        self.bits = bits
+
+    @property
+    def data_offset(self) -> int:
+        return self.offset + _FILTER.size
+
+    @property
+    def size(self) -> int:
+        return _FILTER.size + (self.bits + 7) // 8
+
+
+def _hashes(person_id: str) -> Tuple[int, int]:
+    digest = hashlib.blake2b(person_id.encode(), digest_size=16).digest()
+    h1, h2 = struct.unpack("<QQ", digest)
+    return h1, h2 | 1
+
+
+class SeenFilter:
+    """
+    Scalable Bloom filter of person ids, stored in a memory-mapped file.
+
+    Membership checks never miss an added id and report an id never added as
+    seen with probability of about `error_rate`. When the current filter is
+    full a bigger one (with a tighter error rate) is appended to the file, so
+    the error rate holds however many ids are added. Opening an existing file
+    only maps it, nothing is loaded. Without path the filter lives in memory.
+    Use one file per account.
+    """
+
+    path: Optional[str]
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        initial_capacity: int = SeenDefaults.INITIAL_CAPACITY,
+        error_rate: float = SeenDefaults.ERROR_RATE,
+    ) -> None:
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate has to be between 0 and 1")
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+        self._slices: List[_Slice] = []
+        # ids whose swipe is in flight (see reserve)
+        self._pending: Set[str] = set()
+
+        if path is not None and os.path.exists(path) and os.path.getsize(path) > 0:
+            self._file = open(path, "r+b")
+            self._mmap = mmap.mmap(self._file.fileno(), 0)
+            magic, initial_capacity, error_rate, count = _HEADER.unpack_from(
+                self._mmap, 0
+            )
+            if magic != _MAGIC:
+                raise ValueError(f"{path} is not a seen filter file")
+            self.initial_capacity, self.error_rate = initial_capacity, error_rate
+            offset = _HEADER.size
+            for _ in range(count):
+                s = _Slice(offset, *_FILTER.unpack_from(self._mmap, offset))
+                self._slices.append(s)
+                offset += s.size
+        else:
+            self.initial_capacity, self.error_rate = initial_capacity, error_rate
+            if path is not None:
+                self._file = open(path, "w+b")
+            self._mmap = self._map(_HEADER.size)
+            _HEADER.pack_into(self._mmap, 0, _MAGIC, initial_capacity, error_rate, 0)
+            self._grow()
+
+    def _map(self, size: int) -> mmap.mmap:
+        if self._file is None:
+            return mmap.mmap(-1, size)
+        self._file.truncate(size)
+        return mmap.mmap(self._file.fileno(), size)
+
+    def _grow(self) -> None:
+        """
+        Appends next filter sized for GROWTH times more ids than the previous one
+        """
+        n = len(self._slices)
+        capacity = self.initial_capacity * SeenDefaults.GROWTH**n
+        error_rate = (
+            self.error_rate
+            * (1 - SeenDefaults.TIGHTENING_RATIO)
+            * SeenDefaults.TIGHTENING_RATIO**n
+        )
+        bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        hashes = max(1, math.ceil(-math.log2(error_rate)))
+        offset = len(self._mmap)
+        new = _Slice(offset, capacity, 0, hashes, bits)
+
+        old = self._mmap
+        if self._file is not None:
+            old.flush()
+            old.close()
+            self._mmap = self._map(offset + new.size)
+        else:
+            self._mmap = self._map(offset + new.size)
+            self._mmap[:offset] = old[:offset]
+            old.close()
+        _FILTER.pack_into(self._mmap, offset, capacity, 0, hashes, bits)
+        self._slices.append(new)
+        _HEADER.pack_into(
+            self._mmap,
+            0,
+            _MAGIC,
+            self.initial_capacity,
+            self.error_rate,
+            len(self._slices),
+        )
+
+    def _positions(self, s: _Slice, h1: int, h2: int) -> Iterator[int]:
+        # double hashing, k bit positions out of two 64 bit hashes
+        for i in range(s.hashes):
+            yield (h1 + i * h2) % s.bits
+
+    def _contains(self, h1: int, h2: int) -> bool:
+        mm = self._mmap
+        for s in self._slices:
+            base = s.data_offset
+            if all(
+                mm[base + (bit >> 3)] & (1 << (bit & 7))
+                for bit in self._positions(s, h1, h2)
+            ):
+                return True
+        return False
+
+    def __contains__(self, person_id: str) -> bool:
+        h1, h2 = _hashes(person_id)
+        with self._lock:
+            return self._contains(h1, h2)
+
+    def add(self, person_id: str) -> bool:
+        """
+        Adds id to the filter, returns False if it was (probably) there already
+        """
+        h1, h2 = _hashes(person_id)
+        with self._lock:
+            if self._contains(h1, h2):
+                return False
+            s = self._slices[-1]
+            if s.count >= s.capacity:
+                self._grow()
+                s = self._slices[-1]
+            mm = self._mmap
+            base = s.data_offset
+            for bit in self._positions(s, h1, h2):
+                mm[base + (bit >> 3)] |= 1 << (bit & 7)
+            s.count += 1
+            struct.pack_into("<Q", mm, s.offset + 8, s.count)
+            return True
+
+    def reserve(self, person_id: str) -> bool:
+        """
+        Marks id as being swiped on, returns False if it was (probably) seen
+        or its swipe is already in flight. End the swipe with release.
+        """
+        h1, h2 = _hashes(person_id)
+        with self._lock:
+            if person_id in self._pending or self._contains(h1, h2):
+                return False
+            self._pending.add(person_id)
+            return True
+
+    def release(self, person_id: str, swiped: bool) -> None:
+        """
+        Ends swipe started by reserve, the id is added only if the swipe went
+        through (a failed one can be tried again)
+        """
+        if swiped:
+            self.add(person_id)
+        with self._lock:
+            self._pending.discard(person_id)
+
+    def __len__(self) -> int:
+        """
+        Number of ids added (ids reported as seen by mistake are not counted)
+        """
+        return sum(s.count for s in self._slices)
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._mmap)
+
+    def flush(self) -> None:
+        """
+        Writes changes to the file (done by the OS eventually anyway)
+        """
+        with self._lock:
+            if self._file is not None:
+                self._mmap.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._mmap.closed:
+                return
+            if self._file is not None:
+                self._mmap.flush()
+            self._mmap.close()
+            if self._file is not None:
+                self._file.close()
+
+    def __enter__(self) -> "SeenFilter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,330 @@
+from typing import Iterable, List, Optional
+from dataclasses import asdict, fields
+from datetime import datetime, timezone
+from .models import Profile, AdditionalInfo, Match, Message
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class StoreDefaults:
+    # seconds after which stored profile is considered stale and fetched again
+    PROFILE_MAX_AGE = 24 * 60 * 60
+    # seconds to wait for a lock held by another connection / process
+    BUSY_TIMEOUT = 30.0
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    person_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    bio TEXT NOT NULL,
+    birth_date TEXT NOT NULL,
+    distance_mi INTEGER,
+    photos TEXT NOT NULL,
+    additional TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS matches (
+    match_id TEXT PRIMARY KEY,
+    profile_id TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS matches_profile_id ON matches (profile_id);
+CREATE TABLE IF NOT EXISTS messages (
+    message_id TEXT PRIMARY KEY,
+    match_id TEXT NOT NULL,
+    sent_date TEXT NOT NULL,
+    message TEXT NOT NULL,
+    from_id TEXT NOT NULL,
+    to_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_match_id_sent_date ON messages (match_id, sent_date);
+CREATE INDEX IF NOT EXISTS messages_sent_date ON messages (sent_date);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_ADDITIONAL_FIELDS = {f.name for f in fields(AdditionalInfo)}
+
+
+def _dump_date(value: datetime) -> str:
+    # fixed width UTC timestamps sort chronologically as text
+    return value.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+def _load_date(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+
+class ProfileStore:
+    """
+    Persistent SQLite (WAL mode) store of profiles, matches and messages.
+
+    Every thread uses its own connection, WAL lets readers in other threads
+    and processes work while one writer commits. Writes are upserts, so the
+    same records can be stored again without duplicates.
+    """
+
+    path: str
+    profile_max_age: Optional[float]
+
+    def __init__(
+        self,
+        path: str,
+        profile_max_age: Optional[float] = StoreDefaults.PROFILE_MAX_AGE,
+        busy_timeout: float = StoreDefaults.BUSY_TIMEOUT,
+    ) -> None:
+        self.path = path
+        self.profile_max_age = profile_max_age
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path, timeout=self.busy_timeout, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        """
+        Closes connections of all threads
+        """
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def __enter__(self) -> "ProfileStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # meta
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = (
+            self._connection()
+            .execute("SELECT value FROM meta WHERE key = ?", (key,))
+            .fetchone()
+        )
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO meta VALUES (?, ?)"
+                " ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                (key, value),
+            )
+
+    # profiles
+
+    def upsert_profiles(self, profiles: Iterable[Profile]) -> None:
+        now = time.time()
+        rows = [
+            (
+                p._id,
+                p.name,
+                p.bio,
+                _dump_date(p.birth_date),
+                p.distance_mi,
+                json.dumps(p.photos),
+                json.dumps(asdict(p.additional)),
+                now,
+            )
+            for p in profiles
+        ]
+        with self._connection() as conn:
+            conn.executemany(
+                """
+                INSERT INTO profiles VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (person_id) DO UPDATE SET
+                    name = excluded.name,
+                    bio = excluded.bio,
+                    birth_date = excluded.birth_date,
+                    distance_mi = excluded.distance_mi,
+                    photos = excluded.photos,
+                    additional = excluded.additional,
+                    updated_at = excluded.updated_at
+                """,
+                rows,
+            )
+
+    def upsert_profile(self, profile: Profile) -> None:
+        self.upsert_profiles([profile])
+
+    def mark_profiles_stale(self) -> None:
+        """
+        Makes get_profile skip all stored profiles until they are stored again,
+        ex. after location change (their distance_mi is relative to it)
+        """
+        with self._connection() as conn:
+            conn.execute("UPDATE profiles SET updated_at = 0")
+
+    def get_profile(self, person_id: str) -> Optional[Profile]:
+        """
+        Returns stored profile, None if it is missing, marked stale or older
+        than profile_max_age
+        """
+        row = (
+            self._connection()
+            .execute(
+                "SELECT person_id, name, bio, birth_date, distance_mi, photos, additional,"
+                " updated_at FROM profiles WHERE person_id = ?",
+                (person_id,),
+            )
+            .fetchone()
+        )
+        if row is None or row[7] <= 0:
+            return None
+        if (
+            self.profile_max_age is not None
+            and time.time() - row[7] > self.profile_max_age
+        ):
+            return None
+        additional = json.loads(row[6])
+        return Profile(
+            _id=row[0],
+            name=row[1],
+            bio=row[2],
+            birth_date=_load_date(row[3]),
+            distance_mi=row[4],
+            photos=json.loads(row[5]),
+            # ignore fields removed from AdditionalInfo since the profile was stored
+            additional=AdditionalInfo(
+                **{k: v for k, v in additional.items() if k in _ADDITIONAL_FIELDS}
+            ),
+        )
+
+    def delete_profile(self, person_id: str) -> None:
+        with self._connection() as conn:
+            conn.execute("DELETE FROM profiles WHERE person_id = ?", (person_id,))
+
+    # matches
+
+    def upsert_matches(self, matches: Iterable[Match]) -> None:
+        now = time.time()
+        with self._connection() as conn:
+            conn.executemany(
+                """
+                INSERT INTO matches VALUES (?, ?, ?)
+                ON CONFLICT (match_id) DO UPDATE SET
+                    profile_id = excluded.profile_id,
+                    updated_at = excluded.updated_at
+                """,
+                [(m.match_id, m.profile_id, now) for m in matches],
+            )
+
+    def get_match(self, match_id: str) -> Optional[Match]:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT match_id, profile_id FROM matches WHERE match_id = ?",
+                (match_id,),
+            )
+            .fetchone()
+        )
+        return Match(match_id=row[0], profile_id=row[1]) if row else None
+
+    def get_matches(self, profile_id: Optional[str] = None) -> List[Match]:
+        """
+        Returns all stored matches (of the given profile)
+        """
+        query = "SELECT match_id, profile_id FROM matches"
+        params = ()
+        if profile_id is not None:
+            query += " WHERE profile_id = ?"
+            params = (profile_id,)
+        rows = self._connection().execute(query, params).fetchall()
+        return [Match(match_id=row[0], profile_id=row[1]) for row in rows]
+
+    def delete_match(self, match_id: str) -> None:
+        """
+        Deletes match together with its messages (e.g. after unmatch)
+        """
+        with self._connection() as conn:
+            conn.execute("DELETE FROM messages WHERE match_id = ?", (match_id,))
+            conn.execute("DELETE FROM matches WHERE match_id = ?", (match_id,))
+
+    # messages
+
+    def upsert_messages(self, messages: Iterable[Message]) -> None:
+        rows = [
+            (m._id, m.match_id, _dump_date(m.sent_date), m.message, m.from_id, m.to_id)
+            for m in messages
+        ]
+        with self._connection() as conn:
+            conn.executemany(
+                """
+                INSERT INTO messages VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (message_id) DO UPDATE SET
+                    match_id = excluded.match_id,
+                    sent_date = excluded.sent_date,
+                    message = excluded.message,
+                    from_id = excluded.from_id,
+                    to_id = excluded.to_id
+                """,
+                rows,
+            )
+
+    def get_messages(
+        self,
+        match_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> List[Message]:
+        """
+        Returns stored messages ordered by sent date, optionally filtered by
+        match and sent date range (since inclusive, until exclusive)
+        """
+        conditions, params = [], []
+        if match_id is not None:
+            conditions.append("match_id = ?")
+            params.append(match_id)
+        if since is not None:
+            conditions.append("sent_date >= ?")
+            params.append(_dump_date(since))
+        if until is not None:
+            conditions.append("sent_date < ?")
+            params.append(_dump_date(until))
+        query = "SELECT message_id, match_id, sent_date, message, from_id, to_id FROM messages"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY sent_date"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        rows = self._connection().execute(query, params).fetchall()
+        return [
+            Message(
+                _id=row[0],
+                match_id=row[1],
+                sent_date=_load_date(row[2]),
+                message=row[3],
+                from_id=row[4],
+                to_id=row[5],
+            )
+            for row in rows
+        ]
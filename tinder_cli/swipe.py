@@ -0,0 +1,273 @@
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    Literal,
+    Optional,
+    Tuple,
+)
+from collections import deque
+from dataclasses import dataclass, field, replace
+from .bulk import run_bulk, BulkDefaults
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+Decision = Literal["like", "dislike", "superlike"]
+
+
+class SwipeDefaults:
+    CONCURRENCY = BulkDefaults.CONCURRENCY
+    # superlikes are scarce, they are sent one at a time
+    SUPERLIKE_CONCURRENCY = 1
+    # number of most recent latencies kept for percentiles
+    LATENCY_WINDOW = 10_000
+
+
+class SwipeSkipped(Exception):
+    """
+    Swipe was not sent (pipeline cancelled, superlike budget exhausted or the
+    profile was swiped on before)
+    """
+
+
+@dataclass
+class SwipeOutcome:
+    person_id: str
+    decision: Decision
+    ok: bool
+    matched: bool = False
+    latency: float = 0.0  # seconds
+    error: Optional[Exception] = None
+    response: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class SwipeStats:
+    submitted: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    skipped: int = 0
+    matches: int = 0
+    # superlikes which went through
+    superlikes: int = 0
+    likes_remaining: Optional[int] = None
+    elapsed: float = 0.0
+    latencies: Deque[float] = field(
+        default_factory=lambda: deque(maxlen=SwipeDefaults.LATENCY_WINDOW)
+    )
+
+    @property
+    def swipes_per_sec(self) -> float:
+        return self.succeeded / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        sent = self.succeeded + self.failed
+        return self.failed / sent if sent else 0.0
+
+    def percentile(self, q: float) -> float:
+        """
+        Returns latency percentile (q in 0..100) of recent swipes in seconds
+        """
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+    @property
+    def p50(self) -> float:
+        return self.percentile(50)
+
+    @property
+    def p95(self) -> float:
+        return self.percentile(95)
+
+    @property
+    def p99(self) -> float:
+        return self.percentile(99)
+
+
+class SwipePipeline:
+    """
+    Runs stream of (person_id, decision) swipes with bounded concurrency.
+
+    Swipes go through the client, so they share its connection pool and rate
+    limiter (superlikes have their own bucket there). Superlikes additionally
+    run at most `superlike_concurrency` at once and stop after `superlike_budget`.
+    Every swipe produces a SwipeOutcome, failures do not stop the pipeline.
+    """
+
+    def __init__(
+        self,
+        client,
+        concurrency: int = SwipeDefaults.CONCURRENCY,
+        superlike_concurrency: int = SwipeDefaults.SUPERLIKE_CONCURRENCY,
+        superlike_budget: Optional[int] = None,
+        on_outcome: Optional[Callable[[SwipeOutcome], None]] = None,
+    ) -> None:
+        self.client = client
+        self.concurrency = concurrency
+        self.superlike_budget = superlike_budget
+        self.on_outcome = on_outcome
+        self._superlike_slots = threading.Semaphore(superlike_concurrency)
+        # superlikes sent or in flight, failed and skipped ones are given back
+        self._superlikes_taken = 0
+        self._stats = SwipeStats()
+        self._lock = threading.Lock()
+        self._draining = threading.Event()
+        self._cancelled = threading.Event()
+        self._run_started: Optional[float] = None
+
+    def drain(self) -> None:
+        """
+        Stops taking new swipes, the ones already submitted are finished
+        """
+        self._draining.set()
+
+    def cancel(self) -> None:
+        """
+        Stops taking new swipes and skips submitted ones which have not been sent yet
+        """
+        self._draining.set()
+        self._cancelled.set()
+
+    def stats(self) -> SwipeStats:
+        with self._lock:
+            elapsed = self._stats.elapsed
+            if self._run_started is not None:
+                elapsed += time.monotonic() - self._run_started
+            return replace(
+                self._stats,
+                elapsed=elapsed,
+                latencies=deque(
+                    self._stats.latencies, maxlen=SwipeDefaults.LATENCY_WINDOW
+                ),
+            )
+
+    def _take_superlike(self) -> bool:
+        with self._lock:
+            if (
+                self.superlike_budget is not None
+                and self._superlikes_taken >= self.superlike_budget
+            ):
+                return False
+            self._superlikes_taken += 1
+            return True
+
+    def _refund_superlike(self) -> None:
+        with self._lock:
+            self._superlikes_taken -= 1
+
+    def _superlike(self, person_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Sends superlike, the budget is spent only when it goes through
+        """
+        sent = False
+        try:
+            with self._superlike_slots:
+                rsp = self.client.superlike(person_id)
+            # None means the client skipped the profile
+            sent = rsp is not None
+            return rsp
+        finally:
+            if not sent:
+                self._refund_superlike()
+
+    def _swipe(self, item: Tuple[str, Decision]) -> SwipeOutcome:
+        person_id, decision = item
+        if self._cancelled.is_set():
+            return SwipeOutcome(
+                person_id, decision, ok=False, error=SwipeSkipped("Pipeline cancelled")
+            )
+        started = time.monotonic()
+        try:
+            if decision == "superlike":
+                if not self._take_superlike():
+                    return SwipeOutcome(
+                        person_id,
+                        decision,
+                        ok=False,
+                        error=SwipeSkipped("Superlike budget exhausted"),
+                    )
+                rsp = self._superlike(person_id)
+            elif decision == "like":
+                rsp = self.client.like(person_id)
+            elif decision == "dislike":
+                rsp = self.client.dislike(person_id)
+            else:
+                raise ValueError(f"Unknown swipe decision: {decision}")
+        except Exception as err:
+            return SwipeOutcome(
+                person_id,
+                decision,
+                ok=False,
+                latency=time.monotonic() - started,
+                error=err,
+            )
+        if rsp is None:
+            # client skipped the profile, it was swiped on before
+            return SwipeOutcome(
+                person_id, decision, ok=False, error=SwipeSkipped("Already swiped on")
+            )
+        return SwipeOutcome(
+            person_id,
+            decision,
+            ok=True,
+            matched=bool(isinstance(rsp, dict) and rsp.get("match")),
+            latency=time.monotonic() - started,
+            response=rsp,
+        )
+
+    def _record(self, outcome: SwipeOutcome) -> None:
+        with self._lock:
+            stats = self._stats
+            if outcome.ok:
+                stats.succeeded += 1
+                stats.latencies.append(outcome.latency)
+                stats.matches += outcome.matched
+                stats.superlikes += outcome.decision == "superlike"
+                rsp = outcome.response
+                if isinstance(rsp, dict) and "likes_remaining" in rsp:
+                    stats.likes_remaining = rsp["likes_remaining"]
+            elif isinstance(outcome.error, SwipeSkipped):
+                stats.skipped += 1
+            else:
+                stats.failed += 1
+                stats.latencies.append(outcome.latency)
+
+    def _items(
+        self, items: Iterable[Tuple[str, Decision]]
+    ) -> Iterator[Tuple[str, Decision]]:
+        for item in items:
+            if self._draining.is_set():
+                return
+            with self._lock:
+                self._stats.submitted += 1
+            yield item
+
+    def run(self, items: Iterable[Tuple[str, Decision]]) -> Iterator[SwipeOutcome]:
+        """
+        Swipes all items (consumed lazily) and yields outcomes as they complete
+        """
+        with self._lock:
+            self._run_started = time.monotonic()
+        try:
+            for result in run_bulk(
+                self._swipe, self._items(items), self.concurrency, ordered=False
+            ):
+                outcome = result.value
+                self._record(outcome)
+                if self.on_outcome is not None:
+                    self.on_outcome(outcome)
+                yield outcome
+        finally:
+            with self._lock:
+                self._stats.elapsed += time.monotonic() - self._run_started
+                self._run_started = None
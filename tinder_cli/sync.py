@@ -0,0 +1,149 @@
+from typing import Callable, List, Literal, Optional, Set
+from dataclasses import dataclass
+from .models import Match, Message, Updates
+from .parse_utils import parse_updates, parse_datetime
+from .metrics import timed_parse
+from .store import ProfileStore
+import asyncio
+import logging
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ChangeEvent:
+    """
+    Single change of the account found by the sync
+    """
+
+    kind: Literal["match", "message", "unmatch"]
+    match_id: str
+    match: Optional[Match] = None
+    message: Optional[Message] = None
+
+
+class SyncEngine:
+    """
+    Incremental sync of matches, messages and unmatches built on get_updates.
+
+    The high-water mark (last activity date returned by the server) is kept in
+    the store, so every sync, even after restart, asks only for changes since
+    the previous one. Changes are merged into the store and returned (and
+    passed to subscribers) as ChangeEvent objects.
+
+    `client` is TinderClient (use sync) or AsyncTinderClient (use sync_async).
+    Without a store the high-water mark and known matches live in memory.
+    """
+
+    HIGH_WATER_MARK_KEY = "updates.last_activity_date"
+
+    def __init__(self, client, store: Optional[ProfileStore] = None) -> None:
+        self.client = client
+        # parse time of updates is recorded into client's metrics (if enabled)
+        self._metrics = getattr(client, "metrics", None)
+        self.store = store
+        self._last_activity_date = (
+            store.get_meta(self.HIGH_WATER_MARK_KEY) if store is not None else None
+        ) or ""
+        self._known_match_ids: Set[str] = set()
+        self._subscribers: List[Callable[[ChangeEvent], None]] = []
+        self._lock = threading.Lock()
+        # serializes sync_async calls from fetch to merge, see _get_async_lock
+        self._async_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def last_activity_date(self) -> str:
+        return self._last_activity_date
+
+    def subscribe(self, callback: Callable[[ChangeEvent], None]) -> None:
+        """
+        Registers callback called for every change event of every sync
+        """
+        self._subscribers.append(callback)
+
+    def sync(self) -> List[ChangeEvent]:
+        """
+        Fetches changes since the high-water mark and merges them into local state
+        """
+        with self._lock:
+            rsp = self.client.get_updates(self._last_activity_date)
+            updates = timed_parse(self._metrics, parse_updates, rsp)
+            events = self._merge(updates)
+        self._publish(events)
+        return events
+
+    async def sync_async(self) -> List[ChangeEvent]:
+        """
+        asyncio variant of sync, `client` has to be AsyncTinderClient
+        """
+        # overlapping syncs would fetch with the same mark and repeat the events
+        async with self._get_async_lock():
+            rsp = await self.client.get_updates(self._last_activity_date)
+            updates = timed_parse(self._metrics, parse_updates, rsp)
+            events = await asyncio.to_thread(self._merge_locked, updates)
+        self._publish(events)
+        return events
+
+    def _get_async_lock(self) -> asyncio.Lock:
+        # lock has to be created inside of the running event loop
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        return self._async_lock
+
+    def _merge_locked(self, updates: Updates) -> List[ChangeEvent]:
+        with self._lock:
+            return self._merge(updates)
+
+    def _is_known_match(self, match_id: str) -> bool:
+        if match_id in self._known_match_ids:
+            return True
+        return self.store is not None and self.store.get_match(match_id) is not None
+
+    def _merge(self, updates: Updates) -> List[ChangeEvent]:
+        events: List[ChangeEvent] = []
+        previous = self._last_activity_date
+        since = parse_datetime(previous) if previous else None
+
+        for match in updates.matches:
+            if not self._is_known_match(match.match_id):
+                events.append(ChangeEvent("match", match.match_id, match=match))
+            if self.store is None:
+                self._known_match_ids.add(match.match_id)
+        for message in updates.messages:
+            # updates repeat messages of active matches, only newer ones are changes
+            if since is None or message.sent_date > since:
+                events.append(ChangeEvent("message", message.match_id, message=message))
+        for match_id in updates.unmatched_ids:
+            events.append(ChangeEvent("unmatch", match_id))
+            self._known_match_ids.discard(match_id)
+
+        if self.store is not None:
+            self.store.upsert_matches(updates.matches)
+            self.store.upsert_messages(updates.messages)
+            for match_id in updates.unmatched_ids:
+                self.store.delete_match(match_id)
+
+        # compared as dates, timestamps may differ in digits of the fraction
+        latest = updates.last_activity_date
+        if latest and (since is None or parse_datetime(latest) > since):
+            self._last_activity_date = updates.last_activity_date
+            if self.store is not None:
+                # the mark is saved only after the changes are, so nothing is lost on crash
+                self.store.set_meta(self.HIGH_WATER_MARK_KEY, self._last_activity_date)
+
+        logger.debug(
+            "Synced %d changes, last activity date %s",
+            len(events),
+            self._last_activity_date,
+        )
+        return events
+
+    def _publish(self, events: List[ChangeEvent]) -> None:
+        for event in events:
+            for callback in self._subscribers:
+                try:
+                    callback(event)
+                except Exception:
+                    logger.exception("Sync subscriber failed on %s", event)
@@ -0,0 +1,144 @@
+from typing import Mapping, Optional, Tuple, Union
+from abc import ABC, abstractmethod
+from requests.adapters import HTTPAdapter
+import requests
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class PoolDefaults:
+    # number of per-host connection pools kept by the session
+    POOL_CONNECTIONS = 4
+    # maximum number of keep-alive connections kept per host
+    POOL_MAXSIZE = 16
+    # when the pool is exhausted: True blocks until a pooled connection is free,
+    # False opens an extra connection which is discarded after the request
+    POOL_BLOCK = False
+    # (connect, read) seconds, a hung keep-alive connection fails instead of
+    # blocking forever (and so it reaches the retries and the circuit breaker)
+    TIMEOUT = (3.05, 30.0)
+
+
+Timeout = Union[float, Tuple[float, float], None]
+
+
+class Transport(ABC):
+    """
+    Base of the transports used by the Tinder clients.
+
+    `request` takes the arguments of `requests.Session.request` and returns
+    `requests.Response`, subclasses decide where the response comes from
+    (network, recorded cassette, ...).
+    """
+
+    _closed: bool = False
+
+    @abstractmethod
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Sends the request, network errors are raised as requests exceptions
+        """
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def close(self) -> None:
+        self._closed = True
+
+    def __enter__(self) -> "Transport":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class HTTPTransport(Transport):
+    """
+    Connection-pooling HTTP transport used by the Tinder clients.
+
+    Wraps a single `requests.Session` so that consecutive calls to the same host
+    reuse keep-alive TCP connections (and therefore their TLS sessions) instead
+    of performing a fresh handshake per request. One transport can be shared by
+    several clients, it is thread safe as long as the pool is large enough.
+    """
+
+    session: requests.Session
+    timeout: Timeout
+
+    def __init__(
+        self,
+        pool_connections: int = PoolDefaults.POOL_CONNECTIONS,
+        pool_maxsize: int = PoolDefaults.POOL_MAXSIZE,
+        pool_block: bool = PoolDefaults.POOL_BLOCK,
+        timeout: Timeout = PoolDefaults.TIMEOUT,
+        session: Optional[requests.Session] = None,
+    ) -> None:
+        # per request `timeout` overrides it, None waits forever
+        self.timeout = timeout
+        self.session = session if session is not None else requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["Connection"] = "keep-alive"
+        self._closed = False
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Sends request over pooled connection
+        """
+        if self._closed:
+            raise RuntimeError("Transport is already closed")
+        if self.timeout is not None:
+            kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def close(self) -> None:
+        """
+        Closes all pooled connections
+        """
+        if not self._closed:
+            self.session.close()
+            self._closed = True
+
+
+# status, headers and body of a response
+AsyncResponse = Tuple[int, Mapping[str, str], bytes]
+
+
+class AsyncTransport(ABC):
+    """
+    Base of the transports used by the async Tinder clients.
+
+    `request` takes the arguments of `aiohttp.ClientSession.request` and
+    returns status, headers and the whole body of the response. The aiohttp
+    one (AIOHTTPTransport) lives in async_api, so that the sync clients do not
+    need aiohttp.
+    """
+
+    _closed: bool = False
+
+    @abstractmethod
+    async def request(self, method: str, url: str, **kwargs) -> AsyncResponse:
+        """
+        Sends the request, network errors are raised as aiohttp exceptions
+        """
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    async def close(self) -> None:
+        self._closed = True
+
+    async def __aenter__(self) -> "AsyncTransport":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
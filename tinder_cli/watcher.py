@@ -0,0 +1,253 @@
+from typing import Callable, Dict, List, Optional
+from dataclasses import dataclass, replace
+from .sync import ChangeEvent, SyncEngine
+import asyncio
+import logging
+import threading
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+class WatcherDefaults:
+    MIN_INTERVAL = 5.0  # seconds, used while conversations are active
+    MAX_INTERVAL = 15 * 60.0  # seconds, reached after a long idle period
+    INITIAL_INTERVAL = 30.0  # seconds
+    # interval is multiplied by this factor after every poll without changes
+    BACKOFF_FACTOR = 1.5
+
+
+@dataclass
+class WatcherStats:
+    polls: int = 0
+    wasted_polls: int = 0  # polls which found no changes
+    coalesced_polls: int = 0  # poll requests served by a poll already in flight
+    failed_polls: int = 0
+    events: int = 0
+    dropped_events: int = 0  # events not delivered because the queue was full
+    interval: float = WatcherDefaults.INITIAL_INTERVAL
+    last_poll_duration: float = 0.0
+
+    @property
+    def events_per_poll(self) -> float:
+        return self.events / self.polls if self.polls else 0.0
+
+    @property
+    def wasted_ratio(self) -> float:
+        return self.wasted_polls / self.polls if self.polls else 0.0
+
+
+class UpdateWatcher:
+    """
+    Long running watcher polling get_updates (through SyncEngine) with adaptive interval.
+
+    The interval shrinks with every poll that brings changes (the more changes,
+    the faster) and grows exponentially while the account is idle. Overlapping
+    poll requests are coalesced into the one in flight. New events are passed
+    to registered callbacks and to `queue`; events which don't fit into a full
+    queue are dropped and counted in stats.
+    """
+
+    def __init__(
+        self,
+        engine: SyncEngine,
+        min_interval: float = WatcherDefaults.MIN_INTERVAL,
+        max_interval: float = WatcherDefaults.MAX_INTERVAL,
+        initial_interval: float = WatcherDefaults.INITIAL_INTERVAL,
+        backoff_factor: float = WatcherDefaults.BACKOFF_FACTOR,
+        queue: Optional[asyncio.Queue] = None,
+    ) -> None:
+        self.engine = engine
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.queue = queue
+        self._stats = WatcherStats(interval=initial_interval)
+        self._callbacks: Dict[Optional[str], List[Callable[[ChangeEvent], None]]] = {}
+        self._lock = threading.Lock()
+        self._in_flight: Optional[threading.Event] = None
+        self._in_flight_async: Optional[asyncio.Future] = None
+        self._last_events: List[ChangeEvent] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # loop owning `queue` while polling in a background thread
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # callbacks
+
+    def on_event(
+        self, callback: Callable[[ChangeEvent], None], kind: Optional[str] = None
+    ) -> None:
+        """
+        Registers callback for events of the given kind ("match", "message",
+        "unmatch") or for all events (kind=None)
+        """
+        self._callbacks.setdefault(kind, []).append(callback)
+
+    def on_message(self, callback: Callable[[ChangeEvent], None]) -> None:
+        self.on_event(callback, "message")
+
+    def on_match(self, callback: Callable[[ChangeEvent], None]) -> None:
+        self.on_event(callback, "match")
+
+    def _enqueue(self, event: ChangeEvent) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            with self._lock:
+                self._stats.dropped_events += 1
+            logger.warning("Watcher queue is full, dropping %s", event)
+
+    def _dispatch(
+        self,
+        events: List[ChangeEvent],
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ) -> None:
+        for event in events:
+            for callback in self._callbacks.get(None, []) + self._callbacks.get(
+                event.kind, []
+            ):
+                try:
+                    callback(event)
+                except Exception:
+                    logger.exception("Watcher callback failed on %s", event)
+            if self.queue is None:
+                continue
+            if loop is None:
+                self._enqueue(event)
+                continue
+            try:
+                # asyncio.Queue is not thread safe, hand the event to its loop
+                loop.call_soon_threadsafe(self._enqueue, event)
+            except RuntimeError:
+                with self._lock:
+                    self._stats.dropped_events += 1
+                logger.warning("Watcher queue loop is closed, dropping %s", event)
+
+    # interval
+
+    def _record(self, events: Optional[List[ChangeEvent]], duration: float) -> None:
+        with self._lock:
+            stats = self._stats
+            stats.polls += 1
+            stats.last_poll_duration = duration
+            if events is None:
+                stats.failed_polls += 1
+                stats.interval = min(self.max_interval, stats.interval * self.backoff_factor)
+            elif events:
+                stats.events += len(events)
+                stats.interval = max(self.min_interval, stats.interval / (1 + len(events)))
+            else:
+                stats.wasted_polls += 1
+                stats.interval = min(self.max_interval, stats.interval * self.backoff_factor)
+
+    @property
+    def interval(self) -> float:
+        return self._stats.interval
+
+    def stats(self) -> WatcherStats:
+        with self._lock:
+            return replace(self._stats)
+
+    # threads
+
+    def poll(self) -> List[ChangeEvent]:
+        """
+        Polls for changes now, joins the poll in flight if there is one.
+        Events go to `queue` through the loop given to start() if there is one,
+        otherwise directly (so it must be called from the queue's loop thread)
+        """
+        with self._lock:
+            in_flight = self._in_flight
+            if in_flight is None:
+                self._in_flight = threading.Event()
+            else:
+                self._stats.coalesced_polls += 1
+        if in_flight is not None:
+            in_flight.wait()
+            return self._last_events
+
+        started = time.monotonic()
+        events: Optional[List[ChangeEvent]] = None
+        try:
+            events = self.engine.sync()
+        except Exception:
+            logger.exception("Polling updates failed")
+        finally:
+            self._record(events, time.monotonic() - started)
+            with self._lock:
+                self._last_events = events or []
+                done, self._in_flight = self._in_flight, None
+            done.set()
+        self._dispatch(self._last_events, self._loop)
+        return self._last_events
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """
+        Starts polling in a background thread. With `queue` set events are
+        delivered through `loop` (defaults to the running loop)
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        if self.queue is not None:
+            if loop is None:
+                try:
+                    loop = asyncio.get_running_loop()
+                except RuntimeError:
+                    raise ValueError(
+                        "Watcher with a queue needs the loop consuming it, "
+                        "pass it to start() or use run_async()"
+                    ) from None
+            self._loop = loop
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="tinder-update-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.poll()
+            self._stop.wait(self.interval)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                return  # still polling, keeps delivering through its loop
+            self._thread = None
+        self._loop = None
+
+    # asyncio
+
+    async def poll_async(self) -> List[ChangeEvent]:
+        """
+        asyncio variant of poll, engine client has to be AsyncTinderClient
+        """
+        if self._in_flight_async is not None:
+            self._stats.coalesced_polls += 1
+            return await asyncio.shield(self._in_flight_async)
+
+        self._in_flight_async = asyncio.get_running_loop().create_future()
+        started = time.monotonic()
+        events: Optional[List[ChangeEvent]] = None
+        try:
+            events = await self.engine.sync_async()
+        except Exception:
+            logger.exception("Polling updates failed")
+        finally:
+            self._record(events, time.monotonic() - started)
+            self._in_flight_async.set_result(events or [])
+            self._in_flight_async = None
+        self._dispatch(events or [])
+        return events or []
+
+    async def run_async(self) -> None:
+        """
+        Polls until cancelled (e.g. asyncio.create_task(watcher.run_async()))
+        """
+        while True:
+            await self.poll_async()
+            await asyncio.sleep(self.interval)